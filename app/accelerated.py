@@ -0,0 +1,518 @@
+from enum import IntEnum
+from typing import TYPE_CHECKING, Dict, List, NoReturn, Tuple
+
+import numpy as np
+from sortedcontainers import SortedList
+
+from .generator import Generator
+from .models import Distribution
+from .transition import Transition
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba є необов'язковою залежністю
+    numba = None
+
+if TYPE_CHECKING:
+    from .kernel import CompiledNet
+    from .simulation import Simulation
+
+
+# закони розподілу, які підтримує прискорений рушій
+SUPPORTED_DISTRIBUTIONS = ('const', 'exp', 'uniform', 'norm', 'erlang')
+
+
+class _Status(IntEnum):
+    """
+    Коди стану, з якими функція прогону повертає керування
+    """
+    DONE = 0
+    NEED_VARIATES = 1
+    LOG_FULL = 2
+    HEAP_FULL = 3
+    CHECKPOINT = 4
+
+
+# цілі значення кодів стану для скомпільованої функції прогону
+_DONE, _NEED_VARIATES, _LOG_FULL, _HEAP_FULL, _CHECKPOINT = (int(status) for status in _Status)
+
+# види записів журналу статистики
+_LOAD, _APPEND, _EXCLUDE, _HOLD, _RELEASE = 0, 1, 2, 3, 4
+_CELLS = ('load', 'append', 'exclude', 'holds', 'releases')
+
+
+def is_accelerated_available() -> bool:
+    """
+    Перевірка наявності numba
+    :return: True, якщо прискорений рушій може бути використаний
+    """
+    return numba is not None
+
+
+def check_model(simulation: "Simulation") -> List[str]:
+    """
+    Перевірка можливості виконання моделі прискореним рушієм
+    :param simulation: екземпляр симуляції
+    :return: перелік причин, з яких модель не підтримується (порожній, якщо модель підтримується)
+    """
+    reasons = []
+    if type(simulation.generator) is not Generator:
+        reasons.append('custom generator class')
+    if type(simulation.generator._distro) is not Distribution or \
+            simulation.generator._distro.type_of_distribution not in SUPPORTED_DISTRIBUTIONS:
+        reasons.append('generator distribution is not supported')
+    for transition in simulation.transitions:
+        if type(transition) is not Transition:
+            reasons.append(f'custom transition class {transition.str_id}')
+        if type(transition._time_distro) is not Distribution or \
+                transition._time_distro.type_of_distribution not in SUPPORTED_DISTRIBUTIONS:
+            reasons.append(f'distribution of {transition.str_id} is not supported')
+        if not transition._inputs:
+            reasons.append(f'transition {transition.str_id} has no inputs')
+    return reasons
+
+
+def _take(variates, var_pos, k):
+    value = variates[k, var_pos[k]]
+    var_pos[k] += 1
+    return value
+
+
+def _heap_push(heap_time, heap_owner, heap_size, time, owner):
+    i = heap_size[0]
+    heap_size[0] += 1
+    while i > 0:
+        parent = (i - 1) // 2
+        if heap_time[parent] <= time:
+            break
+        heap_time[i] = heap_time[parent]
+        heap_owner[i] = heap_owner[parent]
+        i = parent
+    heap_time[i] = time
+    heap_owner[i] = owner
+
+
+def _heap_pop(heap_time, heap_owner, heap_size):
+    owner = heap_owner[0]
+    heap_size[0] -= 1
+    size = heap_size[0]
+    time, last_owner = heap_time[size], heap_owner[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and heap_time[child + 1] < heap_time[child]:
+            child += 1
+        if heap_time[child] >= time:
+            break
+        heap_time[i] = heap_time[child]
+        heap_owner[i] = heap_owner[child]
+        i = child
+    heap_time[i] = time
+    heap_owner[i] = last_owner
+    return owner
+
+
+def _track(metrics, i, level, timer):
+    metrics[i, 0] += level * (timer - metrics[i, 1])
+    metrics[i, 1] = timer
+
+
+def _log(log_kind, log_owner, log_time, log_value, log_size, kind, owner, time, value):
+    i = log_size[0]
+    log_kind[i] = kind
+    log_owner[i] = owner
+    log_time[i] = time
+    log_value[i] = value
+    log_size[0] += 1
+
+
+def _advance(clock, cursor, status, generator_state, marking, place_capacity, stats_flag, stats_places,
+             pre_ptr, pre_idx, pre_w, post_ptr, post_idx, post_w,
+             t_capacity, probability, is_conflict, delay_distro, prob_distro, unit_ptr, unit_members,
+             inflight, due, heap_time, heap_owner, heap_size, distro_const, distro_loc, variates, var_pos, var_len,
+             log_kind, log_owner, log_time, log_value, log_size, place_metrics, transition_metrics):
+    """
+    Цикл подій прискореного рушія. Виконується до завершення прогону або до вичерпання ресурсів;
+    позиція у кроці зберігається в cursor (номер активного елемента та номер переходу в групі;
+    від'ємний номер елемента означає, що крок завершено і залишилося перейти до наступного моменту часу).
+    clock містить поточний момент, максимальний час та момент наступної контрольної точки,
+    перед переходом через яку керування повертається для обробки контрольної точки.
+    Усі ресурси (випадкові числа, журнал, купа) перевіряються до зміни стану переходу, тому після
+    їх поповнення обробка продовжується з того самого переходу.
+    Спрацювання переходу записане безпосередньо в циклі: виклик окремої функції з усіма масивами
+    коштує більше, ніж саме спрацювання
+    """
+    timer = clock[0]
+    n_units = unit_ptr.shape[0] - 1
+    u, m = cursor[0], cursor[1]
+    while True:
+        while 0 <= u < n_units:
+            start, end = unit_ptr[u], unit_ptr[u + 1]
+            first = unit_members[start]
+            if first < 0:
+                # генератор: [наступне надходження, кількість, вихідне місце, розподіл, всього, активний]
+                if generator_state[5] > 0 and generator_state[0] == timer:
+                    k = int(generator_state[3])
+                    if log_size[0] + 1 > log_kind.shape[0]:
+                        status[0] = _LOG_FULL
+                        cursor[0], cursor[1] = u, 0
+                        return
+                    if not distro_const[k] and var_len[k] - var_pos[k] < 1:
+                        status[0], status[1], status[2] = _NEED_VARIATES, k, 1
+                        cursor[0], cursor[1] = u, 0
+                        return
+                    p = int(generator_state[2])
+                    n = int(generator_state[1])
+                    if p >= 0 and marking[p] < place_capacity[p]:
+                        _track(place_metrics, p, marking[p], timer)
+                        marking[p] += n
+                        place_metrics[p, 2] += n
+                        if stats_flag[p]:
+                            _log(log_kind, log_owner, log_time, log_value, log_size, _APPEND, p, timer, n)
+                    generator_state[4] += n
+                    delay = distro_loc[k] if distro_const[k] else _take(variates, var_pos, k)
+                    generator_state[0] = timer + max(delay, 0.0)
+                    if generator_state[0] <= timer:
+                        generator_state[5] = 0
+                u += 1
+                m = 0
+                continue
+
+            # звичайний перехід обробляється один раз; група конфліктних переходів - в ітераційному циклі,
+            # в якому після спрацювання перегляд починається з початку групи
+            conflict = end - start > 1 or is_conflict[first]
+            while True:
+                any_fired = False
+                while m < end - start:
+                    j = unit_members[start + m]
+                    if log_size[0] + (pre_ptr[j + 1] - pre_ptr[j]) + (post_ptr[j + 1] - post_ptr[j]) + 2 \
+                            > log_kind.shape[0]:
+                        status[0] = _LOG_FULL
+                        cursor[0], cursor[1] = u, m
+                        return
+
+                    fired = False
+                    free_cells = t_capacity[j] - (inflight[j] - due[j])
+                    if free_cells > 0:
+                        enabled = True
+                        quantity = free_cells
+                        for r in range(pre_ptr[j], pre_ptr[j + 1]):
+                            if marking[pre_idx[r]] < pre_w[r]:
+                                enabled = False
+                                break
+                            quantity = min(quantity, float(marking[pre_idx[r]] // pre_w[r]))
+                        if enabled:
+                            if is_conflict[j]:
+                                quantity = min(quantity, 1.0)
+                            n = int(quantity)
+                            k = delay_distro[j]
+                            if probability[j] < 1 and var_len[prob_distro[j]] - var_pos[prob_distro[j]] < 1:
+                                status[0], status[1], status[2] = _NEED_VARIATES, prob_distro[j], 1
+                                cursor[0], cursor[1] = u, m
+                                return
+                            if not distro_const[k] and var_len[k] - var_pos[k] < n:
+                                status[0], status[1], status[2] = _NEED_VARIATES, k, n
+                                cursor[0], cursor[1] = u, m
+                                return
+                            if heap_size[0] + n > heap_time.shape[0]:
+                                status[0], status[2] = _HEAP_FULL, heap_size[0] + n
+                                cursor[0], cursor[1] = u, m
+                                return
+                            if probability[j] < 1 and _take(variates, var_pos, prob_distro[j]) > probability[j]:
+                                enabled = False
+                            if enabled:
+                                _log(log_kind, log_owner, log_time, log_value, log_size, _HOLD, j, timer, n)
+                                _track(transition_metrics, j, inflight[j], timer)
+                                transition_metrics[j, 2] += n
+                                for r in range(pre_ptr[j], pre_ptr[j + 1]):
+                                    p = pre_idx[r]
+                                    _track(place_metrics, p, marking[p], timer)
+                                    marking[p] -= n * pre_w[r]
+                                    if stats_flag[p]:
+                                        _log(log_kind, log_owner, log_time, log_value, log_size,
+                                             _EXCLUDE, p, timer, n * pre_w[r])
+                                for _ in range(n):
+                                    delay = distro_loc[k] if distro_const[k] else _take(variates, var_pos, k)
+                                    release = timer + max(delay, 0.0)
+                                    inflight[j] += 1
+                                    if release == timer:
+                                        due[j] += 1
+                                    else:
+                                        _heap_push(heap_time, heap_owner, heap_size, release, j)
+                                fired = True
+
+                    # звільнення маркерів, час затримки яких завершився
+                    released = due[j]
+                    if released > 0:
+                        due[j] = 0
+                        _track(transition_metrics, j, inflight[j], timer)
+                        transition_metrics[j, 3] += released
+                        inflight[j] -= released
+                        _log(log_kind, log_owner, log_time, log_value, log_size, _RELEASE, j, timer, released)
+                        for r in range(post_ptr[j], post_ptr[j + 1]):
+                            p = post_idx[r]
+                            if marking[p] < place_capacity[p]:
+                                _track(place_metrics, p, marking[p], timer)
+                                marking[p] += released * post_w[r]
+                                place_metrics[p, 2] += released * post_w[r]
+                                if stats_flag[p]:
+                                    _log(log_kind, log_owner, log_time, log_value, log_size,
+                                         _APPEND, p, timer, released * post_w[r])
+
+                    if fired:
+                        any_fired = True
+                        break
+                    m += 1
+                m = 0
+                if not (conflict and any_fired):
+                    break
+            u += 1
+
+        if u >= 0:
+            if log_size[0] + stats_places.shape[0] > log_kind.shape[0]:
+                status[0] = _LOG_FULL
+                cursor[0], cursor[1] = u, 0
+                return
+            for p in stats_places:
+                _log(log_kind, log_owner, log_time, log_value, log_size, _LOAD, p, timer, marking[p])
+
+        next_time = np.inf
+        if heap_size[0] > 0:
+            next_time = heap_time[0]
+        if generator_state[5] > 0 and generator_state[0] < next_time:
+            next_time = generator_state[0]
+        if next_time == np.inf or next_time > clock[1]:
+            status[0] = _DONE
+            return
+        if next_time > clock[2]:
+            status[0] = _CHECKPOINT
+            cursor[0], cursor[1] = -1, 0
+            return
+        timer = next_time
+        clock[0] = timer
+        while heap_size[0] > 0 and heap_time[0] == timer:
+            due[_heap_pop(heap_time, heap_owner, heap_size)] += 1
+        u, m = 0, 0
+        cursor[0], cursor[1] = 0, 0
+
+
+if numba is not None:
+    _take = numba.njit(cache=True)(_take)
+    _heap_push = numba.njit(cache=True)(_heap_push)
+    _heap_pop = numba.njit(cache=True)(_heap_pop)
+    _track = numba.njit(cache=True)(_track)
+    _log = numba.njit(cache=True)(_log)
+    _advance = numba.njit(cache=True)(_advance)
+
+
+class AcceleratedNet:
+    """
+    Прискорений рушій: скомпільована мережа переводиться в типізовані масиви, а цикл подій виконується
+    функцією, скомпільованою numba. Випадкові числа беруться з пулів тих самих розподілів, що і в рушіях
+    на об'єктах, тому прогін дає ту саму статистику при тому самому початковому значенні
+    """
+
+    def __init__(self, net: "CompiledNet", log_capacity: int = 65536):
+        """
+        Конструктор
+        :param net: скомпільована мережа
+        :param log_capacity: кількість записів журналу статистики між переносами у буфери елементів
+        """
+        self._net = net
+        simulation = net._simulation
+        transitions = net._transitions
+
+        self._pre_ptr, self._pre_idx, self._pre_w = self._to_csr(net._pre_index, net._pre_weight)
+        self._post_ptr, self._post_idx, self._post_w = self._to_csr(net._post_index, net._post_weight)
+
+        # розподіли: генератор, затримки переходів, перевірки ймовірності
+        self._distros: List[Distribution] = []
+        distro_ids: Dict[int, int] = {}
+
+        def register(distro: Distribution) -> int:
+            if id(distro) not in distro_ids:
+                distro_ids[id(distro)] = len(self._distros)
+                self._distros.append(distro)
+            return distro_ids[id(distro)]
+
+        generator = simulation.generator
+        self._generator_state = np.array([generator._next_arrival, generator._n_per_arrival,
+                                          net._generator_output, register(generator._distro),
+                                          generator._stats, 1], dtype=np.float64)
+        self._delay_distro = np.array([register(t._time_distro) for t in transitions], dtype=np.int64)
+        self._prob_distro = np.array([register(t._probability_distro) if t._probability < 1 else -1
+                                      for t in transitions], dtype=np.int64)
+        self._distro_const = np.array([d.type_of_distribution == 'const' for d in self._distros], dtype=bool)
+        self._distro_loc = np.array([d.loc for d in self._distros], dtype=np.float64)
+        self._variates = np.zeros((len(self._distros), 1024), dtype=np.float64)
+        self._var_pos = np.zeros(len(self._distros), dtype=np.int64)
+        self._var_len = np.zeros(len(self._distros), dtype=np.int64)
+
+        unit_members = []
+        self._unit_ptr = [0]
+        for unit in net.units:
+            unit_members.extend([-1] if unit is None else unit.tolist())
+            self._unit_ptr.append(len(unit_members))
+        self._unit_ptr = np.array(self._unit_ptr, dtype=np.int64)
+        self._unit_members = np.array(unit_members, dtype=np.int64)
+
+        # моменти звільнення, що вже знаходяться в переходах, переносяться в купу
+        self._inflight = np.array([len(t._storage) for t in transitions], dtype=np.int64)
+        self._due = np.zeros(len(transitions), dtype=np.int64)
+        pending = [(moment, j) for j, t in enumerate(transitions) for moment in t._storage]
+        self._heap_time = np.zeros(max(1024, 2 * len(pending)), dtype=np.float64)
+        self._heap_owner = np.zeros(self._heap_time.shape[0], dtype=np.int64)
+        self._heap_size = np.zeros(1, dtype=np.int64)
+        for moment, j in sorted(pending):
+            self._heap_time[self._heap_size[0]] = moment
+            self._heap_owner[self._heap_size[0]] = j
+            self._heap_size[0] += 1
+
+        self._stats_flag = np.array([s is not None for s in net._statistics], dtype=bool)
+        self._stats_places = np.array(net._stats_places, dtype=np.int64)
+        log_capacity = max(log_capacity, 4 * (len(net._places) + len(transitions)))
+        self._log_kind = np.zeros(log_capacity, dtype=np.int8)
+        self._log_owner = np.zeros(log_capacity, dtype=np.int64)
+        self._log_time = np.zeros(log_capacity, dtype=np.float64)
+        self._log_value = np.zeros(log_capacity, dtype=np.float64)
+        self._log_size = np.zeros(1, dtype=np.int64)
+
+    def __repr__(self):
+        return f'AcceleratedNet: {self._net}, distributions={len(self._distros)}'
+
+    def run(self) -> float:
+        """
+        Прогін симуляції
+        :return: останній оброблений момент модельного часу
+        """
+        simulation = self._net._simulation
+        timer = simulation._time_moments.pop()
+        while self._heap_size[0] > 0 and self._heap_time[0] == timer:
+            self._due[_heap_pop(self._heap_time, self._heap_owner, self._heap_size)] += 1
+
+        clock = np.array([timer, simulation.max_time, simulation._next_checkpoint], dtype=np.float64)
+        cursor = np.zeros(2, dtype=np.int64)
+        status = np.zeros(3, dtype=np.int64)
+        while True:
+            _advance(clock, cursor, status, self._generator_state, self._net.marking, self._net.place_capacity,
+                     self._stats_flag, self._stats_places, self._pre_ptr, self._pre_idx, self._pre_w,
+                     self._post_ptr, self._post_idx, self._post_w, self._net.transition_capacity,
+                     self._net.probability, self._net.is_conflict, self._delay_distro, self._prob_distro,
+                     self._unit_ptr, self._unit_members, self._inflight, self._due,
+                     self._heap_time, self._heap_owner, self._heap_size, self._distro_const, self._distro_loc,
+                     self._variates, self._var_pos, self._var_len,
+                     self._log_kind, self._log_owner, self._log_time, self._log_value, self._log_size,
+                     self._net.place_metrics, self._net.transition_metrics)
+            self._flush_log()
+            match _Status(status[0]):
+                case _Status.NEED_VARIATES:
+                    self._refill(status[1], status[2])
+                case _Status.LOG_FULL:
+                    # журнал статистики вже скинуто, прогін продовжується
+                    pass
+                case _Status.HEAP_FULL:
+                    self._grow_heap(status[2])
+                case _Status.CHECKPOINT:
+                    simulation._pass_checkpoint(self.checkpoint)
+                    clock[1], clock[2] = simulation.max_time, simulation._next_checkpoint
+                case _Status.DONE:
+                    break
+
+        self._write_back()
+        return float(clock[0])
+
+    def checkpoint(self, timer: float, reset: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Значення накопичувачів показників на момент часу (див. CompiledNet.checkpoint)
+        :param timer: поточний модельний час
+        :param reset: прапорець скидання накопичувачів
+        :return: інтеграли завантаження та кількості маркерів, що пройшли через елементи
+        """
+        return self._net.checkpoint(timer, reset, busy=self._inflight)
+
+    @staticmethod
+    def _to_csr(indices: List[np.ndarray], weights: List[np.ndarray]):
+        """
+        Перетворення ненульових елементів стовпців матриці у стислий рядковий формат
+        :return: масиви зміщень, номерів місць та кратностей
+        """
+        pointer = np.zeros(len(indices) + 1, dtype=np.int64)
+        pointer[1:] = np.cumsum([len(index) for index in indices])
+        concatenate = (lambda arrays: np.concatenate(arrays).astype(np.int64)) if indices else \
+            (lambda arrays: np.zeros(0, dtype=np.int64))
+        return pointer, concatenate(indices), concatenate(weights)
+
+    def _refill(self, k: int, size: int) -> NoReturn:
+        """
+        Поповнення буфера випадкових чисел розподілу k з пулу розподілу
+        :param k: номер розподілу
+        :param size: мінімальна кількість доступних значень
+        :return: None
+        """
+        if size > self._variates.shape[1]:
+            variates = np.zeros((self._variates.shape[0], max(2 * self._variates.shape[1], size)), dtype=np.float64)
+            variates[:, :self._variates.shape[1]] = self._variates
+            self._variates = variates
+        remaining = self._variates[k, self._var_pos[k]:self._var_len[k]].copy()
+        width = self._variates.shape[1]
+        self._variates[k, :len(remaining)] = remaining
+        self._variates[k, len(remaining):] = self._distros[k].get_values(width - len(remaining))
+        self._var_pos[k], self._var_len[k] = 0, width
+
+    def _grow_heap(self, size: int) -> NoReturn:
+        """
+        Збільшення місткості купи моментів звільнення
+        :param size: мінімальна місткість
+        :return: None
+        """
+        capacity = max(2 * self._heap_time.shape[0], size)
+        for name in ('_heap_time', '_heap_owner'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def _flush_log(self) -> NoReturn:
+        """
+        Перенесення записів журналу у буфери статистики місць та переходів
+        :return: None
+        """
+        size = self._log_size[0]
+        if size == 0:
+            return
+        # записи групуються за (вид, власник) стабільним сортуванням, що зберігає порядок записів у групі
+        width = max(len(self._net._places), len(self._net._transitions))
+        keys = self._log_kind[:size].astype(np.int64) * width + self._log_owner[:size]
+        order = np.argsort(keys, kind='stable')
+        keys, times, values = keys[order], self._log_time[:size][order], self._log_value[:size][order]
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1, [size]))
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            kind, owner = divmod(int(keys[first]), width)
+            statistics = self._net._statistics[owner] if kind <= _EXCLUDE else \
+                self._net._transitions[owner]._statistics
+            if statistics is not None:
+                statistics[_CELLS[kind]].extend(times[first:last], values[first:last])
+        self._log_size[0] = 0
+
+    def _write_back(self) -> NoReturn:
+        """
+        Перенесення стану прогону в елементи симуляції: маркування, моменти звільнення переходів,
+        стан генератора та невикористані випадкові числа
+        :return: None
+        """
+        self._net._write_back()
+        heap_time = self._heap_time[:self._heap_size[0]]
+        heap_owner = self._heap_owner[:self._heap_size[0]]
+        for j, transition in enumerate(self._net._transitions):
+            transition._storage = SortedList(heap_time[heap_owner == j].tolist())
+        generator = self._net._simulation.generator
+        generator._next_arrival = float(self._generator_state[0])
+        generator._stats = int(self._generator_state[4])
+        # календар симуляції містить моменти, що залишилися після прогону
+        self._net._simulation._time_moments.check_update(
+            heap_time.tolist() + ([generator._next_arrival] if self._generator_state[5] > 0 else []))
+        for k, distro in enumerate(self._distros):
+            if not self._distro_const[k] and self._var_pos[k] < self._var_len[k]:
+                distro.unread(self._variates[k, self._var_pos[k]:self._var_len[k]].tolist())
@@ -0,0 +1,158 @@
+import math
+from statistics import NormalDist
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+# мінімальна кількість груп, після якої може спрацювати правило автоматичної зупинки
+MIN_BATCHES = 10
+
+
+def student_quantile(probability: float, df: int) -> float:
+    """
+    Квантиль розподілу Стьюдента. Для df <= 4, де розклад Корніша-Фішера відносно квантиля нормального
+    розподілу дає занадто вузькі інтервали, квантиль обчислюється точно (явні формули для df = 1, 2, 4,
+    обернення функції розподілу для df = 3); для df >= 5 - розкладом (похибка менше 0.005 для рівнів до 0.995)
+    :param probability: рівень квантиля
+    :param df: кількість ступенів вільності
+    :return: значення квантиля
+    """
+    match df:
+        case 1:
+            return math.tan(math.pi * (probability - 0.5))
+        case 2:
+            return (2 * probability - 1) / math.sqrt(2 * probability * (1 - probability))
+        case 3:
+            return _student_quantile_3(probability)
+        case 4:
+            alpha = math.sqrt(4 * probability * (1 - probability))
+            q = math.cos(math.acos(alpha) / 3) / alpha
+            return math.copysign(2 * math.sqrt(q - 1), probability - 0.5)
+    z = NormalDist().inv_cdf(probability)
+    return z + (z ** 3 + z) / (4 * df) + \
+        (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2) + \
+        (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3) + \
+        (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * df ** 4)
+
+
+def _student_quantile_3(probability: float) -> float:
+    """
+    Квантиль розподілу Стьюдента з трьома ступенями вільності оберненням функції розподілу
+    F(t) = 1/2 + (t / (sqrt(3) (1 + t^2 / 3)) + arctan(t / sqrt(3))) / pi методом бісекції
+    :param probability: рівень квантиля
+    :return: значення квантиля
+    """
+    if probability < 0.5:
+        return -_student_quantile_3(1 - probability)
+    low, high = 0.0, 1.0
+    while _student_cdf_3(high) < probability:
+        low, high = high, 2 * high
+    for _ in range(100):
+        middle = (low + high) / 2
+        low, high = (middle, high) if _student_cdf_3(middle) < probability else (low, middle)
+    return (low + high) / 2
+
+
+def _student_cdf_3(t: float) -> float:
+    x = t / math.sqrt(3)
+    return 0.5 + (x / (1 + x * x) + math.atan(x)) / math.pi
+
+
+def confidence_interval(values: Sequence[float], confidence: float = 0.95) -> Dict[str, float]:
+    """
+    Довірчий інтервал для математичного сподівання за вибіркою незалежних значень
+    :param values: вибірка
+    :param confidence: довірча ймовірність
+    :return: словник із середнім значенням, половиною ширини інтервалу та обсягом вибірки
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2:
+        return {'mean': float(np.mean(values)) if len(values) else np.nan, 'half_width': np.nan, 'n': len(values)}
+    half_width = student_quantile((1 + confidence) / 2, len(values) - 1) * \
+        np.std(values, ddof=1) / np.sqrt(len(values))
+    return {'mean': float(np.mean(values)), 'half_width': float(half_width), 'n': len(values)}
+
+
+class BatchMeans:
+    """
+    Аналіз вихідних даних методом групових середніх. Інтервал [warmup, max_time] ділиться на групи
+    однакової тривалості; в кінці кожної групи передаються накопичені (від моменту завершення розгону)
+    інтеграли завантаження та кількості маркерів елементів, з яких обчислюються середні значення групи.
+    Зберігаються лише середні значення груп, тому пам'ять не залежить від тривалості прогону
+    """
+
+    def __init__(self, names: List[str], cells: List[str], warmup: float, max_time: float, batches: int,
+                 confidence: float = 0.95, precision: Union[float, None] = None, target: Union[str, None] = None):
+        """
+        Конструктор
+        :param names: ідентифікатори елементів
+        :param cells: назви показника завантаження кожного елемента ('mean_load' або 'mean_busy')
+        :param warmup: тривалість періоду розгону
+        :param max_time: максимальний модельний час
+        :param batches: кількість груп (при автоматичній зупинці - максимальна)
+        :param confidence: довірча ймовірність
+        :param precision: відносна половина ширини довірчого інтервалу, при досягненні якої прогін зупиняється
+        :param target: ідентифікатор елемента, за показником завантаження якого перевіряється точність
+        """
+        if batches < 2:
+            raise ValueError(f'At least 2 batches are required, got {batches}')
+        if precision is not None and target not in names:
+            raise ValueError(f'Stopping rule requires target element, got {target}')
+        self._names = names
+        self._cells = cells
+        self._confidence = confidence
+        self._precision = precision
+        self._target = names.index(target) if precision is not None else None
+        self._boundaries = np.linspace(warmup, max_time, batches + 1)
+        self._length = self._boundaries[1] - self._boundaries[0]
+        self._previous_areas = np.zeros(len(names))
+        self._previous_counts = np.zeros(len(names))
+        self._levels: List[np.ndarray] = []
+        self._throughputs: List[np.ndarray] = []
+
+    def __len__(self):
+        return len(self._levels)
+
+    def __repr__(self):
+        return f'BatchMeans: batches={len(self)}, length={self._length}'
+
+    @property
+    def checkpoints(self) -> List[float]:
+        """
+        Моменти завершення груп
+        :return: перелік моментів модельного часу
+        """
+        return self._boundaries[1:].tolist()
+
+    def record(self, areas: np.ndarray, counts: np.ndarray) -> bool:
+        """
+        Завершення чергової групи
+        :param areas: накопичені інтеграли завантаження елементів
+        :param counts: накопичені кількості маркерів, що пройшли через елементи
+        :return: True, якщо досягнуто заданої точності і прогін може бути зупинений
+        """
+        self._levels.append((areas - self._previous_areas) / self._length)
+        self._throughputs.append((counts - self._previous_counts) / self._length)
+        self._previous_areas, self._previous_counts = areas, counts
+        return self._is_precise()
+
+    def report(self) -> Dict[str, Dict]:
+        """
+        Оцінки показників елементів з довірчими інтервалами
+        :return: словник за ідентифікаторами елементів
+        """
+        levels, throughputs = np.array(self._levels).reshape(-1, len(self._names)), \
+            np.array(self._throughputs).reshape(-1, len(self._names))
+        return {name: {cell: confidence_interval(levels[:, i], self._confidence),
+                       'throughput': confidence_interval(throughputs[:, i], self._confidence)}
+                for i, (name, cell) in enumerate(zip(self._names, self._cells))}
+
+    def _is_precise(self) -> bool:
+        """
+        Перевірка правила зупинки за відносною половиною ширини довірчого інтервалу
+        :return: True, якщо точність досягнута
+        """
+        if self._precision is None or len(self) < MIN_BATCHES:
+            return False
+        estimate = confidence_interval([level[self._target] for level in self._levels], self._confidence)
+        return estimate['half_width'] <= self._precision * abs(estimate['mean'])
@@ -0,0 +1,266 @@
+import hashlib
+import itertools
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import partial
+from types import CodeType, ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.random import SeedSequence
+
+if TYPE_CHECKING:
+    from .simulation import Simulation
+
+
+def grid(**axes: Sequence) -> List[Dict]:
+    """
+    Повний факторний план: усі комбінації значень параметрів
+    :param axes: значення кожного параметра, наприклад capacity=[1, 2, 3]
+    :return: перелік точок плану
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def latin_hypercube(bounds: Dict[str, Tuple[float, float]], n: int, seed: Union[int, None] = None) -> List[Dict]:
+    """
+    План латинського гіперкуба: інтервал кожного параметра ділиться на n рівних частин,
+    і кожна частина використовується рівно в одній точці плану
+    :param bounds: межі (нижня, верхня) кожного параметра
+    :param n: кількість точок плану
+    :param seed: початкове значення генератора випадкових чисел
+    :return: перелік точок плану
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in bounds.items():
+        strata = (rng.permutation(n) + rng.random(n)) / n
+        columns[name] = low + strata * (high - low)
+    return [{name: float(column[i]) for name, column in columns.items()} for i in range(n)]
+
+
+class ResultCache:
+    """
+    Сховище результатів прогонів у каталозі: кожен результат зберігається в окремому файлі,
+    ім'я якого є хешем параметрів точки плану, моделі, функції відгуку та потоку випадкових чисел
+    """
+
+    def __init__(self, path: str):
+        """
+        Конструктор
+        :param path: каталог сховища (створюється, якщо не існує)
+        """
+        self._path = path
+        os.makedirs(path, exist_ok=True)
+
+    def __repr__(self):
+        return f'ResultCache: {self._path}'
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._file(key))
+
+    def get(self, key: str) -> Any:
+        with open(self._file(key), 'rb') as f:
+            return pickle.load(f)
+
+    def set(self, key: str, value: Any):
+        # запис через тимчасовий файл, щоб перерваний прогін не залишав пошкоджених результатів
+        temporary = f'{self._file(key)}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(value, f)
+        os.replace(temporary, self._file(key))
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self._path, f'{key}.pickle')
+
+
+def run_sweep(factory: Callable[..., "Simulation"], points: Sequence[Dict], replications: int = 1,
+              response: Union[Callable[[Dict], Any], None] = None, workers: Union[int, None] = None,
+              seeds: Union[int, None] = None, cache: Union[ResultCache, str, None] = None) -> List[Dict]:
+    """
+    Виконання плану експерименту: для кожної точки плану виконується задана кількість прогонів,
+    завдання (точка x прогон) розподіляються між процесами пулу. Прогін з номером r в усіх точках
+    отримує той самий потік випадкових чисел (спільні випадкові числа), тому результат прогону
+    не залежить від складу плану, і при повторному виконанні обчислюються лише відсутні в сховищі результати
+    :param factory: функція, що створює екземпляр симуляції з параметрами точки та аргументом seed
+     (має підтримувати pickle, наприклад, функція рівня модуля або functools.partial)
+    :param points: точки плану (словники значень параметрів factory)
+    :param replications: кількість прогонів у кожній точці
+    :param response: функція відгуку, що обчислюється зі статистики прогону; None - повна статистика
+    :param workers: кількість процесів; 1 - виконання в поточному процесі, None - кількість ядер
+    :param seeds: початкове значення, від якого породжуються потоки прогонів (обов'язкове при використанні
+     сховища: потоки без заданого значення щоразу нові, і збережені результати ніколи не використовувались би)
+    :param cache: сховище результатів або шлях до його каталогу; None - без збереження
+    :return: перелік записів {'point', 'replication', 'response', 'cached'} у порядку точок плану та прогонів
+    """
+    if cache is not None and seeds is None:
+        raise ValueError('Result cache requires explicit seeds')
+    cache = ResultCache(cache) if isinstance(cache, str) else cache
+    workers = os.cpu_count() if workers is None else workers
+    root = SeedSequence(seeds)
+    # ключ моделі обчислюється лише для сховища; якщо опис функцій неможливий, виконання зі сховищем відхиляється
+    model = None
+    if cache is not None:
+        model = _describe(factory), _describe(response) if response is not None else None
+
+    jobs, records = [], []
+    for point, replication in itertools.product(points, range(replications)):
+        seed_sequence = SeedSequence(root.entropy, spawn_key=(replication,))
+        key = _make_key(model, point, root.entropy, replication)
+        cached = cache is not None and key in cache
+        records.append({'point': point, 'replication': replication,
+                        'response': cache.get(key) if cached else None, 'cached': cached})
+        if not cached:
+            jobs.append((len(records) - 1, key, point, seed_sequence))
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(jobs) > 1 else nullcontext()) as executor:
+        if executor is None:
+            results = (_run_job(index, factory, point, seed_sequence, response)
+                       for index, _, point, seed_sequence in jobs)
+        else:
+            results = (future.result() for future in as_completed(
+                [executor.submit(_run_job, index, factory, point, seed_sequence, response)
+                 for index, _, point, seed_sequence in jobs]))
+        keys = {index: key for index, key, _, _ in jobs}
+        for index, value in results:
+            records[index]['response'] = value
+            if cache is not None:
+                cache.set(keys[index], value)
+    return records
+
+
+def run_branches(factory: Callable[[], "Simulation"], snapshot: bytes, branches: Sequence[Dict[str, Dict]],
+                 response: Union[Callable[[Dict], Any], None] = None, reseed: bool = False,
+                 workers: Union[int, None] = None, seeds: Union[int, None] = None) -> List[Any]:
+    """
+    Продовження прогону з одного збереженого стану (наприклад, після розгону) у декількох варіантах,
+    що виконуються паралельно. Стан передається процесам у двійковому вигляді (див. Simulation.snapshot),
+    тому розгін виконується лише один раз. Без зміни потоків усі варіанти продовжують ті самі потоки
+    випадкових чисел (спільні випадкові числа), і різниця відгуків зумовлена лише зміною параметрів
+    :param factory: функція без аргументів, що створює симуляцію з тією ж схемою та тривалістю продовження
+     (має підтримувати pickle)
+    :param snapshot: збережений стан
+    :param branches: зміни параметрів кожного варіанта у вигляді {str_id: {параметр: значення}}
+     (див. Simulation.modify); порожній словник - продовження без змін
+    :param response: функція відгуку; None - повна статистика
+    :param reseed: прапорець прив'язки кожного варіанта до власних потоків випадкових чисел
+    :param workers: кількість процесів; 1 - виконання в поточному процесі, None - кількість ядер
+    :param seeds: початкове значення, від якого породжуються потоки варіантів при reseed
+    :return: перелік статистики або відгуків у порядку варіантів
+    """
+    workers = os.cpu_count() if workers is None else workers
+    seed_sequences = SeedSequence(seeds).spawn(len(branches)) if reseed else [None] * len(branches)
+    jobs = [(index, factory, snapshot, modifications, seed_sequence, response)
+            for index, (modifications, seed_sequence) in enumerate(zip(branches, seed_sequences))]
+    results = [None] * len(branches)
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(jobs) > 1 else nullcontext()) as executor:
+        if executor is None:
+            completed = (_run_branch(*job) for job in jobs)
+        else:
+            completed = (future.result() for future in as_completed([executor.submit(_run_branch, *job)
+                                                                      for job in jobs]))
+        for index, value in completed:
+            results[index] = value
+    return results
+
+
+def _run_branch(index: int, factory: Callable[[], "Simulation"], snapshot: bytes, modifications: Dict[str, Dict],
+                seed_sequence: Union[SeedSequence, None],
+                response: Union[Callable[[Dict], Any], None]) -> Tuple[int, Any]:
+    """
+    Виконання одного варіанта продовження прогону
+    :return: пара (номер варіанта, статистика або відгук)
+    """
+    simulation = factory()
+    simulation.restore(snapshot)
+    if seed_sequence is not None:
+        simulation.reseed(seed_sequence)
+    for str_id, parameters in modifications.items():
+        simulation.modify(str_id, **parameters)
+    statistics = simulation.run()
+    return index, statistics if response is None else response(statistics)
+
+
+def _run_job(index: int, factory: Callable[..., "Simulation"], point: Dict, seed_sequence: SeedSequence,
+             response: Union[Callable[[Dict], Any], None]) -> Tuple[int, Any]:
+    """
+    Виконання одного прогону в точці плану
+    :return: пара (номер запису, статистика або відгук прогону)
+    """
+    statistics = factory(seed=seed_sequence, **point).run()
+    return index, statistics if response is None else response(statistics)
+
+
+def _describe(function: Callable) -> str:
+    """
+    Опис функції для ключа сховища: ім'я та хеш байт-коду з константами, значень аргументів
+    за замовчуванням, змінних замикання, аргументів functools.partial та стану об'єкта зв'язаного методу
+    (наприклад, CompiledModel.instantiate). Функції, що відрізняються лише константою, мають різні описи.
+    Якщо стан функції не підтримує pickle, опис неможливий і виникає ValueError
+    :param function: функція
+    :return: рядок опису
+    """
+    if isinstance(function, partial):
+        return f'{_describe(function.func)}{_fingerprint(function.args)}{_fingerprint(function.keywords)}'
+    name = f'{getattr(function, "__module__", "")}.{getattr(function, "__qualname__", repr(function))}'
+    owner = getattr(function, '__self__', None)
+    if owner is not None and not isinstance(owner, ModuleType):
+        return f'{_describe(function.__func__)}@{_fingerprint(owner)}' if hasattr(function, '__func__') \
+            else f'{name}@{_fingerprint(owner)}'
+    code = getattr(function, '__code__', None)
+    if code is None:
+        return f'{name}:{_pickle_digest(function)}'
+    closure = tuple(cell.cell_contents for cell in function.__closure__ or ())
+    state = _fingerprint((function.__defaults__, function.__kwdefaults__, closure))
+    return f'{name}:{_code_digest(code)}:{state}'
+
+
+def _code_digest(code: CodeType) -> str:
+    """
+    Хеш байт-коду, імен та констант (включно з вкладеними функціями)
+    :param code: об'єкт коду
+    :return: шістнадцятковий хеш
+    """
+    digest = hashlib.sha256(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for constant in code.co_consts:
+        digest.update((_code_digest(constant) if isinstance(constant, CodeType) else repr(constant)).encode())
+    return digest.hexdigest()[:16]
+
+
+def _fingerprint(value: Any) -> str:
+    """
+    Хеш значення для ключа сховища; функції описуються рекурсивно, інші значення - через pickle
+    :param value: значення
+    :return: шістнадцятковий хеш
+    """
+    if callable(value) and not isinstance(value, type):
+        description = _describe(value).encode()
+    elif isinstance(value, (tuple, list)):
+        description = repr([_fingerprint(item) for item in value]).encode()
+    elif isinstance(value, dict):
+        description = repr([(repr(key), _fingerprint(item)) for key, item in value.items()]).encode()
+    else:
+        return _pickle_digest(value)
+    return hashlib.sha256(description).hexdigest()[:16]
+
+
+def _pickle_digest(value: Any) -> str:
+    try:
+        description = pickle.dumps(value, protocol=4)
+    except (pickle.PicklingError, TypeError, AttributeError) as error:
+        raise ValueError(f'Cannot derive a cache key from {value!r}: {error}') from error
+    return hashlib.sha256(description).hexdigest()[:16]
+
+
+def _make_key(model: Tuple, point: Dict, entropy: int, replication: int) -> str:
+    """
+    Ключ результату прогону в сховищі
+    :return: шістнадцятковий хеш sha256
+    """
+    description = repr((model, sorted(point.items()), entropy, replication))
+    return hashlib.sha256(description.encode()).hexdigest()
@@ -12,12 +12,15 @@ class Generator(Element):
     Додає визначену кількість маркерів в позицію входу
     """
 
+    __slots__ = ('_n_per_arrival', '_next_arrival', '_distro', '_stats')
+
     def __init__(self, parent: "Simulation", time_distro: Union["Distribution", Dict],
                  n_per_arrival: int = 1, first_arrival: float = 0):
         super().__init__(parent)
         self._n_per_arrival = n_per_arrival
         self._next_arrival = first_arrival
-        self._distro = Distribution.from_dict(time_distro) if isinstance(time_distro, dict) else time_distro
+        self._distro = Distribution.from_dict(time_distro) if isinstance(time_distro, dict) else time_distro.copy()
+        parent.bind_distribution(self._distro, key='Generator')
         self._stats = 0
 
     def __repr__(self):
@@ -27,6 +30,10 @@ class Generator(Element):
     def total_arrivals(self):
         return self._stats
 
+    @property
+    def next_arrival(self):
+        return self._next_arrival
+
     @property
     def _output(self):
         return self._outputs[0][0] if self._outputs is not None else None
@@ -51,7 +58,7 @@ class Generator(Element):
             if self._output:
                 self._output.append(timer=timer, num=self._n_per_arrival)
             self._stats += self._n_per_arrival
-            self._next_arrival = timer + self._distro.get_value()
+            self._next_arrival = timer + max(self._distro.get_value(), 0)
             return [self._next_arrival]
         else:
             return None
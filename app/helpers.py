@@ -1,30 +1,99 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
-from numpy.random import default_rng
-
-from . import SEED
+import numpy as np
+from numpy.random import Generator
 
 if TYPE_CHECKING:
     from .models import Distribution
 
 
-class _TimeGenerator:
+# кількість випадкових чисел, що генеруються одним викликом NumPy при поповненні пулу розподілу
+VARIATE_BLOCK_SIZE = 4096
+
+# способи генерації випадкових чисел: 'direct' - генератори NumPy, 'inverse' - метод оберненої функції
+# від рівномірних чисел U, 'antithetic' - метод оберненої функції від антитетичних чисел 1 - U
+SAMPLING_MODES = ('direct', 'inverse', 'antithetic')
+
+# коефіцієнти раціонального наближення оберненої функції нормального розподілу (P. J. Acklam)
+_NORM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+           1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_NORM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+           6.680131188771972e+01, -1.328068155288572e+01)
+_NORM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+           -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_NORM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
 
-    _np_generator = default_rng() if SEED == -1 else default_rng(SEED)
 
-    @classmethod
-    def generate_time(cls, distro: "Distribution"):
+class _TimeGenerator:
+
+    @staticmethod
+    def generate_time(distro: "Distribution", rng: Generator, size: Union[int, None] = None,
+                      sampling: str = 'direct'):
+        if sampling != 'direct' and distro.type_of_distribution != 'const':
+            uniforms = rng.random(size=size if distro.type_of_distribution != 'erlang'
+                                  else (1 if size is None else size, int(distro.loc)))
+            uniforms = 1 - uniforms if sampling == 'antithetic' else uniforms
+            values = _TimeGenerator.inverse_cdf(distro, uniforms)
+            return values if size is not None else float(np.ravel(values)[0])
         match distro.type_of_distribution:
             case 'const':
-                return distro.loc
+                return distro.loc if size is None else np.full(size, distro.loc, dtype=np.float64)
             case 'norm':
-                return cls._np_generator.normal(loc=distro.loc, scale=distro.scale)
+                return rng.normal(loc=distro.loc, scale=distro.scale, size=size)
             case 'exp':
-                return cls._np_generator.exponential(scale=distro.scale)
+                return rng.exponential(scale=distro.scale, size=size)
             case 'uniform':
-                return cls._np_generator.uniform(low=distro.loc - distro.scale,
-                                                 high=distro.loc + distro.scale)
+                return rng.uniform(low=distro.loc - distro.scale,
+                                   high=distro.loc + distro.scale, size=size)
             case 'erlang':
-                return cls._np_generator.gamma(shape=distro.loc, scale=distro.scale)
+                return rng.gamma(shape=distro.loc, scale=distro.scale, size=size)
             case '_':
                 raise NotImplementedError
+
+    @staticmethod
+    def inverse_cdf(distro: "Distribution", uniforms: np.ndarray) -> np.ndarray:
+        """
+        Перетворення рівномірно розподілених чисел методом оберненої функції.
+        Монотонність перетворення забезпечує від'ємну кореляцію значень, отриманих від U та 1 - U
+        :param distro: розподіл
+        :param uniforms: числа з інтервалу [0, 1]; для розподілу Ерланга - матриця (кількість значень, порядок)
+        :return: значення випадкової величини
+        """
+        uniforms = np.clip(uniforms, np.finfo(np.float64).tiny, 1 - np.finfo(np.float64).epsneg)
+        match distro.type_of_distribution:
+            case 'norm':
+                return distro.loc + distro.scale * _TimeGenerator._normal_ppf(uniforms)
+            case 'exp':
+                return -distro.scale * np.log1p(-uniforms)
+            case 'uniform':
+                return distro.loc - distro.scale + 2 * distro.scale * uniforms
+            case 'erlang':
+                if distro.loc != int(distro.loc):
+                    raise NotImplementedError('Inverse sampling requires integer order of Erlang distribution')
+                return -distro.scale * np.log1p(-uniforms).sum(axis=1)
+            case _:
+                raise NotImplementedError
+
+    @staticmethod
+    def _normal_ppf(uniforms: np.ndarray) -> np.ndarray:
+        """
+        Обернена функція стандартного нормального розподілу (раціональне наближення, відносна похибка 1e-9)
+        :param uniforms: числа з інтервалу (0, 1)
+        :return: квантилі стандартного нормального розподілу
+        """
+        a, b, c, d = _NORM_A, _NORM_B, _NORM_C, _NORM_D
+        low, high = 0.02425, 1 - 0.02425
+        result = np.empty_like(uniforms)
+
+        central = (uniforms >= low) & (uniforms <= high)
+        q = uniforms[central] - 0.5
+        r = q * q
+        result[central] = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+            (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+
+        tails = ~central
+        q = np.sqrt(-2 * np.log(np.where(uniforms[tails] < low, uniforms[tails], 1 - uniforms[tails])))
+        values = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1)
+        result[tails] = np.where(uniforms[tails] < low, values, -values)
+        return result
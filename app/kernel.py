@@ -0,0 +1,248 @@
+from typing import TYPE_CHECKING, List, NoReturn, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .simulation import Simulation
+
+
+class CompiledNet:
+    """
+    Представлення мережі Петрі у вигляді матриць інцидентності pre / post (місця x переходи)
+    та вектора маркування. Облік маркерів виконується операціями над масивами,
+    без звернень до об'єктів місць. Моменти звільнення переходів, розподіли та буфери статистики
+    використовуються спільно з елементами симуляції, тому прогін дає ті самі результати, що і рушій 'scan'
+    """
+
+    def __init__(self, simulation: "Simulation"):
+        """
+        Конструктор. Компілює схему симуляції у масиви
+        :param simulation: екземпляр симуляції з встановленими зв'язками
+        """
+        self._simulation = simulation
+        self._places = list(simulation.places)
+        self._transitions = list(simulation.transitions)
+        place_index = {place: i for i, place in enumerate(self._places)}
+        transition_index = {transition: j for j, transition in enumerate(self._transitions)}
+
+        self.pre = np.zeros((len(self._places), len(self._transitions)), dtype=np.int64)
+        self.post = np.zeros((len(self._places), len(self._transitions)), dtype=np.int64)
+        for j, transition in enumerate(self._transitions):
+            for place, multiplicity in (transition._inputs or []):
+                self.pre[place_index[place], j] += multiplicity
+            for place, multiplicity in (transition._outputs or []):
+                self.post[place_index[place], j] += multiplicity
+
+        self.marking = np.array([place.load for place in self._places], dtype=np.int64)
+        self.place_capacity = np.array([place._capacity for place in self._places], dtype=np.float64)
+        self.transition_capacity = np.array([transition._capacity for transition in self._transitions],
+                                            dtype=np.float64)
+        self.probability = np.array([transition._probability for transition in self._transitions],
+                                    dtype=np.float64)
+        self.is_conflict = np.array([transition.is_conflict for transition in self._transitions], dtype=bool)
+
+        # ненульові елементи стовпців матриць для кожного переходу
+        self._pre_index = [np.flatnonzero(self.pre[:, j]) for j in range(len(self._transitions))]
+        self._pre_weight = [self.pre[index, j] for j, index in enumerate(self._pre_index)]
+        self._post_index = [np.flatnonzero(self.post[:, j]) for j in range(len(self._transitions))]
+        self._post_weight = [self.post[index, j] for j, index in enumerate(self._post_index)]
+
+        # послідовність активних елементів: None - генератор, інакше масив номерів переходів групи
+        self.units: List[Union[np.ndarray, None]] = []
+        for element in simulation._active_elements:
+            if element is simulation.generator:
+                self.units.append(None)
+            else:
+                group = element if isinstance(element, list) else [element]
+                self.units.append(np.array([transition_index[transition] for transition in group], dtype=np.int64))
+
+        generator_output = simulation.generator._output
+        self._generator_output = place_index[generator_output] if generator_output is not None else -1
+        # накопичувачі показників, зважених за часом (див. Place.metrics та Transition.metrics):
+        # для місць - інтеграл завантаження, момент останньої зміни, кількість прийнятих маркерів;
+        # для переходів - інтеграл зайнятих каналів, момент останньої зміни, кількість захоплених та звільнених
+        self.place_metrics = np.array([[place._load_area, place._last_change, place._entered]
+                                       for place in self._places], dtype=np.float64).reshape(-1, 3)
+        self.transition_metrics = np.array([[transition._busy_area, transition._last_change,
+                                             transition._entered, transition._completed]
+                                            for transition in self._transitions], dtype=np.float64).reshape(-1, 4)
+        self._statistics = [place._statistics for place in self._places]
+        self._stats_places = [i for i, place in enumerate(self._places) if place.save_stats]
+
+    def __repr__(self):
+        return f'CompiledNet: places={self.pre.shape[0]}, transitions={self.pre.shape[1]}'
+
+    def enabled(self) -> np.ndarray:
+        """
+        Вектор переходів, для яких маркування вхідних місць достатнє (marking >= pre[:, t])
+        :return: масив логічних значень за кількістю переходів
+        """
+        return np.all(self.marking[:, None] >= self.pre, axis=0)
+
+    def run(self) -> float:
+        """
+        Прогін симуляції на масивах
+        :return: останній оброблений момент модельного часу
+        """
+        simulation = self._simulation
+        time_moments = simulation._time_moments
+        timer = time_moments.pop()
+
+        while True:
+            for unit in self.units:
+                if unit is None:
+                    time_moments.check_update(self._generate(timer))
+                elif len(unit) == 1 and not self.is_conflict[unit[0]]:
+                    time_moments.check_update(x for x in self._fire(unit[0], timer) if x > timer)
+                else:
+                    # ітераційний цикл конфліктних переходів, як і в об'єктному рушії
+                    while True:
+                        fired = False
+                        for j in unit:
+                            if moments := self._fire(j, timer):
+                                time_moments.check_update(x for x in moments if x > timer)
+                                fired = True
+                                break
+                        if not fired:
+                            break
+
+            for i in self._stats_places:
+                self._statistics[i]['load'].append(timer, self.marking[i])
+
+            if time_moments.is_empty:
+                break
+            value = time_moments.pop()
+            if value > simulation._next_checkpoint:
+                simulation._pass_checkpoints(value, self.checkpoint)
+            if value > simulation.max_time:
+                time_moments.insert(value)
+                break
+            timer = value
+
+        self._write_back()
+        return timer
+
+    def checkpoint(self, timer: float, reset: bool = False,
+                   busy: Union[np.ndarray, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Значення накопичувачів показників місць та переходів на момент часу (див. Simulation._pass_checkpoint)
+        :param timer: поточний модельний час
+        :param reset: прапорець скидання накопичувачів (завершення періоду розгону)
+        :param busy: кількість зайнятих каналів переходів; за замовчуванням - розмір сховищ переходів
+        :return: інтеграли завантаження та кількості маркерів, що пройшли через елементи (спочатку місця, потім переходи)
+        """
+        busy = np.array([len(transition._storage) for transition in self._transitions]) if busy is None else busy
+        self._track_places(np.arange(len(self._places)), timer)
+        self.transition_metrics[:, 0] += busy * (timer - self.transition_metrics[:, 1])
+        self.transition_metrics[:, 1] = timer
+        areas = np.concatenate((self.place_metrics[:, 0], self.transition_metrics[:, 0]))
+        counts = np.concatenate((self.place_metrics[:, 2], self.transition_metrics[:, 3]))
+        if reset:
+            self.place_metrics[:, [0, 2]] = 0
+            self.transition_metrics[:, [0, 2, 3]] = 0
+        return areas, counts
+
+    def _generate(self, timer: float) -> List[float]:
+        """
+        Надходження маркерів від генератора
+        :param timer: поточний модельний час
+        :return: момент наступного надходження
+        """
+        generator = self._simulation.generator
+        if generator._next_arrival != timer:
+            return []
+        if self._generator_output >= 0:
+            self._append(np.array([self._generator_output]), np.array([generator._n_per_arrival]), timer)
+        generator._stats += generator._n_per_arrival
+        generator._next_arrival = timer + max(generator._distro.get_value(), 0)
+        return [generator._next_arrival]
+
+    def _fire(self, j: int, timer: float) -> List[float]:
+        """
+        Спрацювання переходу та звільнення маркерів, час затримки яких завершився
+        :param j: номер переходу
+        :param timer: поточний модельний час
+        :return: моменти звільнення захоплених маркерів
+        """
+        transition = self._transitions[j]
+        storage = transition._storage
+        free_cells = self.transition_capacity[j] - (len(storage) - storage.bisect_right(timer))
+        moments = []
+
+        index, weight = self._pre_index[j], self._pre_weight[j]
+        if free_cells > 0 and np.all(self.marking[index] >= weight) and \
+                (self.probability[j] >= 1 or
+                 transition._probability_distro.get_value() <= self.probability[j]):
+            quantity = int(min(np.min(self.marking[index] // weight), free_cells))
+            if self.is_conflict[j]:
+                quantity = min(quantity, 1)
+            if transition._statistics is not None:
+                transition._save_statistics(cell='holds', value=quantity, timer=timer)
+            self._track_transition(j, len(storage), timer)
+            self.transition_metrics[j, 2] += quantity
+            self._track_places(index, timer)
+            self.marking[index] -= quantity * weight
+            for i, value in zip(index, quantity * weight):
+                if self._statistics[i] is not None:
+                    self._statistics[i]['exclude'].append(timer, value)
+            moments = [timer + max(transition._time_distro.get_value(), 0) for _ in range(quantity)]
+            storage.update(moments)
+
+        first, last = storage.bisect_left(timer), storage.bisect_right(timer)
+        if (quantity := last - first) > 0:
+            self._track_transition(j, len(storage), timer)
+            self.transition_metrics[j, 3] += quantity
+            del storage[first:last]
+            if transition._statistics is not None:
+                transition._save_statistics(cell='releases', value=quantity, timer=timer)
+            self._append(self._post_index[j], quantity * self._post_weight[j], timer)
+        return moments
+
+    def _append(self, index: np.ndarray, values: np.ndarray, timer: float) -> NoReturn:
+        """
+        Додавання маркерів до місць з урахуванням їх місткості
+        :param index: номери місць
+        :param values: кількість маркерів для кожного місця
+        :param timer: поточний модельний час
+        :return: None
+        """
+        accepted = self.marking[index] < self.place_capacity[index]
+        self._track_places(index[accepted], timer)
+        self.marking[index[accepted]] += values[accepted]
+        self.place_metrics[index[accepted], 2] += values[accepted]
+        for i, value in zip(index[accepted], values[accepted]):
+            if self._statistics[i] is not None:
+                self._statistics[i]['append'].append(timer, value)
+
+    def _track_places(self, index: np.ndarray, timer: float) -> NoReturn:
+        """
+        Накопичення інтегралів завантаження місць до моменту зміни маркування
+        :param index: номери місць
+        :param timer: поточний модельний час
+        :return: None
+        """
+        self.place_metrics[index, 0] += self.marking[index] * (timer - self.place_metrics[index, 1])
+        self.place_metrics[index, 1] = timer
+
+    def _track_transition(self, j: int, busy: int, timer: float) -> NoReturn:
+        """
+        Накопичення інтегралу зайнятих каналів переходу до моменту зміни їх кількості
+        :param j: номер переходу
+        :param busy: кількість зайнятих каналів до зміни
+        :param timer: поточний модельний час
+        :return: None
+        """
+        self.transition_metrics[j, 0] += busy * (timer - self.transition_metrics[j, 1])
+        self.transition_metrics[j, 1] = timer
+
+    def _write_back(self) -> NoReturn:
+        """
+        Перенесення маркування та накопичувачів показників з масивів у елементи симуляції
+        :return: None
+        """
+        for place, load, (area, last_change, entered) in zip(self._places, self.marking, self.place_metrics):
+            place._load = int(load)
+            place._load_area, place._last_change, place._entered = float(area), float(last_change), int(entered)
+        for transition, (area, last_change, entered, completed) in zip(self._transitions, self.transition_metrics):
+            transition._busy_area, transition._last_change = float(area), float(last_change)
+            transition._entered, transition._completed = int(entered), int(completed)
@@ -1,28 +1,38 @@
+import heapq
 from abc import ABC
-from dataclasses import dataclass
-from typing import NoReturn, Any, Iterable, Literal, Dict, List, Union
+from dataclasses import dataclass, field
+from typing import NoReturn, Any, Iterable, Literal, Dict, List, Tuple, Union
 from typing import TYPE_CHECKING
 
+import numpy as np
 from dacite import from_dict
+from numpy.random import Generator, default_rng
 from sortedcontainers import SortedList
 
-from .helpers import _TimeGenerator
+from .helpers import _TimeGenerator, VARIATE_BLOCK_SIZE
 
 if TYPE_CHECKING:
     from .simulation import Simulation
 
 
-@dataclass
+@dataclass(slots=True)
 class Distribution:
     """
     Визначає закон розподілу випадкових величин за типом та параметрами розподілу
     Дозволяє отримати екземпляр класу за заданими параметрами
-     та згенерувати випадкове число за заданим законом розподілу
+     та згенерувати випадкове число за заданим законом розподілу.
+    Випадкові числа генеруються блоками у пул і видаються по одному; послідовність значень
+     збігається з поелементною генерацією з того самого генератора
     """
 
     type_of_distribution: Literal['const', 'uniform', 'norm', 'exp']
     loc: float = 1
     scale: float = 1
+    _rng: Union[Generator, None] = field(default=None, init=False, repr=False, compare=False)
+    _block_size: int = field(default=VARIATE_BLOCK_SIZE, init=False, repr=False, compare=False)
+    _pool: List[float] = field(default_factory=list, init=False, repr=False, compare=False)
+    _position: int = field(default=0, init=False, repr=False, compare=False)
+    _sampling: str = field(default='direct', init=False, repr=False, compare=False)
 
     def __repr__(self):
         return f"Distribution law: {self.type_of_distribution}, parameters: loc={self.loc}, scale={self.scale}"
@@ -37,12 +47,79 @@ class Distribution:
         # TODO convert Dict into TypedDict
         return from_dict(Distribution, data)
 
+    def copy(self) -> "Distribution":
+        """
+        Копія розподілу з тими самими параметрами, не прив'язана до генератора випадкових чисел.
+        Елементи зберігають копії переданих розподілів, тому один екземпляр можна використовувати
+        в декількох елементах та симуляціях без спільного потоку випадкових чисел
+        :return: екземпляр класу
+        """
+        return Distribution(self.type_of_distribution, self.loc, self.scale)
+
+    def bind(self, rng: Generator, block_size: int = VARIATE_BLOCK_SIZE, sampling: str = 'direct') -> NoReturn:
+        """
+        Прив'язує розподіл до генератора випадкових чисел та скидає пул згенерованих значень
+        :param rng: генератор випадкових чисел
+        :param block_size: кількість значень, що генеруються за одне поповнення пулу
+        :param sampling: спосіб генерації значень (див. SAMPLING_MODES)
+        :return: None
+        """
+        self._rng = rng
+        self._block_size = block_size
+        self._sampling = sampling
+        self._pool = []
+        self._position = 0
+
     def get_value(self) -> float:
         """
-        Генерує випадкове число на підставі характеристик розподілу
+        Генерує випадкове число на підставі характеристик розподілу.
+        Розподіл, не прив'язаний до симуляції, отримує власний генератор при першому виклику
         :return:
         """
-        return _TimeGenerator.generate_time(self)
+        if self.type_of_distribution == 'const':
+            return self.loc
+        if self._position == len(self._pool):
+            self._refill()
+        value = self._pool[self._position]
+        self._position += 1
+        return value
+
+    def get_values(self, size: int) -> np.ndarray:
+        """
+        Повертає наступні size значень пулу; послідовність збігається з послідовними викликами get_value
+        :param size: кількість значень
+        :return: масив значень
+        """
+        if self.type_of_distribution == 'const':
+            return np.full(size, self.loc, dtype=np.float64)
+        values = []
+        while len(values) < size:
+            if self._position == len(self._pool):
+                self._refill()
+            taken = self._pool[self._position:self._position + size - len(values)]
+            values.extend(taken)
+            self._position += len(taken)
+        return np.array(values, dtype=np.float64)
+
+    def unread(self, values: Iterable[float]) -> NoReturn:
+        """
+        Повертає невикористані значення на початок пулу, щоб вони були видані наступними викликами get_value
+        :param values: значення у порядку видачі
+        :return: None
+        """
+        self._pool = list(values) + self._pool[self._position:]
+        self._position = 0
+
+    def _refill(self) -> NoReturn:
+        """
+        Поповнення пулу блоком випадкових чисел
+        :return: None
+        """
+        if self._rng is None:
+            self.bind(default_rng())
+        self._pool = _TimeGenerator.generate_time(self, self._rng, size=self._block_size,
+                                                  sampling=self._sampling).tolist()
+        self._position = 0
 
     @staticmethod
     def make_sample_distribution(distro_type: Literal['const', 'uniform', 'norm', 'exp']):
@@ -127,6 +204,17 @@ class SortedQueue:
         """
         self._list.update(list_of_values)
 
+    def pop_until(self, value: Any) -> List:
+        """
+        Вилучення усіх початкових елементів, що не перевищують заданого значення
+        :param value: граничне значення
+        :return: перелік вилучених елементів у порядку зростання
+        """
+        index = self._list.bisect_right(value)
+        values = list(self._list[:index])
+        del self._list[:index]
+        return values
+
     def contains(self, value):
         """
         Перевірка входження значення
@@ -136,8 +224,221 @@ class SortedQueue:
         return value in self._list
 
 
+class HeapQueue:
+    """
+    Календар подій на основі двійкової купи. Супутня множина зберігає значення, що знаходяться в купі,
+    що дозволяє відкидати дублікати за O(1). На відміну від SortedQueue, значення в черзі завжди унікальні.
+    Має той самий інтерфейс, що і SortedQueue
+    """
+
+    def __init__(self, iterable: Iterable):
+        self._members: set = set(iterable)
+        self._heap: list = list(self._members)
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __repr__(self):
+        return f'HeapQueue: {sorted(self._heap)}'
+
+    @property
+    def is_empty(self):
+        return len(self._heap) == 0
+
+    @property
+    def values(self):
+        return sorted(self._heap)
+
+    def check_insert(self, value: Any) -> bool:
+        """
+        Додавання одного елементу з перевіркою дублювання
+        :param value: значення, що додається
+        :return: True, якщо елемент додано, False в іншому випадку
+        """
+        if value in self._members:
+            return False
+        self._members.add(value)
+        heapq.heappush(self._heap, value)
+        return True
+
+    def check_update(self, list_of_values: Iterable) -> NoReturn:
+        """
+        Додавання з перевіркою декількох елементів
+        :param list_of_values: список значень
+        :return: None
+        """
+        if list_of_values is not None:
+            for value in list_of_values:
+                if value not in self._members:
+                    self._members.add(value)
+                    heapq.heappush(self._heap, value)
+
+    def insert(self, value: Any) -> NoReturn:
+        """
+        Додавання елементу. Дублікати відкидаються
+        :param value: значення
+        :return:None
+        """
+        self.check_insert(value)
+
+    def pop(self) -> Any:
+        """
+        Вилучення початкового елементу
+        :return: повертає вилучений елемент
+        """
+        value = heapq.heappop(self._heap)
+        self._members.discard(value)
+        return value
+
+    def pop_until(self, value: Any) -> List:
+        """
+        Вилучення усіх початкових елементів, що не перевищують заданого значення
+        :param value: граничне значення
+        :return: перелік вилучених елементів у порядку зростання
+        """
+        values = []
+        while self._heap and self._heap[0] <= value:
+            values.append(self.pop())
+        return values
+
+    def update(self, list_of_values: Iterable) -> NoReturn:
+        """
+        Додавання декількох елементів. Дублікати відкидаються
+        :param list_of_values: перелік значень, що додаються
+        :return:
+        """
+        self.check_update(list_of_values)
+
+    def contains(self, value):
+        """
+        Перевірка входження значення
+        :param value: значення
+        :return: True, якщо значення знайдено, інакше False
+        """
+        return value in self._members
+
+
+# реалізації календаря подій, що можуть бути обрані при створенні симуляції
+SCHEDULERS = {'sorted': SortedQueue, 'heap': HeapQueue}
+
+
+@dataclass(frozen=True, slots=True)
+class Topology:
+    """
+    Незмінна структура мережі у номерах елементів (генератор, місця, переходи у порядку створення):
+    дуги кожного елемента, послідовність активних елементів з конфліктними групами та відповідність
+    місць номерам активних елементів, для яких вони є входами. Дозволяє створювати екземпляри симуляції
+    без розбору дуг та побудови послідовності обробки (див. Simulation.topology та CompiledModel)
+    """
+
+    inputs: Tuple[Tuple[Tuple[int, int], ...], ...]
+    outputs: Tuple[Tuple[Tuple[int, int], ...], ...]
+    sequence: Tuple[Union[int, Tuple[int, ...]], ...]
+    conflicts: Tuple[int, ...]
+    consumers: Tuple[Tuple[int, Tuple[int, ...]], ...]
+
+
+class StatisticsBuffer:
+    """
+    Буфер статистики у вигляді двох попередньо виділених колонок (час, значення).
+    При заповненні місткість подвоюється, тому додавання запису має амортизовану вартість O(1)
+    замість копіювання всього масиву на кожній події
+    """
+
+    def __init__(self, compact: bool = False, initial_capacity: int = 256):
+        """
+        Конструктор
+        :param compact: прапорець компактного зберігання (час - float64, значення - int32)
+        :param initial_capacity: початкова місткість буфера
+        """
+        self._time = np.empty(initial_capacity, dtype=np.float64)
+        self._value = np.empty(initial_capacity, dtype=np.int32 if compact else np.float64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return f'StatisticsBuffer: size={self._size}, capacity={self.capacity}, dtype={self._value.dtype}'
+
+    @property
+    def capacity(self):
+        return self._time.shape[0]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._time[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._value[:self._size]
+
+    def append(self, timer: float, value: Union[int, float]) -> NoReturn:
+        """
+        Додавання запису до буфера
+        :param timer: момент модельного часу
+        :param value: значення
+        :return: None
+        """
+        if self._size == self._time.shape[0]:
+            self._grow()
+        self._time[self._size] = timer
+        self._value[self._size] = value
+        self._size += 1
+
+    def extend(self, times: np.ndarray, values: np.ndarray) -> NoReturn:
+        """
+        Додавання декількох записів до буфера
+        :param times: моменти модельного часу
+        :param values: значення
+        :return: None
+        """
+        while self._size + len(times) > self._time.shape[0]:
+            self._grow()
+        self._time[self._size:self._size + len(times)] = times
+        self._value[self._size:self._size + len(times)] = values
+        self._size += len(times)
+
+    def as_array(self) -> np.ndarray:
+        """
+        Повертає записи у вигляді масиву розмірності (N, 2), де перша колонка - час, друга - значення
+        :return: масив статистики
+        """
+        return np.column_stack((self.times, self.values.astype(np.float64)))
+
+    def clear(self) -> NoReturn:
+        """
+        Видалення усіх записів зі збереженням виділеної пам'яті
+        :return: None
+        """
+        self._size = 0
+
+    def report(self) -> np.ndarray:
+        """
+        Статистика, що повертається після прогону симуляції
+        :return: масив статистики розмірності (N, 2)
+        """
+        return self.as_array()
+
+    def _grow(self) -> NoReturn:
+        """
+        Подвоєння місткості буфера
+        :return: None
+        """
+        capacity = max(2 * self.capacity, 1)
+        for name in ('_time', '_value'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+
 class Element(ABC):
 
+    # атрибути екземплярів зберігаються у слотах (без __dict__): менше пам'яті та швидший доступ
+    __slots__ = ('_parent', '_id', '_inputs', '_outputs', '_load', '_statistics')
+
     def __init__(self, parent: "Simulation", str_id: str = '', save_stats: bool = False):
         """
         Конструктор
@@ -1,8 +1,9 @@
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Callable, Dict, NoReturn, Sequence, Tuple, Union
 
 import numpy as np
 
 from .models import Element
+from .statistics import create_statistics
 
 if TYPE_CHECKING:
     from .simulation import Simulation
@@ -10,25 +11,41 @@ if TYPE_CHECKING:
 
 class Place(Element):
 
-    _num_id = 0
+    __slots__ = ('_num_id', '_capacity', '_on_append', '_load_area', '_last_change', '_entered')
+
+    # лічильник створених місць
+    _counter = 0
 
     def __init__(self, parent: "Simulation", capacity: int = np.inf, str_id: str = '', initial_load: int = 0,
-                 stats: bool = False):
+                 stats: bool = False, compact_stats: bool = False, stats_mode: str = 'full',
+                 stats_quantiles: Sequence[float] = (), trace: str = 'full', trace_size: int = 1000,
+                 trace_interval: float = 1.0):
         super().__init__(parent, str_id, stats)
 
-        self._num_id = Place._num_id
-        Place._num_id += 1
+        self._num_id = Place._counter
+        Place._counter += 1
 
         if initial_load > 0:
             self._load = initial_load
 
         self._capacity = capacity
-        self._statistics = {'load': np.array([]),
-                            'append': np.array([]),
-                            'exclude': np.array([])} if stats is True else None
+        # функція, що викликається після додавання маркерів (сповіщення переходів, для яких місце є входом)
+        self._on_append = None
+        # політика збереження ряду записів (див. TRACE_POLICIES); вибірка 'reservoir' використовує власний потік
+        # випадкових чисел, тому не змінює потоків розподілів моделі
+        self._statistics = create_statistics(('load', 'append', 'exclude'), stats_mode, compact_stats,
+                                             stats_quantiles, trace, trace_size, trace_interval,
+                                             parent._substream(f'{str_id}:trace')
+                                             if parent is not None and trace == 'reservoir' else None) \
+            if stats is True else None
+        # накопичувачі для показників, зважених за часом: інтеграл завантаження, момент останньої зміни
+        # завантаження та кількість прийнятих маркерів
+        self._load_area = 0.0
+        self._last_change = 0.0
+        self._entered = 0
 
     def __repr__(self):
-        return f'Place: {self._id}, capacity={self._capacity}, load={self.load}'
+        return f'Place: {self._id}, capacity={self._capacity}, load={self._load}'
 
     @property
     def element_type(self):
@@ -36,7 +53,7 @@ class Place(Element):
 
     @property
     def is_full(self):
-        return self.load == self._capacity
+        return self._load == self._capacity
 
     @property
     def load(self):
@@ -44,9 +61,12 @@ class Place(Element):
 
     @property
     def statistics(self):
-        return self._statistics
+        if self._statistics is None:
+            return None
+        return {cell: store.report() for cell, store in self._statistics.items()}
 
     def exclude(self, timer: int, num: int = 1):
+        self._track(timer)
         self._load -= num
         if self._load < 0:
             raise RuntimeError(f'Place {self.str_id} has negative load')
@@ -55,25 +75,68 @@ class Place(Element):
 
     def append(self, timer: float, num: int = 1):
         if self._load < self._capacity:
+            self._track(timer)
             self._load += num
+            self._entered += num
             if self._statistics is not None:
                 self._save_statistics(cell='append', value=num, timer=timer)
+            if self._on_append is not None:
+                self._on_append(self)
         else:
             return False
 
+    def subscribe(self, callback: Callable[["Place"], None]):
+        """
+        Встановлення функції, що викликається після кожного збільшення завантаження місця
+        :param callback: функція, що приймає місце як аргумент
+        :return: None
+        """
+        self._on_append = callback
+
+    def metrics(self, until: float, since: float = 0.0) -> Dict[str, float]:
+        """
+        Показники місця за інтервал [since, until]: середнє завантаження (довжина черги), інтенсивність
+        надходження маркерів та середній час перебування маркера за формулою Літтла W = L / lambda
+        :param until: момент закінчення спостереження
+        :param since: момент початку спостереження (скидання накопичувачів, див. _checkpoint)
+        :return: словник показників
+        """
+        duration = until - since
+        mean_load = (self._load_area + self._load * (until - self._last_change)) / duration \
+            if duration > 0 else np.nan
+        throughput = self._entered / duration if duration > 0 else np.nan
+        return {'mean_load': mean_load,
+                'throughput': throughput,
+                'mean_wait': mean_load / throughput if throughput > 0 else np.nan}
+
     def get_statistics(self):
-        return self._statistics
+        return self.statistics
 
     def process(self, timer: int):
         if self._statistics is not None:
-            self._save_statistics(cell='load', value=self.load, timer=timer)
+            self._statistics['load'].append(timer, self._load)
 
     def _save_statistics(self, cell: str, value: Union[int, float], timer: float):
-        if self._statistics[cell].size == 0:
-            self._statistics[cell] = np.array([timer, value]).reshape(1, -1)
-        else:
-            self._statistics[cell] = np.append(self._statistics[cell],
-                                               np.array([timer, value]).reshape(1, -1),
-                                               axis=0)
-
-
+        self._statistics[cell].append(timer, value)
+
+    def _track(self, timer: float) -> NoReturn:
+        """
+        Накопичення інтегралу завантаження до моменту зміни завантаження
+        :param timer: поточний модельний час
+        :return: None
+        """
+        self._load_area += self._load * (timer - self._last_change)
+        self._last_change = timer
+
+    def _checkpoint(self, timer: float, reset: bool = False) -> Tuple[float, int]:
+        """
+        Значення накопичувачів показників на момент часу
+        :param timer: поточний модельний час
+        :param reset: прапорець скидання накопичувачів (завершення періоду розгону)
+        :return: інтеграл завантаження та кількість прийнятих маркерів
+        """
+        self._track(timer)
+        values = self._load_area, self._entered
+        if reset:
+            self._load_area, self._entered = 0.0, 0
+        return values
@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.random import SeedSequence
+
+from .analysis import confidence_interval, student_quantile
+from .statistics import OnlineStatistics
+
+if TYPE_CHECKING:
+    from .simulation import Simulation
+
+
+def run_replications(factory: Callable[..., "Simulation"], n: int, workers: Union[int, None] = None,
+                     seeds: Union[int, SeedSequence, Sequence, None] = None,
+                     response: Union[Callable[[Dict], Any], None] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Виконує n незалежних прогонів імітаційної моделі, розподіляючи їх між процесами пулу.
+    Кожен прогін отримує власний потік випадкових чисел, породжений від спільного SeedSequence
+    :param factory: функція, що створює екземпляр симуляції з аргументом seed (має підтримувати pickle,
+     наприклад, функція рівня модуля або functools.partial)
+    :param n: кількість прогонів
+    :param workers: кількість процесів; 1 - виконання в поточному процесі, None - кількість ядер
+    :param seeds: початкове значення, SeedSequence або перелік з n значень для кожного прогону
+    :param response: функція відгуку, що обчислюється зі статистики прогону в процесі пулу
+     (замість передачі повної статистики між процесами)
+    :return: ітератор пар (номер прогону, статистика або відгук прогону) в порядку завершення прогонів
+    """
+    seed_sequences = _spawn_seed_sequences(n, seeds)
+    workers = os.cpu_count() if workers is None else workers
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()) as executor:
+        yield from _execute(executor, factory, enumerate(seed_sequences), response)
+
+
+def run_sequential_replications(factory: Callable[..., "Simulation"], response: Callable[[Dict], Any],
+                                precision: float, confidence: float = 0.95, min_replications: int = 10,
+                                max_replications: int = 1000, batch_size: Union[int, None] = None,
+                                workers: Union[int, None] = None,
+                                seeds: Union[int, SeedSequence, None] = None) -> Dict:
+    """
+    Послідовна процедура прогонів: прогони виконуються пакетами, після кожного пакета оновлюються
+    середнє та дисперсія відгуку, і процедура завершується, щойно відносна половина ширини довірчого
+    інтервалу не перевищує заданої точності. Відгуки пакета враховуються в порядку номерів прогонів,
+    тому результат не залежить від порядку завершення прогонів у пулі
+    :param factory: функція, що створює екземпляр симуляції з аргументом seed
+    :param response: функція відгуку (має підтримувати pickle); повертає число або послідовність чисел,
+     перше з яких є відгуком, за яким перевіряється точність
+    :param precision: відносна половина ширини довірчого інтервалу
+    :param confidence: довірча ймовірність
+    :param min_replications: мінімальна кількість прогонів
+    :param max_replications: максимальна кількість прогонів
+    :param batch_size: кількість прогонів у пакеті; за замовчуванням - кількість процесів
+    :param workers: кількість процесів; 1 - виконання в поточному процесі, None - кількість ядер
+    :param seeds: початкове значення або SeedSequence, від якого породжуються потоки прогонів
+    :return: словник з оцінкою відгуку (mean, half_width), кількістю прогонів n, ознакою досягнення точності
+     converged та відгуками усіх прогонів values
+    """
+    workers = os.cpu_count() if workers is None else workers
+    batch_size = max(batch_size or workers, 1)
+    root = seeds if isinstance(seeds, SeedSequence) else SeedSequence(seeds)
+    accumulator = OnlineStatistics()
+    values, half_width, converged = [], np.nan, False
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()) as executor:
+        while len(values) < max_replications and not converged:
+            jobs = enumerate(root.spawn(min(batch_size, max_replications - len(values))), start=len(values))
+            batch = dict(_execute(executor, factory, jobs, response))
+            for index in sorted(batch):
+                values.append(batch[index])
+                accumulator.append(index, np.ravel(batch[index])[0])
+            if accumulator.count > 1:
+                half_width = student_quantile((1 + confidence) / 2, accumulator.count - 1) * \
+                    np.sqrt(accumulator.variance / accumulator.count)
+            converged = accumulator.count >= min_replications and half_width <= precision * abs(accumulator.mean)
+
+    return {'mean': accumulator.mean,
+            'half_width': half_width,
+            'n': accumulator.count,
+            'converged': converged,
+            'values': np.array(values)}
+
+
+def run_paired_replications(factory_a: Callable[..., "Simulation"], factory_b: Callable[..., "Simulation"],
+                            response: Callable[[Dict], float], n: int, confidence: float = 0.95,
+                            workers: Union[int, None] = None,
+                            seeds: Union[int, SeedSequence, Sequence, None] = None) -> Dict:
+    """
+    Парне порівняння двох варіантів моделі зі спільними випадковими числами: в кожному прогоні обидва
+    варіанти отримують той самий SeedSequence, тому елементи з однаковими ідентифікаторами використовують
+    ті самі випадкові числа (див. Simulation.bind_distribution). Дисперсія різниці відгуків при цьому
+    менша, ніж при незалежних прогонах, і для тієї ж точності потрібно менше прогонів
+    :param factory_a: функція, що створює перший варіант моделі з аргументом seed
+    :param factory_b: функція, що створює другий варіант моделі з аргументом seed
+    :param response: функція відгуку (має підтримувати pickle)
+    :param n: кількість пар прогонів
+    :param confidence: довірча ймовірність
+    :param workers: кількість процесів; 1 - виконання в поточному процесі, None - кількість ядер
+    :param seeds: початкове значення, SeedSequence або перелік з n значень для кожної пари
+    :return: словник з оцінкою різниці відгуків b - a (mean, half_width, n) та відгуками варіантів a і b
+    """
+    seed_sequences = _spawn_seed_sequences(n, seeds)
+    workers = os.cpu_count() if workers is None else workers
+    pairs = {}
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()) as executor:
+        for variant, factory in enumerate((factory_a, factory_b)):
+            for index, value in _execute(executor, factory, enumerate(seed_sequences), response):
+                pairs.setdefault(index, [None, None])[variant] = value
+
+    values = np.array([pairs[index] for index in range(n)], dtype=np.float64).reshape(-1, 2)
+    return {**confidence_interval(values[:, 1] - values[:, 0], confidence),
+            'a': values[:, 0],
+            'b': values[:, 1]}
+
+
+def run_antithetic_replications(factory: Callable[..., "Simulation"], response: Callable[[Dict], float], n: int,
+                                confidence: float = 0.95, workers: Union[int, None] = None,
+                                seeds: Union[int, SeedSequence, Sequence, None] = None) -> Dict:
+    """
+    Прогони парами з антитетичними випадковими числами: перший прогін пари генерує значення методом
+    оберненої функції від чисел U, другий - від чисел 1 - U з того самого потоку. Відгуки пари від'ємно
+    корельовані, тому дисперсія середнього пари менша за дисперсію середнього двох незалежних прогонів
+    :param factory: функція, що створює екземпляр симуляції з аргументами seed та sampling
+    :param response: функція відгуку (має підтримувати pickle)
+    :param n: кількість пар прогонів
+    :param confidence: довірча ймовірність
+    :param workers: кількість процесів; 1 - виконання в поточному процесі, None - кількість ядер
+    :param seeds: початкове значення, SeedSequence або перелік з n значень для кожної пари
+    :return: словник з оцінкою відгуку за середніми пар (mean, half_width, n) та відгуками прогонів пар
+    """
+    seed_sequences = _spawn_seed_sequences(n, seeds)
+    workers = os.cpu_count() if workers is None else workers
+    pairs = {}
+
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()) as executor:
+        for variant, sampling in enumerate(('inverse', 'antithetic')):
+            jobs = enumerate(seed_sequences)
+            for index, value in _execute(executor, partial(factory, sampling=sampling), jobs, response):
+                pairs.setdefault(index, [None, None])[variant] = value
+
+    values = np.array([pairs[index] for index in range(n)], dtype=np.float64).reshape(-1, 2)
+    return {**confidence_interval(values.mean(axis=1), confidence),
+            'values': values}
+
+
+def _execute(executor: Union[Executor, None], factory: Callable[..., "Simulation"],
+             jobs: Iterable[Tuple[int, SeedSequence]],
+             response: Union[Callable[[Dict], Any], None]) -> Iterator[Tuple[int, Any]]:
+    """
+    Виконання прогонів у пулі процесів або, якщо пул не переданий, в поточному процесі
+    :param executor: пул процесів або None
+    :param factory: функція, що створює екземпляр симуляції
+    :param jobs: пари (номер прогону, SeedSequence прогону)
+    :param response: функція відгуку або None
+    :return: ітератор пар (номер прогону, статистика або відгук прогону) в порядку завершення прогонів
+    """
+    if executor is None:
+        for index, seed_sequence in jobs:
+            yield _run_replication(factory, index, seed_sequence, response)
+        return
+
+    futures = [executor.submit(_run_replication, factory, index, seed_sequence, response)
+               for index, seed_sequence in jobs]
+    for future in as_completed(futures):
+        yield future.result()
+
+
+def _spawn_seed_sequences(n: int, seeds: Union[int, SeedSequence, Sequence, None]) -> list:
+    """
+    Формує перелік незалежних SeedSequence для кожного прогону
+    :param n: кількість прогонів
+    :param seeds: початкове значення, SeedSequence або перелік значень для кожного прогону
+    :return: перелік з n екземплярів SeedSequence
+    """
+    if seeds is None or isinstance(seeds, int):
+        return SeedSequence(seeds).spawn(n)
+    if isinstance(seeds, SeedSequence):
+        return seeds.spawn(n)
+    if len(seeds) != n:
+        raise ValueError(f'Expected {n} seeds, got {len(seeds)}')
+    return [seed if isinstance(seed, SeedSequence) else SeedSequence(seed) for seed in seeds]
+
+
+def _run_replication(factory: Callable[..., "Simulation"], index: int, seed_sequence: SeedSequence,
+                     response: Union[Callable[[Dict], Any], None] = None) -> Tuple[int, Any]:
+    """
+    Виконання одного прогону. Симуляція отримує переданий SeedSequence як джерело випадкових чисел
+    :param factory: функція, що створює екземпляр симуляції
+    :param index: номер прогону
+    :param seed_sequence: SeedSequence прогону
+    :param response: функція відгуку або None
+    :return: пара (номер прогону, статистика або відгук прогону)
+    """
+    statistics = factory(seed=seed_sequence).run()
+    return index, statistics if response is None else response(statistics)
@@ -1,29 +1,110 @@
+import hashlib
+import heapq
+import io
+import json
 import logging
-from collections import Counter
-from typing import List, Tuple, Dict, NoReturn, Union, Any
-
+import uuid
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Callable, Iterator, List, Tuple, Dict, NoReturn, Union, Any
+
+import numpy as np
+from numpy.random import SeedSequence, default_rng
+from sortedcontainers import SortedList
+
+from . import SEED
+from .analysis import BatchMeans
+from .accelerated import AcceleratedNet, check_model, is_accelerated_available
 from .generator import Generator
-from .models import SortedQueue
+from .helpers import SAMPLING_MODES, VARIATE_BLOCK_SIZE
+from .kernel import CompiledNet
+from .models import SCHEDULERS, Distribution, Topology
 from .place import Place
+from .statistics import STATS_MODES, ColumnarStore, ColumnSink
 from .transition import Transition
 
 
+# рушії прогону: 'scan' - обробка усіх елементів у кожен момент часу, 'event' - лише елементів, що змінилися,
+# 'kernel' - прогін на матрицях інцидентності (див. CompiledNet), 'numba' - скомпільований цикл подій
+# (див. AcceleratedNet) з поверненням до 'event' для моделей, які він не підтримує
+ENGINES = ('scan', 'event', 'kernel', 'numba')
+
+
+@lru_cache(maxsize=None)
+def _key_digest(key: str) -> int:
+    """
+    Числове значення ключа потоку випадкових чисел (кешується, оскільки ключі повторюються в кожному екземплярі)
+    :param key: ключ потоку
+    :return: перші 8 байт хешу sha256 ключа
+    """
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'little')
+
+
 class Simulation:
 
     # TODO Extract scheme from Simulation. Use it as a mediator.
 
-    def __init__(self, max_time: float, generator: Dict, places: List[Dict], transitions: List[Dict], arcs: List[Tuple]):
+    def __init__(self, max_time: float, generator: Dict, places: List[Dict], transitions: List[Dict], arcs: List[Tuple],
+                 seed: Union[int, SeedSequence, None] = None, variate_block_size: int = VARIATE_BLOCK_SIZE,
+                 scheduler: str = 'heap', engine: str = 'event', stats_mode: str = 'full',
+                 sampling: str = 'direct', store: Union[ColumnarStore, str, None] = None,
+                 run_id: Union[str, None] = None, topology: Union[Topology, None] = None):
         # призначення полів екземпляру класу
         self._max_time: float = max_time
-        self._time_moments = SortedQueue(iterable=[0])
+        # корінь потоків випадкових чисел елементів (див. bind_distribution); SEED пакету - значення за замовчуванням
+        seed = seed if seed is not None or SEED == -1 else SEED
+        self._seed_sequence: SeedSequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        self._variate_block_size = variate_block_size
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f'Unknown sampling mode {sampling}, expected one of {list(SAMPLING_MODES)}')
+        self._sampling = sampling
+        if scheduler not in SCHEDULERS:
+            raise ValueError(f'Unknown scheduler {scheduler}, expected one of {list(SCHEDULERS)}')
+        if engine not in ENGINES:
+            raise ValueError(f'Unknown engine {engine}, expected one of {list(ENGINES)}')
+        self._engine = engine
+        if stats_mode not in STATS_MODES:
+            raise ValueError(f'Unknown statistics mode {stats_mode}, expected one of {list(STATS_MODES)}')
+        self._stats_mode = stats_mode
         self._generator, self._places, self._transitions = self._create_elements(generator, places, transitions)
+        # колонкове сховище статистики: записи елементів дописуються у файли прогону під час прогону
+        if store is not None and stats_mode != 'full':
+            raise ValueError(f'Columnar store requires full statistics mode, got {stats_mode}')
+        self._store: Union[ColumnarStore, None] = ColumnarStore(store) if isinstance(store, str) else store
+        # ідентифікатор прогону не залежить від seed: прогони зі спільними випадковими числами не мають збігатися
+        self._run_id: str = run_id if run_id is not None else uuid.uuid4().hex[:16]
+        # колонки створюються на початку кожного прогону (див. _attach_store)
+        self._columns: Dict[str, Dict[str, ColumnSink]] = {}
+        # останній оброблений момент модельного часу
+        self._timer: float = 0.0
+        self._time_moments = SCHEDULERS[scheduler](iterable={0, self._generator.next_arrival})
         self._has_conflict_transitions: bool = False
         self._active_elements = None
-
-        # ініціалізація моделі
-        self._check_and_modify_elements()
-        self._set_connections(arcs)
-        self._generate_iteration_sequence()
+        self._stats_places = [place for place in self._places if place.save_stats]
+
+        # стан подієвого рушія: активні елементи поточного та наступного кроку,
+        # елементи із запланованими на момент часу подіями
+        self._current_unit: int = 0
+        self._step_queue: List[int] = []
+        self._step_units: set = set()
+        self._next_units: set = set()
+        self._due_units: Dict[float, set] = {}
+        self._consumers: Dict[Place, List[int]] = {}
+
+        # аналіз вихідних даних: тривалість періоду розгону, групові середні,
+        # контрольні точки (завершення розгону та груп), в яких зчитуються накопичувачі показників
+        self._warmup: float = 0.0
+        self._batch_means: Union[BatchMeans, None] = None
+        self._checkpoints: deque = deque()
+        self._next_checkpoint: float = np.inf
+
+        # ініціалізація моделі; готова структура (див. topology) замінює розбір дуг та побудову послідовності
+        if topology is not None:
+            self._apply_topology(topology)
+        else:
+            self._check_and_modify_elements()
+            self._set_connections(arcs)
+            self._generate_iteration_sequence()
 
     def __repr__(self):
         return f'Simulation with duration={self.max_time}, number of places: {len(self.places)},' \
@@ -50,57 +131,422 @@ class Simulation:
     def transitions(self):
         return self._transitions
 
-    def run(self):
+    def run(self, warmup: float = 0.0, batches: Union[int, None] = None, confidence: float = 0.95,
+            precision: Union[float, None] = None, target: Union[str, None] = None):
         """
         Основний метод, що виконує прогін симуляції
+        :param warmup: тривалість періоду розгону; статистика та показники до цього моменту відкидаються
+        :param batches: кількість груп методу групових середніх на інтервалі [warmup, max_time]
+        :param confidence: довірча ймовірність інтервалів групових середніх
+        :param precision: відносна половина ширини довірчого інтервалу, при досягненні якої прогін
+         завершується в кінці поточної групи (потребує batches та target)
+        :param target: ідентифікатор елемента для правила зупинки, наприклад 'Place_Queue'
         :return: повертає статистику прогону симуляції
         """
         logging.info('Simulation has started')
-        counter = 1
+        staging = self._attach_store() if self._store is not None else None
+        self._set_checkpoints(warmup, batches, confidence, precision, target)
+        match self._engine:
+            case 'event':
+                timer = self._run_event()
+            case 'kernel':
+                timer = self.compile_net().run()
+            case 'numba':
+                timer = self._run_accelerated()
+            case _:
+                timer = self._run_scan()
+
+        # контрольні точки після останньої події: стан елементів до кінця інтервалу не змінюється
+        self._pass_checkpoints(np.inf, self._checkpoint_elements)
+        self._timer = timer
+        if self._store is not None:
+            self._store.commit(self._run_id, self._columns, staging, timer=timer, max_time=self._max_time)
+
+        print(f'Total time = {timer}')
+        print(f'Total entities arrived: {self._generator.total_arrivals}')
+
+        response = self._return_statistics()
+        response['metrics'] = self._return_metrics()
+        if self._batch_means is not None:
+            response['batch_means'] = self._batch_means.report()
+        return response
+
+    def snapshot(self) -> bytes:
+        """
+        Збереження стану симуляції після прогону: маркування місць, моментів звільнення переходів, календаря подій,
+        стану генератора, накопичувачів показників та стану генераторів випадкових чисел разом з
+        невикористаними значеннями пулів розподілів. Статистика елементів не зберігається
+        :return: стан у двійковому форматі (стиснутий архів NumPy)
+        """
+        distributions = dict(self._distributions())
+        storages = [np.asarray(transition.storage, dtype=np.float64) for transition in self._transitions]
+        pools = [np.asarray(distro._pool[distro._position:], dtype=np.float64) for distro in distributions.values()]
+        meta = {'version': 1,
+                'timer': self._timer,
+                'places': [place.str_id for place in self._places],
+                'transitions': [transition.str_id for transition in self._transitions],
+                'generator': {'next_arrival': self._generator._next_arrival, 'total': self._generator._stats},
+                'distributions': {key: distro._rng.bit_generator.state for key, distro in distributions.items()}}
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer,
+                            meta=np.array(json.dumps(meta)),
+                            loads=np.array([place.load for place in self._places], dtype=np.int64),
+                            place_metrics=np.array([[place._load_area, place._last_change, place._entered]
+                                                    for place in self._places], dtype=np.float64),
+                            storages=np.concatenate(storages) if storages else np.zeros(0),
+                            storage_sizes=np.array([len(storage) for storage in storages], dtype=np.int64),
+                            transition_metrics=np.array([[t._busy_area, t._last_change, t._entered, t._completed]
+                                                         for t in self._transitions], dtype=np.float64),
+                            calendar=np.asarray(self._time_moments.values, dtype=np.float64),
+                            pools=np.concatenate(pools) if pools else np.zeros(0),
+                            pool_sizes=np.array([len(pool) for pool in pools], dtype=np.int64))
+        return buffer.getvalue()
+
+    def restore(self, data: bytes) -> NoReturn:
+        """
+        Відновлення стану, збереженого методом snapshot, у симуляції з тією ж схемою.
+        Наступний виклик run продовжує прогін з відновленого стану до max_time цієї симуляції
+        :param data: стан у двійковому форматі
+        :return: None
+        """
+        with np.load(io.BytesIO(data)) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+        meta = json.loads(str(arrays['meta']))
+        if meta['places'] != [place.str_id for place in self._places] or \
+                meta['transitions'] != [transition.str_id for transition in self._transitions]:
+            raise ValueError('Snapshot was made for a different model')
+
+        for place, load, (area, last_change, entered) in zip(self._places, arrays['loads'], arrays['place_metrics']):
+            place._load = int(load)
+            place._load_area, place._last_change, place._entered = float(area), float(last_change), int(entered)
+        storages = np.split(arrays['storages'], np.cumsum(arrays['storage_sizes'])[:-1])
+        for transition, storage, (area, last_change, entered, completed) in \
+                zip(self._transitions, storages, arrays['transition_metrics']):
+            transition._storage = SortedList(storage.tolist())
+            transition._busy_area, transition._last_change = float(area), float(last_change)
+            transition._entered, transition._completed = int(entered), int(completed)
+
+        self._generator._next_arrival = meta['generator']['next_arrival']
+        self._generator._stats = meta['generator']['total']
+        self._time_moments = type(self._time_moments)(iterable=arrays['calendar'].tolist())
+        self._timer = meta['timer']
+
+        distributions = dict(self._distributions())
+        pools = np.split(arrays['pools'], np.cumsum(arrays['pool_sizes'])[:-1])
+        for (key, state), pool in zip(meta['distributions'].items(), pools):
+            if key not in distributions:
+                raise ValueError(f'Distribution {key} is not found in the model')
+            distributions[key]._rng.bit_generator.state = state
+            distributions[key]._pool, distributions[key]._position = pool.tolist(), 0
+
+    def modify(self, str_id: str, **parameters) -> NoReturn:
+        """
+        Зміна параметрів елемента схеми, наприклад, перед продовженням прогону з відновленого стану.
+        Новий розподіл затримки використовує потік випадкових чисел розподілу, який він замінює
+        :param str_id: символьний ідентифікатор елемента ('Generator' для генератора)
+        :param parameters: нові значення параметрів: capacity (місця та переходи), prob (переходи),
+         time_distro (переходи та генератор), n_per_arrival (генератор)
+        :return: None
+        """
+        element = self._get_element_by_id(str_id)
+        for name, value in parameters.items():
+            match name:
+                case 'capacity' if isinstance(element, (Place, Transition)):
+                    element._capacity = value
+                case 'prob' if isinstance(element, Transition):
+                    if element._probability_distro._rng is None:
+                        self.bind_distribution(element._probability_distro, key=f'{str_id}:probability')
+                    element._probability = value
+                case 'time_distro' if isinstance(element, (Transition, Generator)):
+                    attribute = '_distro' if isinstance(element, Generator) else '_time_distro'
+                    distro = Distribution.from_dict(value) if isinstance(value, dict) else value.copy()
+                    if (rng := getattr(element, attribute)._rng) is not None:
+                        distro.bind(rng, self._variate_block_size, self._sampling)
+                    else:
+                        # розподіл, що замінює сталу затримку, отримує потік за ключем елемента
+                        self.bind_distribution(distro, key=str_id)
+                    setattr(element, attribute, distro)
+                case 'n_per_arrival' if isinstance(element, Generator):
+                    element._n_per_arrival = value
+                case _:
+                    raise ValueError(f'Parameter {name} of element {str_id} can not be modified')
+
+    def reseed(self, seed: Union[int, SeedSequence, None]) -> NoReturn:
+        """
+        Прив'язка розподілів елементів до нових потоків випадкових чисел, наприклад, для розгалуження
+        незалежних продовжень прогону з відновленого стану
+        :param seed: початкове значення або SeedSequence
+        :return: None
+        """
+        self._seed_sequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        for key, distro in self._distributions():
+            self.bind_distribution(distro, key=key)
+
+    def _distributions(self) -> Iterator[Tuple[str, Distribution]]:
+        """
+        Розподіли елементів, прив'язані до потоків випадкових чисел, з ключами потоків
+        :return: ітератор пар (ключ, розподіл)
+        """
+        distributions = [('Generator', self._generator._distro)]
+        for transition in self._transitions:
+            distributions.append((transition.str_id, transition._time_distro))
+            if transition._probability < 1:
+                distributions.append((f'{transition.str_id}:probability', transition._probability_distro))
+        yield from ((key, distro) for key, distro in distributions if distro._rng is not None)
+
+    def _set_checkpoints(self, warmup: float, batches: Union[int, None], confidence: float,
+                         precision: Union[float, None], target: Union[str, None]) -> NoReturn:
+        """
+        Підготовка контрольних точок прогону: моменту завершення розгону та моментів завершення груп
+        :return: None
+        """
+        if not 0 <= warmup < self._max_time:
+            raise ValueError(f'Warmup must be in [0, max_time), got {warmup}')
+        if precision is not None and batches is None:
+            raise ValueError('Stopping rule requires batches')
+        self._warmup = warmup
+        self._batch_means = BatchMeans(names=[f'{element.element_type}_{element.str_id}' for element in self.elements],
+                                       cells=['mean_load' if isinstance(element, Place) else 'mean_busy'
+                                              for element in self.elements],
+                                       warmup=warmup, max_time=self._max_time, batches=batches,
+                                       confidence=confidence, precision=precision, target=target) \
+            if batches is not None else None
+        self._checkpoints = deque(([warmup] if warmup > 0 else []) +
+                                  (self._batch_means.checkpoints if self._batch_means is not None else []))
+        self._next_checkpoint = self._checkpoints[0] if self._checkpoints else np.inf
+
+    def _pass_checkpoints(self, value: float, checkpoint: Callable) -> NoReturn:
+        """
+        Обробка контрольних точок, що передують наступному моменту модельного часу
+        :param value: наступний момент модельного часу
+        :param checkpoint: функція рушія, що повертає накопичувачі показників на момент часу
+        :return: None
+        """
+        while self._checkpoints and self._checkpoints[0] < value:
+            self._pass_checkpoint(checkpoint)
+
+    def _pass_checkpoint(self, checkpoint: Callable) -> NoReturn:
+        """
+        Обробка найближчої контрольної точки: завершення розгону скидає статистику та накопичувачі показників,
+        завершення групи передає накопичувачі до групових середніх. Якщо досягнуто заданої точності,
+        максимальний час прогону зменшується до моменту завершення групи
+        :param checkpoint: функція рушія, що повертає накопичувачі показників на момент часу
+        :return: None
+        """
+        moment = self._checkpoints.popleft()
+        if self._warmup > 0 and moment == self._warmup:
+            checkpoint(moment, reset=True)
+            self._clear_statistics()
+        elif self._batch_means.record(*checkpoint(moment)):
+            self._max_time = moment
+            self._checkpoints.clear()
+        self._next_checkpoint = self._checkpoints[0] if self._checkpoints else np.inf
+
+    def _checkpoint_elements(self, timer: float, reset: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Накопичувачі показників місць та переходів на момент часу для рушіїв, що працюють з елементами
+        :param timer: поточний модельний час
+        :param reset: прапорець скидання накопичувачів
+        :return: інтеграли завантаження та кількості маркерів, що пройшли через елементи
+        """
+        areas, counts = zip(*(element._checkpoint(timer, reset) for element in self.elements))
+        return np.array(areas, dtype=np.float64), np.array(counts, dtype=np.float64)
+
+    def _clear_statistics(self) -> NoReturn:
+        """
+        Видалення статистики, зібраної в період розгону
+        :return: None
+        """
+        for element in self.elements:
+            if element.save_stats:
+                for store in element._statistics.values():
+                    store.clear()
+
+    def _run_scan(self) -> float:
+        """
+        Прогін симуляції з обробкою усіх активних елементів у кожен момент модельного часу
+        :return: останній оброблений момент модельного часу
+        """
         timer = self._time_moments.pop()
 
         while True:
             logging.debug(f'Time = {timer}')
 
             for element in self._active_elements:
+                self._time_moments.check_update(self._process_unit(element, timer))
 
-                if isinstance(element, list):
-                    # виконання ітераційного циклу конфліктних переходів
-                    # у циклі з пост умовою
-                    while True:
-                        moments_sequence = []
-                        for conflict_element in element:
-                            if (moment := conflict_element.process(timer=timer)) is not None:
-                                moments_sequence.append(moment)
-                                break
+            for place in self._stats_places:
+                place.process(timer)
 
-                        if len(moments_sequence) == 0:
-                            break
-                    self._time_moments.check_update(list(filter(lambda x: x > timer, moments_sequence)))
+            if self._time_moments.is_empty:
+                return timer
+            value = self._time_moments.pop()
+            if value > self._next_checkpoint:
+                self._pass_checkpoints(value, self._checkpoint_elements)
+            if value > self._max_time:
+                # момент за межею прогону залишається в календарі для продовження прогону (див. snapshot)
+                self._time_moments.insert(value)
+                return timer
+            timer = value
+
+    def _run_event(self) -> float:
+        """
+        Прогін симуляції з обробкою лише тих елементів, стан яких міг змінитися:
+        переходів, вхідні місця яких отримали маркери, переходів та генератора із запланованими подіями,
+        а також переходів, що не спрацювали лише через ймовірність спрацювання.
+        Порядок обробки елементів у межах кроку збігається з порядком режиму повного перегляду
+        :return: останній оброблений момент модельного часу
+        """
+        units = self._active_elements
+        # на першому кроці обробляються усі елементи (початкове маркування або відновлений стан);
+        # події генератора та моменти звільнення, що вже знаходяться в переходах, прив'язуються до елементів
+        self._next_units = set(range(len(units)))
+        self._due_units = {self._generator.next_arrival: {0}}
+        for index, unit in enumerate(units):
+            for transition in (unit if isinstance(unit, list) else [unit] if isinstance(unit, Transition) else []):
+                for moment in transition.storage:
+                    self._due_units.setdefault(moment, set()).add(index)
+        for place in self._consumers:
+            place.subscribe(self._activate_consumers)
+        timer = self._time_moments.pop()
 
-                else:
-                    # виконання процесу генератора / звичайного переходу
-                    if (values := element.process(timer=timer)) is not None:
-                        self._time_moments.check_update(list(filter(lambda x: x > timer, values)))
-                    pass
+        while True:
+            logging.debug(f'Time = {timer}')
 
-            for place in self._places:
+            self._step_units = self._next_units | self._due_units.pop(timer, set())
+            self._step_queue = list(self._step_units)
+            heapq.heapify(self._step_queue)
+            self._next_units = set()
+
+            while self._step_queue:
+                self._current_unit = index = heapq.heappop(self._step_queue)
+                unit = units[index]
+                if moments := self._process_unit(unit, timer):
+                    self._time_moments.check_update(moments)
+                    for moment in moments:
+                        self._due_units.setdefault(moment, set()).add(index)
+                if self._is_unit_enabled(unit, timer):
+                    self._next_units.add(index)
+            self._current_unit = len(units)
+
+            for place in self._stats_places:
                 place.process(timer)
 
-            if not self._time_moments.is_empty:
+            if self._time_moments.is_empty:
+                break
+            value = self._time_moments.pop()
+            if value > self._next_checkpoint:
+                self._pass_checkpoints(value, self._checkpoint_elements)
+            if value > self._max_time:
+                self._time_moments.insert(value)
+                break
+            timer = value
+
+        for place in self._consumers:
+            place.subscribe(None)
+        return timer
+
+    def _run_accelerated(self) -> float:
+        """
+        Прогін симуляції прискореним рушієм. Якщо numba недоступна або модель містить елементи,
+        які рушій не підтримує, прогін виконується рушієм 'event'
+        :return: останній оброблений момент модельного часу
+        """
+        reasons = check_model(self) if is_accelerated_available() else ['numba is not installed']
+        if reasons:
+            logging.warning(f'Accelerated engine is not used: {"; ".join(reasons)}. Falling back to event engine')
+            return self._run_event()
+        return AcceleratedNet(self.compile_net()).run()
 
-                if (value := self._time_moments.pop()) > self._max_time:
+    def _process_unit(self, element: Union[Generator, Transition, List[Transition]], timer: float) -> List[float]:
+        """
+        Обробка одного активного елемента (генератора, переходу або групи конфліктних переходів)
+        :param element: активний елемент
+        :param timer: поточний модельний час
+        :return: майбутні моменти модельного часу, згенеровані елементом
+        """
+        moments_sequence = []
+        if isinstance(element, list):
+            # виконання ітераційного циклу конфліктних переходів
+            # у циклі з пост умовою; моменти звільнення накопичуються за усі ітерації
+            while True:
+                fired = False
+                for conflict_element in element:
+                    if (moments := conflict_element.process(timer=timer)) is not None:
+                        moments_sequence.extend(x for x in moments if x > timer)
+                        fired = True
+                        break
+
+                if not fired:
                     break
-                else:
-                    timer = value
-                    counter += 1
+
+        else:
+            # виконання процесу генератора / звичайного переходу
+            if (values := element.process(timer=timer)) is not None:
+                moments_sequence.extend(x for x in values if x > timer)
+        return moments_sequence
+
+    @staticmethod
+    def _is_unit_enabled(element: Union[Generator, Transition, List[Transition]], timer: float) -> bool:
+        """
+        Перевірка, чи залишився активний елемент здатним до спрацювання після обробки
+        (можливо лише для переходів, що не спрацювали через ймовірність спрацювання)
+        :param element: активний елемент
+        :param timer: поточний модельний час
+        :return: True, якщо елемент має бути оброблений на наступному кроці
+        """
+        if isinstance(element, list):
+            return any(transition.is_enabled(timer) for transition in element)
+        if isinstance(element, Transition):
+            return element.is_enabled(timer)
+        return False
+
+    def _activate_consumers(self, place: Place) -> NoReturn:
+        """
+        Активація елементів, для яких місце є входом. Елемент, що знаходиться далі за порядком обробки,
+        обробляється на поточному кроці, інакше - на наступному
+        :param place: місце, завантаження якого збільшилося
+        :return: None
+        """
+        for index in self._consumers.get(place, ()):
+            if index > self._current_unit:
+                if index not in self._step_units:
+                    self._step_units.add(index)
+                    heapq.heappush(self._step_queue, index)
             else:
-                break
+                self._next_units.add(index)
 
-        print(f'Total time = {timer}')
-        print(f'Total entities arrived: {self._generator.total_arrivals}')
+    def compile_net(self) -> CompiledNet:
+        """
+        Компілює схему в матриці інцидентності pre / post та вектор маркування
+        :return: скомпільоване представлення мережі
+        """
+        return CompiledNet(self)
 
-        return self._return_statistics()
+    def bind_distribution(self, distro: Distribution, key: Union[str, None] = None) -> NoReturn:
+        """
+        Прив'язує розподіл елемента до окремого потоку випадкових чисел, породженого від SeedSequence симуляції.
+        Окремий потік дозволяє генерувати значення блоками без зміни послідовності значень розподілу.
+        Потік з ключем визначається лише початковим значенням та ключем (спільні випадкові числа):
+        елементи з тим самим ідентифікатором у різних варіантах моделі отримують ті самі значення
+        незалежно від складу та порядку створення елементів
+        :param distro: розподіл
+        :param key: ключ потоку (ідентифікатор елемента); None - наступний породжений потік
+        :return: None
+        """
+        if distro.type_of_distribution == 'const':
+            # сталі затримки не використовують випадкових чисел, тому потік (та його пам'ять) не створюється
+            return
+        seed_sequence = self._seed_sequence.spawn(1)[0] if key is None else self._substream(key)
+        distro.bind(default_rng(seed_sequence), self._variate_block_size, self._sampling)
+
+    def _substream(self, key: str) -> SeedSequence:
+        """
+        Потік випадкових чисел, що визначається ключем
+        :param key: ключ потоку
+        :return: SeedSequence потоку
+        """
+        return SeedSequence(self._seed_sequence.entropy, spawn_key=self._seed_sequence.spawn_key + (_key_digest(key),))
 
     def _get_element_by_id(self, str_id: str) -> Union[Any, None]:
         """
@@ -108,23 +554,66 @@ class Simulation:
         :param str_id: символьний ідентифікатор елемента схеми
         :return: посилання на елемент, або None, якщо елемент не знайдено
         """
-        if str_id == 'Generator':
-            return self._generator
-        else:
-            element = list(filter(lambda x: x.str_id == str_id, self.elements))
-            if element:
-                return element[0]
-            else:
-                raise ValueError(f'Element {str_id} not found')
+        try:
+            return self._index[str_id]
+        except KeyError:
+            raise ValueError(f'Element {str_id} not found') from None
 
-    def _set_connections(self, list_of_arcs: List[Tuple[str, str, int]]) -> NoReturn:
+    def topology(self) -> Topology:
+        """
+        Структура мережі у номерах елементів для створення інших екземплярів з тим самим описом
+        :return: незмінна структура мережі
+        """
+        elements = [self._generator] + self._places + self._transitions
+        number = {id(element): index for index, element in enumerate(elements)}
+
+        def links(connections):
+            return tuple((number[id(element)], multiplicity) for element, multiplicity in connections or ())
+
+        return Topology(inputs=tuple(links(element._inputs) for element in elements),
+                        outputs=tuple(links(element._outputs) for element in elements),
+                        sequence=tuple(tuple(number[id(item)] for item in unit) if isinstance(unit, list)
+                                       else number[id(unit)] for unit in self._active_elements),
+                        conflicts=tuple(number[id(item)] for item in self._transitions if item.is_conflict),
+                        consumers=tuple((number[id(place)], tuple(units)) for place, units in self._consumers.items()))
+
+    def _apply_topology(self, topology: Topology) -> NoReturn:
+        """
+        Встановлення дуг, конфліктних груп, послідовності активних елементів та відповідності місць
+        активним елементам за готовою структурою мережі
+        :param topology: структура мережі (див. topology)
+        :return: None
         """
-        Встановлення зв'язків між елементами імітаційної моделі
-        :param list_of_arcs: перелік дуг
+        elements = [self._generator] + self._places + self._transitions
+        if len(topology.inputs) != len(elements):
+            raise ValueError(f'Topology describes {len(topology.inputs)} elements, the model has {len(elements)}')
+        for element, inputs, outputs in zip(elements, topology.inputs, topology.outputs):
+            element._inputs = [(elements[index], multiplicity) for index, multiplicity in inputs] or None
+            element._outputs = [(elements[index], multiplicity) for index, multiplicity in outputs] or None
+        for index in topology.conflicts:
+            elements[index].is_conflict = True
+        self._has_conflict_transitions = len(topology.conflicts) > 0
+        self._active_elements = [[elements[index] for index in unit] if isinstance(unit, tuple) else elements[unit]
+                                 for unit in topology.sequence]
+        self._consumers = {elements[place]: list(units) for place, units in topology.consumers}
+
+    def _set_connections(self, list_of_arcs: Union[List[Tuple[str, str, int]], np.ndarray]) -> NoReturn:
+        """
+        Встановлення зв'язків між елементами імітаційної моделі. Крім переліку кортежів, приймає масив NumPy
+        розмірності (E, 3) або структурований масив з полями 'src', 'dst', 'multiplicity', що дозволяє
+        завантажувати дуги великих згенерованих мереж; кожна дуга обробляється за O(1)
+        :param list_of_arcs: перелік дуг (початок, кінець, кратність)
         :return:
         """
+        if isinstance(list_of_arcs, np.ndarray):
+            if list_of_arcs.dtype.names is not None:
+                list_of_arcs = zip(list_of_arcs['src'], list_of_arcs['dst'], list_of_arcs['multiplicity'])
+            elif list_of_arcs.ndim == 2 and list_of_arcs.shape[1] == 3:
+                list_of_arcs = zip(list_of_arcs[:, 0], list_of_arcs[:, 1], list_of_arcs[:, 2])
+            else:
+                raise ValueError(f'Expected array of arcs with shape (E, 3), got {list_of_arcs.shape}')
         for arc_in, arc_out, multiplicity in list_of_arcs:
-            self._set_arc(arc_in, arc_out, multiplicity)
+            self._set_arc(str(arc_in), str(arc_out), int(multiplicity))
 
     def _set_arc(self, start: str, fin: str, multiplicity: int) -> NoReturn:
         """
@@ -148,9 +637,38 @@ class Simulation:
         :param transitions: список властивостей переходів
         :return:
         """
-        return Generator(parent=self, **generator),\
-               [Place(parent=self, **value) for value in places],\
-               [Transition(parent=self, **value) for value in transitions]
+        elements = Generator(parent=self, **generator),\
+            [Place(parent=self, **{'stats_mode': self._stats_mode, **value}) for value in places],\
+            [Transition(parent=self, **{'stats_mode': self._stats_mode, **value}) for value in transitions]
+        # індекс елементів за символьними ідентифікаторами для пошуку при встановленні дуг та зміні параметрів
+        self._index = {'Generator': elements[0]}
+        for element in elements[1] + elements[2]:
+            if element.str_id in self._index:
+                raise ValueError(f'Duplicate element id {element.str_id!r}')
+            self._index[element.str_id] = element
+        return elements
+
+    def _attach_store(self) -> str:
+        """
+        Заміна сховищ статистики елементів колонками нового тимчасового каталогу прогону. Записи, накопичені
+        до прогону (зокрема попереднім прогоном цієї симуляції), переносяться у нові колонки, тому повторний
+        прогін не змінює записаного прогону до завершення (див. ColumnarStore.commit)
+        :return: ідентифікатор тимчасового каталогу
+        """
+        staging = self._store.stage(self._run_id)
+        self._columns = {}
+        for element in self.elements:
+            if element._statistics is not None:
+                name = f'{element.element_type}_{element.str_id}'
+                self._columns[name] = {}
+                for cell, previous in element._statistics.items():
+                    sink = self._store.column(staging, name, cell)
+                    if len(previous) > 0:
+                        rows = previous.report()
+                        sink.extend(rows[:, 0], rows[:, 1])
+                    self._columns[name][cell] = sink
+                element._statistics = self._columns[name]
+        return staging
 
     def _return_statistics(self) -> Dict:
         """
@@ -163,6 +681,15 @@ class Simulation:
                 response.update({f'{element.element_type}_{element.str_id}': element.statistics})
         return response
 
+    def _return_metrics(self) -> Dict:
+        """
+        Повертає показники місць та переходів, зважені за часом, за інтервал [warmup, max_time]
+        (завантаження елементів після останньої події вважається незмінним до кінця інтервалу)
+        :return: словник показників за ідентифікаторами елементів
+        """
+        return {f'{element.element_type}_{element.str_id}': element.metrics(self._max_time, since=self._warmup)
+                for element in self.elements}
+
     def _check_and_modify_elements(self):
         """
         Метод перевірки коректності встановлених аргументів елементів імітаційної схеми,
@@ -186,7 +713,7 @@ class Simulation:
         """
         if not self._has_conflict_transitions:
             # якщо немає конфліктних переходів, список може бути створений без додаткового ітераційного циклу
-            return [self._generator] + self._transitions
+            self._active_elements = [self._generator] + self._transitions
 
         else:
             self._active_elements = [self._generator]
@@ -203,4 +730,21 @@ class Simulation:
             if len(sub_list) > 0:
                 self._active_elements.append(sub_list)
 
+        self._map_consumers()
+
+    def _map_consumers(self) -> NoReturn:
+        """
+        Побудова відповідності між місцями та номерами активних елементів, для яких місця є входами
+        :return: None
+        """
+        unit_index = {}
+        for index, element in enumerate(self._active_elements):
+            for transition in (element if isinstance(element, list) else [element]):
+                unit_index[transition] = index
+        self._consumers = {}
+        for place in self._places:
+            for transition, _ in (place._outputs or []):
+                if transition in unit_index and unit_index[transition] not in self._consumers.get(place, []):
+                    self._consumers.setdefault(place, []).append(unit_index[transition])
+
 
@@ -0,0 +1,629 @@
+import json
+import os
+import shutil
+import uuid
+from typing import Dict, Iterable, List, NoReturn, Sequence, Union
+
+import numpy as np
+
+from .models import StatisticsBuffer
+
+# режими збереження статистики: 'full' - повний ряд записів, 'streaming' - накопичувачі з пам'яттю O(1)
+STATS_MODES = ('full', 'streaming')
+# політики збереження ряду записів місць у режимі 'full': 'full' - усі записи, 'ring' - останні K записів,
+# 'interval' - значення через рівні інтервали часу, 'reservoir' - випадкова вибірка K записів
+TRACE_POLICIES = ('full', 'ring', 'interval', 'reservoir')
+
+
+class P2Quantile:
+    """
+    Оцінка квантиля за алгоритмом P² (Jain, Chlamtac) з пам'яттю O(1): зберігаються лише п'ять маркерів
+    """
+
+    def __init__(self, probability: float):
+        """
+        Конструктор
+        :param probability: рівень квантиля в інтервалі (0, 1)
+        """
+        if not 0 < probability < 1:
+            raise ValueError(f'Quantile probability must be in (0, 1), got {probability}')
+        self._p = probability
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * probability, 1 + 4 * probability, 3 + 2 * probability, 5]
+        self._increments = [0, probability / 2, probability, (1 + probability) / 2, 1]
+
+    def __repr__(self):
+        return f'P2Quantile: p={self._p}, value={self.value}'
+
+    @property
+    def value(self) -> float:
+        """
+        Поточна оцінка квантиля
+        :return: значення квантиля або nan, якщо спостережень немає
+        """
+        if len(self._heights) == 0:
+            return np.nan
+        if len(self._heights) < 5:
+            heights = sorted(self._heights)
+            return heights[min(int(self._p * len(heights)), len(heights) - 1)]
+        return self._heights[2]
+
+    def append(self, value: float) -> NoReturn:
+        """
+        Врахування нового спостереження
+        :param value: значення
+        :return: None
+        """
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(value)
+            if len(heights) == 5:
+                heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = max(heights[4], value)
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+
+        for i in range(cell + 1, 5):
+            self._positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            delta = self._desired[i] - self._positions[i]
+            if (delta >= 1 and self._positions[i + 1] - self._positions[i] > 1) or \
+                    (delta <= -1 and self._positions[i - 1] - self._positions[i] < -1):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                self._positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def _linear(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+
+class OnlineStatistics:
+    """
+    Накопичувач статистики з пам'яттю O(1). Замість повного ряду записів (час, значення) зберігає
+    кількість, суму, мінімум, максимум, середнє та дисперсію за алгоритмом Велфорда,
+    середнє, зважене за часом (значення вважається незмінним до наступного запису),
+    та, за потреби, оцінки квантилів P².
+    Має той самий інтерфейс додавання записів, що і StatisticsBuffer
+    """
+
+    def __init__(self, quantiles: Sequence[float] = ()):
+        """
+        Конструктор
+        :param quantiles: рівні квантилів, що оцінюються алгоритмом P²
+        """
+        self._count = 0
+        self._sum = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+        self._first_time: Union[float, None] = None
+        self._last_time: Union[float, None] = None
+        self._last_value = 0.0
+        self._area = 0.0
+        self._quantiles = [P2Quantile(p) for p in quantiles]
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return f'OnlineStatistics: count={self._count}, mean={self.mean}, max={self._max}'
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def total(self) -> float:
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self._count > 0 else np.nan
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self._count - 1) if self._count > 1 else np.nan
+
+    @property
+    def maximum(self) -> float:
+        return self._max if self._count > 0 else np.nan
+
+    @property
+    def minimum(self) -> float:
+        return self._min if self._count > 0 else np.nan
+
+    def time_mean(self, until: Union[float, None] = None) -> float:
+        """
+        Середнє значення, зважене за часом
+        :param until: момент закінчення спостереження; за замовчуванням - момент останнього запису
+        :return: середнє значення
+        """
+        if self._first_time is None:
+            return np.nan
+        until = self._last_time if until is None else until
+        duration = until - self._first_time
+        if duration <= 0:
+            return self._last_value
+        return (self._area + self._last_value * (until - self._last_time)) / duration
+
+    def append(self, timer: float, value: Union[int, float]) -> NoReturn:
+        """
+        Врахування нового запису
+        :param timer: момент модельного часу
+        :param value: значення
+        :return: None
+        """
+        if self._first_time is None:
+            self._first_time = timer
+        else:
+            self._area += self._last_value * (timer - self._last_time)
+        self._last_time = timer
+        self._last_value = value
+
+        self._count += 1
+        self._sum += value
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+        for quantile in self._quantiles:
+            quantile.append(value)
+
+    def extend(self, times: Iterable[float], values: Iterable[Union[int, float]]) -> NoReturn:
+        """
+        Врахування декількох записів
+        :param times: моменти модельного часу
+        :param values: значення
+        :return: None
+        """
+        for timer, value in zip(times, values):
+            self.append(timer, value)
+
+    def clear(self) -> NoReturn:
+        """
+        Скидання накопичених значень
+        :return: None
+        """
+        self.__init__(quantiles=[quantile._p for quantile in self._quantiles])
+
+    def report(self) -> Dict:
+        """
+        Підсумкова статистика
+        :return: словник зі значеннями накопичених характеристик
+        """
+        return {'count': self.count,
+                'sum': self.total,
+                'mean': self.mean,
+                'variance': self.variance,
+                'min': self.minimum,
+                'max': self.maximum,
+                'time_mean': self.time_mean(),
+                'quantiles': {quantile._p: quantile.value for quantile in self._quantiles}}
+
+
+class RingBuffer:
+    """
+    Буфер останніх записів (час, значення) фіксованої місткості: новий запис заміщує найстаріший
+    """
+
+    def __init__(self, size: int):
+        """
+        Конструктор
+        :param size: кількість записів, що зберігаються
+        """
+        if size < 1:
+            raise ValueError(f'Ring buffer size must be positive, got {size}')
+        self._rows = np.empty((size, 2), dtype=np.float64)
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self._rows.shape[0])
+
+    def __repr__(self):
+        return f'RingBuffer: size={len(self)}, capacity={self._rows.shape[0]}, seen={self._count}'
+
+    def append(self, timer: float, value: Union[int, float]) -> NoReturn:
+        self._rows[self._count % self._rows.shape[0]] = timer, value
+        self._count += 1
+
+    def extend(self, times: np.ndarray, values: np.ndarray) -> NoReturn:
+        for timer, value in zip(times, values):
+            self.append(timer, value)
+
+    def clear(self) -> NoReturn:
+        self._count = 0
+
+    def report(self) -> np.ndarray:
+        """
+        Збережені записи у хронологічному порядку
+        :return: масив статистики розмірності (N, 2)
+        """
+        if self._count <= self._rows.shape[0]:
+            return self._rows[:self._count].copy()
+        return np.roll(self._rows, -(self._count % self._rows.shape[0]), axis=0)
+
+
+class IntervalSample:
+    """
+    Запис значень через рівні інтервали модельного часу замість запису на кожній події.
+    Для рядів стану (завантаження) зберігається значення, що діяло в момент k * interval;
+    для рядів подій (кількість доданих / вилучених маркерів) - сума значень за інтервал [k * interval, (k + 1) * interval)
+    """
+
+    def __init__(self, interval: float, cumulative: bool = False):
+        """
+        Конструктор
+        :param interval: тривалість інтервалу
+        :param cumulative: прапорець підсумовування значень за інтервал (ряди подій)
+        """
+        if interval <= 0:
+            raise ValueError(f'Sampling interval must be positive, got {interval}')
+        self._interval = interval
+        self._cumulative = cumulative
+        self._buffer = StatisticsBuffer()
+        # номер поточного інтервалу та значення, що діє (або накопичене) в ньому
+        self._step: Union[int, None] = None
+        self._value = 0.0
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __repr__(self):
+        return f'IntervalSample: interval={self._interval}, size={len(self)}'
+
+    def append(self, timer: float, value: Union[int, float]) -> NoReturn:
+        if self._cumulative:
+            step = int(timer // self._interval)
+            if self._step is None:
+                self._step = step
+            elif step > self._step:
+                self._close(step)
+            self._value += value
+        else:
+            if self._step is None:
+                # ряд стану починається з першого моменту сітки, не меншого за момент першого запису
+                self._step = int(np.ceil(timer / self._interval))
+            # моменти сітки до поточного запису отримують значення, що діяло на них
+            while self._step * self._interval < timer:
+                self._buffer.append(self._step * self._interval, self._value)
+                self._step += 1
+            self._value = value
+
+    def extend(self, times: np.ndarray, values: np.ndarray) -> NoReturn:
+        for timer, value in zip(times, values):
+            self.append(timer, value)
+
+    def clear(self) -> NoReturn:
+        self._buffer.clear()
+        self._step, self._value = None, 0.0
+
+    def report(self) -> np.ndarray:
+        """
+        Записи на моментах сітки; для рядів подій включається незавершений поточний інтервал
+        :return: масив статистики розмірності (N, 2)
+        """
+        report = self._buffer.as_array()
+        if self._cumulative and self._step is not None:
+            report = np.vstack((report, [[self._step * self._interval, self._value]]))
+        return report
+
+    def _close(self, step: int) -> NoReturn:
+        """
+        Запис сум інтервалів, що завершилися до інтервалу з номером step (ряди подій)
+        :param step: номер інтервалу нового запису
+        :return: None
+        """
+        self._buffer.append(self._step * self._interval, self._value)
+        # порожні інтервали між записами
+        for empty in range(self._step + 1, step):
+            self._buffer.append(empty * self._interval, 0.0)
+        self._step, self._value = step, 0.0
+
+
+class ReservoirSample:
+    """
+    Рівномірна випадкова вибірка фіксованого обсягу з усіх записів (алгоритм R, Vitter)
+    """
+
+    def __init__(self, size: int, seed: Union[int, np.random.SeedSequence, None] = None):
+        """
+        Конструктор
+        :param size: обсяг вибірки
+        :param seed: початкове значення власного генератора випадкових чисел вибірки
+        """
+        if size < 1:
+            raise ValueError(f'Reservoir size must be positive, got {size}')
+        self._rows = np.empty((size, 2), dtype=np.float64)
+        self._count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return min(self._count, self._rows.shape[0])
+
+    def __repr__(self):
+        return f'ReservoirSample: size={len(self)}, capacity={self._rows.shape[0]}, seen={self._count}'
+
+    def append(self, timer: float, value: Union[int, float]) -> NoReturn:
+        if self._count < self._rows.shape[0]:
+            self._rows[self._count] = timer, value
+        elif (position := self._rng.integers(self._count + 1)) < self._rows.shape[0]:
+            self._rows[position] = timer, value
+        self._count += 1
+
+    def extend(self, times: np.ndarray, values: np.ndarray) -> NoReturn:
+        for timer, value in zip(times, values):
+            self.append(timer, value)
+
+    def clear(self) -> NoReturn:
+        self._count = 0
+
+    def report(self) -> np.ndarray:
+        """
+        Записи вибірки, впорядковані за часом
+        :return: масив статистики розмірності (N, 2)
+        """
+        rows = self._rows[:len(self)]
+        return rows[np.argsort(rows[:, 0], kind='stable')]
+
+
+class ColumnSink:
+    """
+    Сховище статистики, що записує пари (час, значення) у файл колонки сховища ColumnarStore під час прогону.
+    Записи накопичуються у буфері фіксованого розміру і дописуються в кінець файлу при його заповненні,
+    тому пам'ять не залежить від тривалості прогону
+    """
+
+    def __init__(self, path: str, chunk_size: int = 4096):
+        """
+        Конструктор. Існуючий файл колонки очищується
+        :param path: шлях до файлу колонки
+        :param chunk_size: кількість записів буфера
+        """
+        self._path = path
+        self._buffer = np.empty((chunk_size, 2), dtype=np.float64)
+        self._buffered = 0
+        self._written = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'wb').close()
+
+    def __len__(self):
+        return self._written + self._buffered
+
+    def __repr__(self):
+        return f'ColumnSink: {self._path}, size={len(self)}'
+
+    def append(self, timer: float, value: Union[int, float]) -> NoReturn:
+        if self._buffered == self._buffer.shape[0]:
+            self.flush()
+        self._buffer[self._buffered] = timer, value
+        self._buffered += 1
+
+    def extend(self, times: np.ndarray, values: np.ndarray) -> NoReturn:
+        self.flush()
+        self._write(np.column_stack((times, values)).astype(np.float64))
+
+    def flush(self) -> NoReturn:
+        """
+        Запис накопичених у буфері записів у файл
+        :return: None
+        """
+        if self._buffered > 0:
+            self._write(self._buffer[:self._buffered])
+            self._buffered = 0
+
+    def clear(self) -> NoReturn:
+        self._buffered = self._written = 0
+        open(self._path, 'wb').close()
+
+    def report(self) -> np.ndarray:
+        """
+        Записи колонки, відображені у пам'ять (читаються з диску під час звернення)
+        :return: масив статистики розмірності (N, 2)
+        """
+        self.flush()
+        return _map_column(self._path, self._written)
+
+    def _relocate(self, path: str) -> NoReturn:
+        # файл колонки переміщено разом з каталогом прогону (див. ColumnarStore.commit)
+        self._path = path
+
+    def _write(self, rows: np.ndarray) -> NoReturn:
+        with open(self._path, 'ab') as f:
+            f.write(rows.tobytes())
+        self._written += len(rows)
+
+
+class ColumnarStore:
+    """
+    Колонкове сховище статистики прогонів у каталозі: кожен прогін займає окремий підкаталог, а статистика
+    кожної комірки елемента - окремий файл записів float64 (час, значення). Під час прогону колонки записуються
+    у тимчасовий прихований каталог (див. stage), який після завершення прогону разом з індексом кількості
+    записів колонок перейменовується у каталог прогону, тому незавершені прогони не читаються, а записаний
+    прогін не може бути пошкоджений іншим прогоном з тим самим ідентифікатором.
+    Колонки відображаються у пам'ять (np.memmap), тому вибірка одного елемента за всіма прогонами
+    не потребує завантаження решти статистики
+    """
+
+    def __init__(self, path: str):
+        """
+        Конструктор
+        :param path: каталог сховища (створюється, якщо не існує)
+        """
+        self._path = path
+        os.makedirs(path, exist_ok=True)
+
+    def __repr__(self):
+        return f'ColumnarStore: {self._path}, runs={len(self.runs)}'
+
+    @property
+    def runs(self) -> List[str]:
+        """
+        Ідентифікатори завершених прогонів
+        :return: відсортований перелік ідентифікаторів
+        """
+        return sorted(run for run in os.listdir(self._path)
+                      if not run.startswith('.') and os.path.exists(self._index_file(run)))
+
+    def stage(self, run: str) -> str:
+        """
+        Створення тимчасового каталогу для запису колонок прогону
+        :param run: ідентифікатор прогону
+        :return: ідентифікатор тимчасового каталогу (передається в column та commit)
+        """
+        staging = f'.{run}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(os.path.join(self._path, staging))
+        return staging
+
+    def column(self, run: str, element: str, cell: str, chunk_size: int = 4096) -> ColumnSink:
+        """
+        Створення колонки для запису статистики прогону
+        :param run: ідентифікатор прогону або тимчасового каталогу прогону (див. stage)
+        :param element: ідентифікатор елемента, наприклад 'Place_Queue'
+        :param cell: назва комірки статистики
+        :param chunk_size: кількість записів буфера
+        :return: колонка
+        """
+        return ColumnSink(self._column_file(run, element, cell), chunk_size)
+
+    def commit(self, run: str, columns: Dict[str, Dict[str, ColumnSink]], staging: Union[str, None] = None,
+               **meta) -> NoReturn:
+        """
+        Завершення запису прогону: скидання буферів колонок та запис індексу. Якщо колонки записані
+        у тимчасовий каталог, він перейменовується у каталог прогону (попередній прогін з тим самим
+        ідентифікатором замінюється повністю)
+        :param run: ідентифікатор прогону
+        :param columns: колонки за ідентифікаторами елементів та назвами комірок
+        :param staging: ідентифікатор тимчасового каталогу (див. stage); None - колонки записані у каталог прогону
+        :param meta: додаткові відомості про прогін, що зберігаються в індексі
+        :return: None
+        """
+        for cells in columns.values():
+            for sink in cells.values():
+                sink.flush()
+        index = {'columns': {element: {cell: len(sink) for cell, sink in cells.items()}
+                             for element, cells in columns.items()}, **meta}
+        # запис через тимчасовий файл, щоб перерваний прогін не залишав пошкодженого індексу
+        target = run if staging is None else staging
+        temporary = f'{self._index_file(target)}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(index, f)
+        os.replace(temporary, self._index_file(target))
+        if staging is None:
+            return
+
+        directory = os.path.join(self._path, run)
+        previous = None
+        if os.path.exists(directory):
+            previous = os.path.join(self._path, f'.{run}.{uuid.uuid4().hex}.old')
+            os.rename(directory, previous)
+        os.rename(os.path.join(self._path, staging), directory)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+        for element, cells in columns.items():
+            for cell, sink in cells.items():
+                sink._relocate(self._column_file(run, element, cell))
+
+    def index(self, run: str) -> Dict:
+        """
+        Індекс завершеного прогону
+        :param run: ідентифікатор прогону
+        :return: словник з кількістю записів колонок ('columns') та додатковими відомостями
+        """
+        with open(self._index_file(run)) as f:
+            return json.load(f)
+
+    def read(self, run: str, element: str, cell: str) -> np.ndarray:
+        """
+        Статистика комірки елемента одного прогону
+        :return: масив розмірності (N, 2), відображений у пам'ять
+        """
+        return _map_column(self._column_file(run, element, cell), self.index(run)['columns'][element][cell])
+
+    def query(self, element: str, cell: str, runs: Union[Iterable[str], None] = None) -> Dict[str, np.ndarray]:
+        """
+        Статистика комірки елемента за всіма (або заданими) прогонами
+        :param element: ідентифікатор елемента
+        :param cell: назва комірки статистики
+        :param runs: ідентифікатори прогонів; None - усі завершені прогони
+        :return: словник масивів розмірності (N, 2), відображених у пам'ять, за ідентифікаторами прогонів
+        """
+        return {run: self.read(run, element, cell) for run in (self.runs if runs is None else runs)}
+
+    def _index_file(self, run: str) -> str:
+        return os.path.join(self._path, run, 'index.json')
+
+    def _column_file(self, run: str, element: str, cell: str) -> str:
+        return os.path.join(self._path, run, element, f'{cell}.f8')
+
+
+def _map_column(path: str, rows: int) -> np.ndarray:
+    """
+    Відображення файлу колонки у пам'ять
+    :param path: шлях до файлу колонки
+    :param rows: кількість записів
+    :return: масив розмірності (rows, 2)
+    """
+    if rows == 0:
+        return np.zeros((0, 2), dtype=np.float64)
+    return np.memmap(path, dtype=np.float64, mode='r', shape=(rows, 2))
+
+
+def create_statistics(cells: Sequence[str], stats_mode: str = 'full', compact: bool = False,
+                      quantiles: Sequence[float] = (), trace: str = 'full', trace_size: int = 1000,
+                      trace_interval: float = 1.0, seed: Union[np.random.SeedSequence, None] = None) -> Dict:
+    """
+    Створює сховища статистики елемента
+    :param cells: назви комірок статистики
+    :param stats_mode: режим збереження статистики
+    :param compact: прапорець компактного зберігання значень (лише для режиму 'full')
+    :param quantiles: рівні квантилів, що оцінюються в режимі 'streaming'
+    :param trace: політика збереження ряду записів у режимі 'full' (див. TRACE_POLICIES)
+    :param trace_size: кількість записів для політик 'ring' та 'reservoir'
+    :param trace_interval: інтервал часу для політики 'interval'
+    :param seed: початкове значення генератора випадкових чисел для політики 'reservoir'
+    :return: словник сховищ за назвами комірок
+    """
+    if trace not in TRACE_POLICIES:
+        raise ValueError(f'Unknown trace policy {trace}, expected one of {list(TRACE_POLICIES)}')
+    if trace != 'full' and stats_mode != 'full':
+        raise ValueError(f'Trace policy {trace} requires full statistics mode, got {stats_mode}')
+    match stats_mode, trace:
+        case 'full', 'ring':
+            return {cell: RingBuffer(trace_size) for cell in cells}
+        case 'full', 'interval':
+            # 'load' - ряд стану, інші комірки - ряди подій, значення яких підсумовуються за інтервал
+            return {cell: IntervalSample(trace_interval, cumulative=cell != 'load') for cell in cells}
+        case 'full', 'reservoir':
+            seeds = (seed if seed is not None else np.random.SeedSequence()).spawn(len(cells))
+            return {cell: ReservoirSample(trace_size, cell_seed) for cell, cell_seed in zip(cells, seeds)}
+        case 'full', _:
+            return {cell: StatisticsBuffer(compact=compact) for cell in cells}
+        case 'streaming', _:
+            return {cell: OnlineStatistics(quantiles=quantiles) for cell in cells}
+        case _:
+            raise ValueError(f'Unknown statistics mode {stats_mode}, expected one of {list(STATS_MODES)}')
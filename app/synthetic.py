@@ -0,0 +1,256 @@
+"""
+Генератор описів великих синтетичних мереж Петрі для перевірки масштабованості.
+
+Кожна функція повертає словник з ключами generator, places, transitions та arcs, який передається
+у Simulation або CompiledModel разом з max_time, наприклад Simulation(max_time=100, **tandem(10000)).
+Дуги повертаються структурованим масивом (див. Simulation._set_connections), а затримки переходів
+обираються з суміші розподілів delays з вагами weights і розбираються один раз. Опис мережі з 10^5 елементів
+генерується менше ніж за секунду; побудова Simulation з нього визначається створенням елементів і займає
+кілька секунд (близько 3.6 с для tandem(50000)), тому для повторних прогонів варто використовувати CompiledModel.
+"""
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .models import Distribution
+
+# суміш затримок переходів: словники властивостей розподілів або екземпляри Distribution
+Delays = Sequence[Union[Dict, Distribution]]
+# затримка переходів за замовчуванням
+EXP_DELAY = {'type_of_distribution': 'exp', 'loc': 0, 'scale': 1}
+ZERO_DELAY = {'type_of_distribution': 'const', 'loc': 0}
+# суміш затримок: миттєві, сталі, експоненціальні та рівномірні
+MIXED_DELAYS = (ZERO_DELAY,
+                {'type_of_distribution': 'const', 'loc': 1},
+                EXP_DELAY,
+                {'type_of_distribution': 'uniform', 'loc': 1, 'scale': 0.5})
+# розібрана миттєва затримка службових переходів (розгалуження, об'єднання, завантаження тощо)
+_ZERO = Distribution.from_dict(ZERO_DELAY)
+
+
+def tandem(n: int, delays: Delays = (EXP_DELAY,), weights: Union[Sequence[float], None] = None,
+           interarrival: float = 2, multiplicity: int = 1, capacity: float = np.inf,
+           seed: Union[int, None] = None) -> Dict:
+    """
+    Тандем черг: n місць, поєднаних послідовно n - 1 переходами
+    :param n: кількість місць
+    :param delays: розподіли затримок переходів
+    :param weights: ймовірності вибору розподілів; None - рівні
+    :param interarrival: середній інтервал між надходженнями (експоненціальний розподіл)
+    :param multiplicity: кратність дуг між місцями та переходами
+    :param capacity: кількість каналів кожного переходу
+    :param seed: початкове значення генератора випадкових чисел для вибору затримок
+    :return: опис мережі
+    """
+    rng = np.random.default_rng(seed)
+    arcs = [('Generator', 'P0', multiplicity)]
+    for i in range(n - 1):
+        arcs.extend([(f'P{i}', f'T{i}', multiplicity), (f'T{i}', f'P{i + 1}', multiplicity)])
+    return _spec(_arrivals(interarrival),
+                 [{'str_id': f'P{i}'} for i in range(n)],
+                 [{'str_id': f'T{i}', 'priority': i, 'capacity': capacity, 'time_distro': delay}
+                  for i, delay in enumerate(_choose_delays(rng, n - 1, delays, weights))],
+                 arcs)
+
+
+def fork_join(branches: int, delays: Delays = (EXP_DELAY,), weights: Union[Sequence[float], None] = None,
+              interarrival: float = 2, seed: Union[int, None] = None) -> Dict:
+    """
+    Розгалуження кожного маркера на паралельні гілки з подальшим об'єднанням (синхронізацією)
+    :param branches: кількість гілок (кількість місць - 2 * branches + 2)
+    :param delays: розподіли затримок переходів гілок
+    :param weights: ймовірності вибору розподілів; None - рівні
+    :param interarrival: середній інтервал між надходженнями (експоненціальний розподіл)
+    :param seed: початкове значення генератора випадкових чисел для вибору затримок
+    :return: опис мережі
+    """
+    rng = np.random.default_rng(seed)
+    arcs = [('Generator', 'Source', 1), ('Source', 'Fork', 1), ('Join', 'Sink', 1)]
+    for i in range(branches):
+        arcs.extend([('Fork', f'P{i}', 1), (f'P{i}', f'T{i}', 1), (f'T{i}', f'Q{i}', 1), (f'Q{i}', 'Join', 1)])
+    return _spec(_arrivals(interarrival),
+                 [{'str_id': 'Source'}, {'str_id': 'Sink'}] +
+                 [{'str_id': f'{prefix}{i}'} for prefix in 'PQ' for i in range(branches)],
+                 [{'str_id': 'Fork', 'priority': 0, 'time_distro': _ZERO}] +
+                 [{'str_id': f'T{i}', 'priority': i + 1, 'time_distro': delay}
+                  for i, delay in enumerate(_choose_delays(rng, branches, delays, weights))] +
+                 [{'str_id': 'Join', 'priority': branches + 1, 'time_distro': _ZERO}],
+                 arcs)
+
+
+def ring(n: int, tokens: Union[int, None] = None, delays: Delays = (EXP_DELAY,),
+         weights: Union[Sequence[float], None] = None, seed: Union[int, None] = None) -> Dict:
+    """
+    Замкнене кільце з n місць та n переходів без надходжень ззовні
+    :param n: кількість місць
+    :param tokens: кількість маркерів, рівномірно розміщених у кільці; None - n // 2
+    :param delays: розподіли затримок переходів
+    :param weights: ймовірності вибору розподілів; None - рівні
+    :param seed: початкове значення генератора випадкових чисел для вибору затримок
+    :return: опис мережі
+    """
+    rng = np.random.default_rng(seed)
+    tokens = n // 2 if tokens is None else tokens
+    # кільце ділиться на tokens рівних відрізків, маркер розміщується в останньому місці кожного відрізку
+    loads = np.bincount(np.arange(1, tokens + 1) * n // tokens - 1, minlength=n) if tokens else np.zeros(n, dtype=int)
+    arcs = []
+    for i in range(n):
+        arcs.extend([(f'P{i}', f'T{i}', 1), (f'T{i}', f'P{(i + 1) % n}', 1)])
+    # генератор не поєднаний з мережею, його єдина подія відбувається після будь-якого max_time
+    return _spec({'time_distro': {'type_of_distribution': 'const', 'loc': np.inf}},
+                 [{'str_id': f'P{i}', 'initial_load': int(load)} for i, load in enumerate(loads)],
+                 [{'str_id': f'T{i}', 'priority': i, 'time_distro': delay}
+                  for i, delay in enumerate(_choose_delays(rng, n, delays, weights))],
+                 arcs)
+
+
+def resource_loops(loops: int, resources: int = 3, batch: int = 2, interarrival: float = 1,
+                   delays: Delays = (EXP_DELAY,), weights: Union[Sequence[float], None] = None,
+                   seed: Union[int, None] = None) -> Dict:
+    """
+    Спільна черга, яку обслуговують замкнені цикли ресурсів (як цикл SmallFree / LoadSmall
+    у tests/full_models/full_net.py): перехід завантаження забирає batch маркерів черги та вільний ресурс,
+    перехід рейсу повертає ресурс у цикл
+    :param loops: кількість циклів ресурсів
+    :param resources: кількість ресурсів у кожному циклі (початкове маркування місця Free)
+    :param batch: кратність дуги з черги до переходу завантаження
+    :param interarrival: середній інтервал між надходженнями (експоненціальний розподіл)
+    :param delays: розподіли затримок переходів рейсу
+    :param weights: ймовірності вибору розподілів; None - рівні
+    :param seed: початкове значення генератора випадкових чисел для вибору затримок
+    :return: опис мережі
+    """
+    rng = np.random.default_rng(seed)
+    places, transitions, arcs = [{'str_id': 'Queue'}], [], [('Generator', 'Queue', 1)]
+    for i, delay in enumerate(_choose_delays(rng, loops, delays, weights)):
+        places.extend([{'str_id': f'Free{i}', 'initial_load': resources}, {'str_id': f'Loaded{i}'}])
+        transitions.extend([{'str_id': f'Load{i}', 'priority': i, 'time_distro': _ZERO},
+                            {'str_id': f'Trip{i}', 'priority': loops + i, 'time_distro': delay}])
+        arcs.extend([('Queue', f'Load{i}', batch), (f'Free{i}', f'Load{i}', 1), (f'Load{i}', f'Loaded{i}', 1),
+                     (f'Loaded{i}', f'Trip{i}', 1), (f'Trip{i}', f'Free{i}', 1)])
+    return _spec(_arrivals(interarrival), places, transitions, arcs)
+
+
+def conflict_sets(sets: int, size: int, probability: float = 1.0, delays: Delays = (EXP_DELAY,),
+                  weights: Union[Sequence[float], None] = None, interarrival: float = 1,
+                  seed: Union[int, None] = None) -> Dict:
+    """
+    Щільні множини конфліктних переходів: у кожній множині size переходів з однаковим пріоритетом
+    змагаються за маркери одного місця. Надходження розподіляються між множинами переходом Route.
+    Сусідні переходи з неунікальними пріоритетами рушій поєднує в одну конфліктну групу
+    (див. Simulation._generate_iteration_sequence), тому множини розділені переходами Drain з унікальним
+    пріоритетом, що переміщують маркери множини до місця Exit; інакше усі множини утворили б одну групу,
+    обробка якої на кожному кроці пропорційна розміру мережі
+    :param sets: кількість множин
+    :param size: кількість переходів у множині
+    :param probability: ймовірність спрацювання кожного переходу множини, крім останнього
+    :param delays: розподіли затримок переходів множин
+    :param weights: ймовірності вибору розподілів; None - рівні
+    :param interarrival: середній інтервал між надходженнями (експоненціальний розподіл)
+    :param seed: початкове значення генератора випадкових чисел для вибору затримок
+    :return: опис мережі
+    """
+    rng = np.random.default_rng(seed)
+    chosen = iter(_choose_delays(rng, sets * size, delays, weights))
+    places, arcs = [{'str_id': 'Arrival'}, {'str_id': 'Exit'}], [('Generator', 'Arrival', 1), ('Arrival', 'Route', 1)]
+    transitions = [{'str_id': 'Route', 'priority': 0, 'time_distro': _ZERO}]
+    for s in range(sets):
+        places.extend([{'str_id': f'C{s}'}, {'str_id': f'D{s}'}])
+        arcs.extend([('Route', f'C{s}', 1), (f'D{s}', f'Drain{s}', 1), (f'Drain{s}', 'Exit', 1)])
+        for k in range(size):
+            transition = {'str_id': f'C{s}_{k}', 'priority': 2 * s + 1, 'time_distro': next(chosen)}
+            if probability < 1 and k < size - 1:
+                transition['prob'] = probability
+            transitions.append(transition)
+            arcs.extend([(f'C{s}', f'C{s}_{k}', 1), (f'C{s}_{k}', f'D{s}', 1)])
+        transitions.append({'str_id': f'Drain{s}', 'priority': 2 * s + 2, 'time_distro': _ZERO})
+    return _spec(_arrivals(interarrival), places, transitions, arcs)
+
+
+def random_sparse(n_places: int, n_transitions: int, fan_in: int = 1, fan_out: int = 1,
+                  multiplicities: Sequence[int] = (1,), delays: Delays = MIXED_DELAYS,
+                  weights: Union[Sequence[float], None] = None, interarrival: float = 1,
+                  seed: Union[int, None] = None) -> Dict:
+    """
+    Випадкова розріджена мережа: кожен перехід має fan_in вхідних та fan_out вихідних місць,
+    обраних випадково; генератор поповнює місце P0. Кожне місце, крім P0, є виходом хоча б
+    одного переходу, якщо переходів достатньо
+    :param n_places: кількість місць
+    :param n_transitions: кількість переходів
+    :param fan_in: кількість вхідних місць переходу
+    :param fan_out: кількість вихідних місць переходу
+    :param multiplicities: можливі кратності дуг (обираються рівноймовірно)
+    :param delays: розподіли затримок переходів
+    :param weights: ймовірності вибору розподілів; None - рівні
+    :param interarrival: середній інтервал між надходженнями (експоненціальний розподіл)
+    :param seed: початкове значення генератора випадкових чисел для вибору структури та затримок
+    :return: опис мережі
+    """
+    rng = np.random.default_rng(seed)
+    inputs = _distinct(rng, n_places, n_transitions, fan_in)
+    outputs = _distinct(rng, n_places, n_transitions, fan_out)
+    # перші виходи переходів покривають усі місця, щоб мережа не мала недосяжних місць
+    covered = rng.permutation(np.arange(1, n_places))[:n_transitions]
+    outputs[:len(covered), 0] = covered
+    for row in np.flatnonzero((outputs[:, 1:] == outputs[:, :1]).any(axis=1)):
+        others = np.setdiff1d(np.arange(n_places), outputs[row, :1])
+        outputs[row, 1:] = rng.choice(others, size=fan_out - 1, replace=False)
+    weight_in = rng.choice(np.asarray(multiplicities), size=inputs.shape)
+    weight_out = rng.choice(np.asarray(multiplicities), size=outputs.shape)
+    arcs = [('Generator', 'P0', 1)]
+    for j in range(n_transitions):
+        arcs.extend((f'P{i}', f'T{j}', int(w)) for i, w in zip(inputs[j], weight_in[j]))
+        arcs.extend((f'T{j}', f'P{i}', int(w)) for i, w in zip(outputs[j], weight_out[j]))
+    return _spec(_arrivals(interarrival),
+                 [{'str_id': f'P{i}'} for i in range(n_places)],
+                 [{'str_id': f'T{j}', 'priority': j, 'time_distro': delay}
+                  for j, delay in enumerate(_choose_delays(rng, n_transitions, delays, weights))],
+                 arcs)
+
+
+def _arrivals(interarrival: float) -> Dict:
+    return {'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': interarrival}}
+
+
+def _distinct(rng: np.random.Generator, n: int, rows: int, size: int) -> np.ndarray:
+    """
+    Випадковий вибір size різних номерів з n для кожного з rows рядків (рядки з повторами обираються повторно)
+    :return: масив номерів розміру (rows, size)
+    """
+    if size > n:
+        raise ValueError(f'Cannot choose {size} distinct places out of {n}')
+    chosen = rng.integers(n, size=(rows, size))
+    repeated = np.flatnonzero((np.diff(np.sort(chosen, axis=1), axis=1) == 0).any(axis=1))
+    for row in repeated:
+        chosen[row] = rng.choice(n, size=size, replace=False)
+    return chosen
+
+
+def _choose_delays(rng: np.random.Generator, n: int, delays: Delays,
+                   weights: Union[Sequence[float], None]) -> List[Distribution]:
+    """
+    Вибір затримок переходів з суміші розподілів. Кожен розподіл розбирається один раз, а переходи
+    отримують посилання на спільні екземпляри (елементи зберігають власні копії, див. Distribution.copy),
+    оскільки розбір словників через dacite є найдорожчою частиною побудови великої мережі
+    :param rng: генератор випадкових чисел
+    :param n: кількість переходів
+    :param delays: розподіли затримок (словники або екземпляри Distribution)
+    :param weights: ймовірності вибору розподілів; None - рівні
+    :return: перелік розподілів за переходами
+    """
+    parsed = [Distribution.from_dict(delay) if isinstance(delay, dict) else delay for delay in delays]
+    if len(parsed) == 1:
+        return parsed * n
+    return [parsed[k] for k in rng.choice(len(parsed), size=n, p=weights)]
+
+
+def _spec(generator: Dict, places: List[Dict], transitions: List[Dict], arcs: List[Tuple[str, str, int]]) -> Dict:
+    """
+    Опис мережі з дугами у вигляді структурованого масиву
+    :return: словник аргументів Simulation
+    """
+    width = max(len(name) for start, fin, _ in arcs for name in (start, fin)) if arcs else 1
+    return {'generator': generator,
+            'places': places,
+            'transitions': transitions,
+            'arcs': np.array(arcs, dtype=[('src', f'U{width}'), ('dst', f'U{width}'), ('multiplicity', np.int64)])}
@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+from numpy.random import SeedSequence
+
+from .models import Distribution, Topology
+from .simulation import Simulation
+
+
+class CompiledModel:
+    """
+    Незмінний шаблон імітаційної моделі, що будується один раз з опису генератора, місць, переходів та дуг.
+    При створенні шаблону опис перевіряється побудовою пробного екземпляру симуляції, з якого зберігається
+    структура мережі (дуги у номерах елементів, конфліктні групи, послідовність обробки, див. Topology),
+    а розподіли розбираються з словників. Метод instantiate створює нові елементи та їх змінний стан
+    (маркування, сховища переходів, календар подій, потоки випадкових чисел) і встановлює готову структуру
+    без розбору дуг, тому вартість підготовки прогону незначна навіть для коротких прогонів.
+    Шаблон підтримує pickle, тому instantiate може використовуватись як фабрика в run_replications
+    """
+
+    def __init__(self, max_time: float, generator: Dict, places: List[Dict], transitions: List[Dict],
+                 arcs: Union[List[Tuple], np.ndarray], **options: Any):
+        """
+        Конструктор
+        :param max_time: максимальний модельний час екземплярів за замовчуванням
+        :param generator: властивості генератора
+        :param places: список властивостей місць
+        :param transitions: список властивостей переходів
+        :param arcs: перелік дуг або масив дуг (див. Simulation._set_connections)
+        :param options: інші аргументи Simulation за замовчуванням (engine, scheduler, stats_mode тощо)
+        """
+        self._max_time = max_time
+        self._generator = self._parse(generator)
+        self._places = tuple(dict(place) for place in places)
+        self._transitions = tuple(self._parse(transition) for transition in transitions)
+        if isinstance(arcs, np.ndarray):
+            self._arcs = arcs.copy()
+            self._arcs.flags.writeable = False
+        else:
+            self._arcs = tuple((str(start), str(fin), int(multiplicity)) for start, fin, multiplicity in arcs)
+        self._options = options
+        # перевірка опису побудовою пробного екземпляру (ідентифікатори, дуги, режими) та збереження структури
+        self._topology: Union[Topology, None] = None
+        self._topology = self.instantiate().topology()
+
+    def __repr__(self):
+        return f'CompiledModel: places={len(self._places)}, transitions={len(self._transitions)}, ' \
+               f'arcs={len(self._arcs)}'
+
+    @property
+    def max_time(self) -> float:
+        return self._max_time
+
+    def instantiate(self, seed: Union[int, SeedSequence, None] = None, max_time: Union[float, None] = None,
+                    **options: Any) -> Simulation:
+        """
+        Створення екземпляру симуляції за шаблоном. Екземпляр дає ті самі результати,
+        що і Simulation, створена з того самого опису з тим самим seed
+        :param seed: початкове значення або SeedSequence
+        :param max_time: максимальний модельний час; None - значення шаблону
+        :param options: аргументи Simulation, що замінюють значення шаблону (sampling, store тощо)
+        :return: екземпляр симуляції
+        """
+        # елементи зберігають копії розподілів шаблону (див. Distribution.copy)
+        return Simulation(max_time=self._max_time if max_time is None else max_time,
+                          generator=self._generator,
+                          places=list(self._places),
+                          transitions=list(self._transitions),
+                          arcs=self._arcs,
+                          seed=seed,
+                          topology=self._topology,
+                          **{**self._options, **options})
+
+    @staticmethod
+    def _parse(spec: Dict) -> Dict:
+        """
+        Розбір розподілу затримки з словника властивостей елемента
+        :param spec: властивості елемента
+        :return: копія властивостей з розподілом у вигляді екземпляру Distribution
+        """
+        spec = dict(spec)
+        if isinstance(spec.get('time_distro'), dict):
+            spec['time_distro'] = Distribution.from_dict(spec['time_distro'])
+        return spec
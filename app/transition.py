@@ -1,12 +1,11 @@
-from typing import NoReturn, Union, Dict, List
+from typing import NoReturn, Union, Dict, List, Tuple
 from typing import TYPE_CHECKING
 
 import numpy as np
-from numpy.random import default_rng
 from sortedcontainers import SortedList
 
 from .models import Element, Distribution
-from . import SEED
+from .statistics import create_statistics
 
 if TYPE_CHECKING:
     from .simulation import Simulation
@@ -14,20 +13,33 @@ if TYPE_CHECKING:
 
 class Transition(Element):
 
-    _local_rng = default_rng(SEED) if SEED > -1 else default_rng()
+    __slots__ = ('_time_distro', '_storage', '_priority', '_probability', '_probability_distro', '_capacity',
+                 '_is_conflict', '_busy_area', '_last_change', '_entered', '_completed')
 
     def __init__(self, time_distro: Union["Distribution", Dict],
                  parent: "Simulation", str_id: str, priority: int = 1000, **kwargs):
-        super().__init__(str_id=str_id, parent=parent,
-                         save_stats=kwargs['save_stats'] if 'save_stats' in kwargs else False)
-        self._time_distro = Distribution.from_dict(time_distro) if isinstance(time_distro, dict) else time_distro
+        save_stats = kwargs.get('stats', kwargs.get('save_stats', False))
+        super().__init__(str_id=str_id, parent=parent, save_stats=save_stats)
+        self._time_distro = Distribution.from_dict(time_distro) if isinstance(time_distro, dict) \
+            else time_distro.copy()
+        parent.bind_distribution(self._time_distro, key=str_id)
         self._storage = SortedList()
         self._priority = priority
         self._probability = kwargs['prob'] if 'prob' in kwargs else 1
+        # рівномірний розподіл на [0, 1] для перевірки ймовірності спрацювання
+        self._probability_distro = Distribution(type_of_distribution='uniform', loc=0.5, scale=0.5)
+        if self._probability < 1:
+            parent.bind_distribution(self._probability_distro, key=f'{str_id}:probability')
         self._capacity = kwargs['capacity'] if 'capacity' in kwargs else np.inf
         self._is_conflict: bool = False
-        self._statistics = {'holds': [],
-                            'releases': []}
+        self._statistics = create_statistics(('holds', 'releases'), kwargs.get('stats_mode', 'full'),
+                                             quantiles=kwargs.get('stats_quantiles', ())) if save_stats else None
+        # накопичувачі для показників, зважених за часом: інтеграл кількості зайнятих каналів,
+        # момент останньої зміни, кількість захоплених та звільнених маркерів
+        self._busy_area = 0.0
+        self._last_change = 0.0
+        self._entered = 0
+        self._completed = 0
 
     def __repr__(self):
         return f'Transition: {self._id}, type={self._time_distro.type_of_distribution}, load={self.load},' \
@@ -55,12 +67,32 @@ class Transition(Element):
 
     @property
     def statistics(self):
-        return None
+        if self._statistics is None:
+            return None
+        return {cell: store.report() for cell, store in self._statistics.items()}
 
     @property
     def storage(self):
         return self._storage
 
+    def metrics(self, until: float, since: float = 0.0) -> Dict[str, float]:
+        """
+        Показники переходу за інтервал [since, until]: середня кількість зайнятих каналів, коефіцієнт
+        використання (для переходів зі скінченною кількістю каналів), інтенсивність обслуговування
+        та середній час обслуговування за формулою Літтла
+        :param until: момент закінчення спостереження
+        :param since: момент початку спостереження (скидання накопичувачів, див. _checkpoint)
+        :return: словник показників
+        """
+        duration = until - since
+        mean_busy = (self._busy_area + len(self._storage) * (until - self._last_change)) / duration \
+            if duration > 0 else np.nan
+        throughput = self._completed / duration if duration > 0 else np.nan
+        return {'mean_busy': mean_busy,
+                'utilization': mean_busy / self._capacity if np.isfinite(self._capacity) else np.nan,
+                'throughput': throughput,
+                'mean_sojourn': mean_busy / throughput if throughput > 0 else np.nan}
+
     def process(self, timer: float) -> List[float]:
         """
         Основний метод
@@ -70,11 +102,9 @@ class Transition(Element):
         """
 
         # кроки процесу функціонування переходу
-        if self.load == 0:
-            free_cells = self._capacity
-        else:
-            free_cells = self._capacity - len(list(filter(lambda x: x > timer, self._storage)))
-        future_release_moments = self._hold(timer, free_cells) if self._check_hold_condition(timer) else None
+        free_cells = self._free_cells(timer)
+        future_release_moments = self._hold(timer, free_cells) \
+            if self._check_hold_condition(timer, free_cells) else None
         self._update_storage(future_release_moments)
         self._release(timer)
 
@@ -85,18 +115,47 @@ class Transition(Element):
 
         return future_release_moments
 
-    def _check_hold_condition(self, timer: float):
+    def is_enabled(self, timer: float) -> bool:
+        """
+        Перевірка наявності вільних каналів та достатньої кількості маркерів у вхідних місцях
+        без урахування ймовірності спрацювання
+        :param timer: поточний модельний час
+        :return: True, якщо перехід може спрацювати, інакше False
+        """
+        if self._free_cells(timer) <= 0:
+            return False
+        for place, multiplicity in self._inputs:
+            if place._load < multiplicity:
+                return False
+        return True
+
+    def _free_cells(self, timer: float) -> int:
+        """
+        Кількість вільних каналів переходу. Канали, що звільняються в поточний момент, вважаються вільними
+        :param timer: поточний модельний час
+        :return: кількість вільних каналів
+        """
+        if not self._storage:
+            return self._capacity
+        return self._capacity - (len(self._storage) - self._storage.bisect_right(timer))
+
+    def _check_hold_condition(self, timer: float, free_cells: int):
         """
         Перевірка умови активації переходу. За умови активації зменшується відповідна кількість фішок у місцях,
-        що поєднані із входом переходу
+        що поєднані із входом переходу.
+        Випадкове число для перевірки ймовірності генерується лише для переходу, що може спрацювати,
+        тому кількість використаних випадкових чисел не залежить від того, як часто викликається перехід
         :return: True - перехід активується, False - перехід не активується
         """
-        if self._probability < 1:
-            if self._local_rng.uniform(0, 1) > self._probability:
+        if free_cells <= 0:
+            return False
+
+        for place, multiplicity in self._inputs:
+            if place._load < multiplicity:
                 return False
 
-        for _input in self._inputs:
-            if _input[0].load < _input[1]:
+        if self._probability < 1:
+            if self._probability_distro.get_value() > self._probability:
                 return False
         return True
 
@@ -115,7 +174,7 @@ class Transition(Element):
         :return: None
         """
         if len(self._storage) > 0:
-            self._storage = sorted(list(filter(lambda x: x >= timer, self._storage)))
+            del self._storage[:self._storage.bisect_left(timer)]
 
     def _hold(self, timer: float, free_cells: int) -> Union[List, None]:
         """
@@ -124,16 +183,20 @@ class Transition(Element):
         :return: кількість транзакцій, що має бути виконана
         """
 
-        transition_quantity = min([int(_input[0].load / _input[1]) for _input in self._inputs] + [free_cells])
+        transition_quantity = min([place._load // multiplicity for place, multiplicity in self._inputs] + [free_cells])
         transition_quantity = min(transition_quantity, 1) if self._is_conflict else transition_quantity
         generated_time_moments = []
 
         if transition_quantity > 0:
-            self._statistics['holds'].append((timer, transition_quantity))
-            for _input in self._inputs:
-                _input[0].exclude(timer, transition_quantity * _input[1])
+            if self._statistics is not None:
+                self._save_statistics(cell='holds', value=transition_quantity, timer=timer)
+            self._track(timer)
+            self._entered += transition_quantity
+            for place, multiplicity in self._inputs:
+                place.exclude(timer, transition_quantity * multiplicity)
+            # від'ємні затримки (наприклад, з нормального розподілу) відповідають миттєвому спрацюванню
             for _ in range(transition_quantity):
-                generated_time_moments.append(self._time_distro.get_value() + timer)
+                generated_time_moments.append(timer + max(self._time_distro.get_value(), 0))
             return generated_time_moments
         else:
             return None
@@ -144,13 +207,38 @@ class Transition(Element):
         :param timer: поточний час імітації
         :return: None
         """
-        transition_quantity = len(list(filter(lambda x: x == timer, self._storage)))
+        first, last = self._storage.bisect_left(timer), self._storage.bisect_right(timer)
+        transition_quantity = last - first
         if transition_quantity > 0:
-            self._statistics['releases'].append((timer, transition_quantity))
-            for output in self._outputs:
-                output[0].append(timer, transition_quantity * output[1])
-                for _ in range(transition_quantity):
-                    self._storage.pop(0)
-
-
+            self._track(timer)
+            self._completed += transition_quantity
+            del self._storage[first:last]
+            if self._statistics is not None:
+                self._save_statistics(cell='releases', value=transition_quantity, timer=timer)
+            for place, multiplicity in self._outputs:
+                place.append(timer, transition_quantity * multiplicity)
+
+    def _save_statistics(self, cell: str, value: Union[int, float], timer: float):
+        self._statistics[cell].append(timer, value)
+
+    def _track(self, timer: float) -> NoReturn:
+        """
+        Накопичення інтегралу кількості зайнятих каналів до моменту її зміни
+        :param timer: поточний модельний час
+        :return: None
+        """
+        self._busy_area += len(self._storage) * (timer - self._last_change)
+        self._last_change = timer
 
+    def _checkpoint(self, timer: float, reset: bool = False) -> Tuple[float, int]:
+        """
+        Значення накопичувачів показників на момент часу
+        :param timer: поточний модельний час
+        :param reset: прапорець скидання накопичувачів (завершення періоду розгону)
+        :return: інтеграл кількості зайнятих каналів та кількість звільнених маркерів
+        """
+        self._track(timer)
+        values = self._busy_area, self._completed
+        if reset:
+            self._busy_area, self._entered, self._completed = 0.0, 0, 0
+        return values
@@ -0,0 +1,3 @@
+"""
+Тести продуктивності рушіїв симуляції (див. benchmarks/run.py)
+"""
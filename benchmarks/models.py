@@ -0,0 +1,119 @@
+from typing import Callable, Dict, List
+
+from app import synthetic
+from app.template import CompiledModel
+from benchmarks.specs import ARCS, GENERATOR_SETUP, PLACES, TRANSITIONS_LIMITED_CAPACITY, TRANSITIONS_TIMES, \
+    TRANSITIONS_ZEROS
+from manage import create_model
+
+# розміри синтетичних мереж (кількість місць)
+SIZES = (10, 100, 1000, 10000)
+
+
+def easy_model(transitions: List[Dict], max_time: float = 5000) -> CompiledModel:
+    """
+    Мережа з трьома місцями та конфліктною групою з tests/full_models/test_easy_models.py
+    :param transitions: властивості переходів
+    :param max_time: максимальний модельний час
+    :return: шаблон моделі
+    """
+    return CompiledModel(max_time=max_time, generator=GENERATOR_SETUP, places=PLACES, transitions=transitions,
+                         arcs=ARCS)
+
+
+def containers_model(put_delay: float, max_time: float = 16000, containers_per_minute: int = 2,
+                     small_full_load: int = 80) -> CompiledModel:
+    """
+    Модель завантаження контейнерів (FullSimulation_Zero / FullSimulation_One з tests/full_models/full_net.py):
+    замкнені цикли малих та великих транспортних засобів. Усічений нормальний розподіл часу рейсу
+    на [120, 240] замінено рівномірним на тому самому інтервалі
+    :param put_delay: затримка переходу PutOnConveyor (0 - FullSimulation_Zero, 1 - FullSimulation_One)
+    :param max_time: максимальний модельний час
+    :param containers_per_minute: кількість контейнерів, що надходять за хвилину
+    :param small_full_load: кількість контейнерів для завантаження малого транспортного засобу
+    :return: шаблон моделі
+    """
+    flight = {'type_of_distribution': 'uniform', 'loc': 180, 'scale': 60}
+    return CompiledModel(
+        max_time=max_time,
+        generator={'time_distro': {'type_of_distribution': 'const', 'loc': 1}},
+        places=[{'str_id': 'Arrival'},
+                {'str_id': 'OnConveyor', 'stats': True},
+                {'str_id': 'SmallLoaded', 'capacity': 1},
+                {'str_id': 'SmallFree', 'capacity': 3, 'initial_load': 3, 'stats': True},
+                {'str_id': 'BigLoaded', 'capacity': 1},
+                {'str_id': 'BigFree', 'capacity': 2, 'initial_load': 2, 'stats': True}],
+        transitions=[{'str_id': 'PutOnConveyor', 'priority': 1,
+                      'time_distro': {'type_of_distribution': 'const', 'loc': put_delay}},
+                     {'str_id': 'LoadSmall', 'priority': 2, 'time_distro': {'type_of_distribution': 'const', 'loc': 0}},
+                     {'str_id': 'FlightSmall', 'priority': 4, 'stats': True, 'time_distro': flight},
+                     {'str_id': 'LoadBig', 'priority': 3, 'time_distro': {'type_of_distribution': 'const', 'loc': 0}},
+                     {'str_id': 'FlightBig', 'priority': 5, 'stats': True, 'time_distro': flight}],
+        arcs=[('Generator', 'Arrival', containers_per_minute),
+              ('Arrival', 'PutOnConveyor', 1),
+              ('PutOnConveyor', 'OnConveyor', 1),
+              ('OnConveyor', 'LoadSmall', small_full_load),
+              ('LoadSmall', 'SmallLoaded', 1),
+              ('SmallLoaded', 'FlightSmall', 1),
+              ('FlightSmall', 'SmallFree', 1),
+              ('SmallFree', 'LoadSmall', 1),
+              ('OnConveyor', 'LoadBig', 140),
+              ('LoadBig', 'BigLoaded', 1),
+              ('BigLoaded', 'FlightBig', 1),
+              ('FlightBig', 'BigFree', 1),
+              ('BigFree', 'LoadBig', 1)])
+
+
+def chain_model(n: int, max_time: float = 2000, **options) -> CompiledModel:
+    """
+    Послідовність n місць, поєднаних переходами з експоненціальною затримкою (тандем черг)
+    :param n: кількість місць
+    :param max_time: максимальний модельний час
+    :param options: інші аргументи Simulation
+    :return: шаблон моделі
+    """
+    return CompiledModel(max_time=max_time, **synthetic.tandem(n), **options)
+
+
+def fork_join_model(n: int, max_time: float = 2000, **options) -> CompiledModel:
+    """
+    Розгалуження маркера на n - 2 паралельні гілки з подальшим об'єднанням
+    :param n: кількість місць (не менше 3)
+    :param max_time: максимальний модельний час
+    :param options: інші аргументи Simulation
+    :return: шаблон моделі
+    """
+    return CompiledModel(max_time=max_time, **synthetic.fork_join(n - 2), **options)
+
+
+def ring_model(n: int, max_time: float = 2000, **options) -> CompiledModel:
+    """
+    Замкнене кільце з n місць, в якому циркулюють n / 2 маркерів (генератор не створює маркерів)
+    :param n: кількість місць
+    :param max_time: максимальний модельний час
+    :param options: інші аргументи Simulation
+    :return: шаблон моделі
+    """
+    return CompiledModel(max_time=max_time, **synthetic.ring(n), **options)
+
+
+def reference_models() -> Dict[str, Callable[[], CompiledModel]]:
+    """
+    Еталонні моделі набору тестів продуктивності
+    :return: функції побудови шаблонів за назвами
+    """
+    models = {'easy_times': lambda: easy_model(TRANSITIONS_TIMES),
+              'easy_zeros': lambda: easy_model(TRANSITIONS_ZEROS),
+              'easy_limited_capacity': lambda: easy_model(TRANSITIONS_LIMITED_CAPACITY),
+              'containers_zero': lambda: containers_model(put_delay=0),
+              'containers_one': lambda: containers_model(put_delay=1),
+              'assembly_line': lambda: create_model(40000, 25, 2, 1)}
+    # тривалість синтетичних прогонів обернено пропорційна розміру мережі (близько 4 * 10^4 подій;
+    # у довгому ланцюжку маркери за час прогону проходять лише перші max_time / 2 місць);
+    # менший блок пулу випадкових чисел обмежує пам'ять пулів великих мереж
+    for n in SIZES:
+        models[f'chain_{n}'] = lambda n=n: chain_model(n, max_time=max(40000 / n, 300), variate_block_size=256)
+        models[f'fork_join_{n}'] = lambda n=n: fork_join_model(n, max_time=40000 / n, variate_block_size=256)
+        models[f'ring_{n}'] = lambda n=n: ring_model(n, max_time=40000 / n, variate_block_size=256)
+    return models
+
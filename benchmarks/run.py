@@ -0,0 +1,160 @@
+"""
+Набір тестів продуктивності рушіїв симуляції.
+
+Кожна еталонна модель (див. benchmarks/models.py) прогоняється в окремому процесі, щоб пікове
+використання пам'яті (RSS) не залежало від попередніх моделей. Результати порівнюються з базовими
+значеннями, збереженими у форматі JSON, і перевищення допустимого відхилення повідомляється як регресія.
+
+Приклади:
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --models 'chain_*' 'easy_*' --engines event numba
+"""
+import argparse
+import fnmatch
+import io
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from multiprocessing import get_context
+from typing import Dict, List, Sequence, Union
+
+from app.simulation import ENGINES, Simulation
+from app.template import CompiledModel
+from benchmarks.models import reference_models
+
+# допустиме відносне відхилення показників від базових значень
+TOLERANCE = 0.25
+
+
+def count_events(simulation: Simulation) -> int:
+    """
+    Кількість подій прогону: надходження від генератора, захоплення та звільнення маркерів переходами
+    :param simulation: екземпляр симуляції після прогону
+    :return: кількість подій
+    """
+    generator = simulation.generator
+    arrivals = generator.total_arrivals // generator._n_per_arrival if generator._n_per_arrival else 0
+    return arrivals + sum(transition._entered + transition._completed for transition in simulation.transitions)
+
+
+def measure(name: str, engine: str = 'event', repeat: int = 3, seed: int = 1) -> Dict[str, float]:
+    """
+    Вимірювання показників продуктивності однієї моделі (виконується в окремому процесі)
+    :param name: назва еталонної моделі
+    :param engine: рушій прогону
+    :param repeat: кількість прогонів для вимірювання часу (використовується найменший час)
+    :param seed: початкове значення генератора випадкових чисел
+    :return: час прогону, кількість подій, подій за секунду, пікова пам'ять процесу та пікова пам'ять розміщень
+    """
+    with redirect_stdout(io.StringIO()):
+        return _measure(reference_models()[name](), engine, repeat, seed)
+
+
+def _measure(model: CompiledModel, engine: str, repeat: int, seed: int) -> Dict[str, float]:
+    # попередній короткий прогін: компіляція рушія 'numba' та прогрівання кешів не входять у вимірювання
+    model.instantiate(seed=seed, max_time=model.max_time / 100, engine=engine).run()
+
+    wall_time, events = float('inf'), 0
+    for _ in range(repeat):
+        simulation = model.instantiate(seed=seed, engine=engine)
+        start = time.perf_counter()
+        simulation.run()
+        wall_time = min(wall_time, time.perf_counter() - start)
+        events = count_events(simulation)
+
+    # розміщення пам'яті вимірюються окремим прогоном, оскільки tracemalloc уповільнює виконання
+    tracemalloc.start()
+    model.instantiate(seed=seed, engine=engine).run()
+    _, peak_allocated = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'wall_time': wall_time,
+            'events': events,
+            'events_per_sec': events / wall_time if wall_time > 0 else float('inf'),
+            'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'peak_allocated_kb': peak_allocated / 1024}
+
+
+def run(names: Sequence[str], engines: Sequence[str] = ('event',), repeat: int = 3) -> Dict[str, Dict]:
+    """
+    Вимірювання показників набору моделей; кожна модель прогоняється в новому процесі
+    :param names: назви еталонних моделей
+    :param engines: рушії прогону
+    :param repeat: кількість прогонів для вимірювання часу
+    :return: показники за ключами '<модель>/<рушій>'
+    """
+    results = {}
+    for engine in engines:
+        for name in names:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                results[f'{name}/{engine}'] = executor.submit(measure, name, engine, repeat).result()
+            print(_format(f'{name}/{engine}', results[f'{name}/{engine}']), flush=True)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float = TOLERANCE) -> List[str]:
+    """
+    Порівняння показників з базовими значеннями. Регресією вважається зменшення кількості подій
+    за секунду або збільшення пікової пам'яті розміщень більше ніж на tolerance; зміна кількості подій
+    означає зміну поведінки моделі, а не продуктивності, і також повідомляється
+    :param results: виміряні показники
+    :param baseline: базові показники
+    :param tolerance: допустиме відносне відхилення
+    :return: перелік повідомлень про регресії
+    """
+    regressions = []
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        reference = baseline[key]
+        if value['events'] != reference['events']:
+            regressions.append(f'{key}: number of events changed from {reference["events"]} to {value["events"]}')
+        if value['events_per_sec'] < reference['events_per_sec'] * (1 - tolerance):
+            regressions.append(f'{key}: events/sec dropped from {reference["events_per_sec"]:.0f} '
+                               f'to {value["events_per_sec"]:.0f}')
+        if value['peak_allocated_kb'] > reference['peak_allocated_kb'] * (1 + tolerance):
+            regressions.append(f'{key}: peak allocations grew from {reference["peak_allocated_kb"]:.0f} KB '
+                               f'to {value["peak_allocated_kb"]:.0f} KB')
+    return regressions
+
+
+def _format(key: str, value: Dict[str, float]) -> str:
+    return f'{key:<32} {value["wall_time"]:>9.3f} s {value["events"]:>10} ev {value["events_per_sec"]:>11.0f} ev/s ' \
+           f'{value["peak_rss_kb"] / 1024:>8.1f} MB rss {value["peak_allocated_kb"] / 1024:>8.1f} MB alloc'
+
+
+def main(argv: Union[Sequence[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(description='Simulation engine benchmarks')
+    parser.add_argument('--models', nargs='*', default=[],
+                        help='model names or shell-style patterns to run (all models by default)')
+    parser.add_argument('--engines', nargs='*', default=['event'], choices=ENGINES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help='path of JSON file to store results as a baseline')
+    parser.add_argument('--compare', help='path of JSON baseline to compare results with')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    arguments = parser.parse_args(argv)
+
+    names = [name for name in reference_models() if not arguments.models or
+             any(fnmatch.fnmatch(name, pattern) for pattern in arguments.models)]
+    results = run(names, arguments.engines, arguments.repeat)
+
+    if arguments.save:
+        with open(arguments.save, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'machine': platform.machine(), 'results': results},
+                      f, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            regressions = compare(results, json.load(f)['results'], arguments.tolerance)
+        for message in regressions:
+            print(f'REGRESSION {message}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,14 @@
+from functools import partial
+
 import numpy as np
 import pandas as pd
 
+from app.replication import run_sequential_replications
 from app.simulation import Simulation
+from app.template import CompiledModel
 
 
-def create_simulation_instance(max_time: float, arrivals_interval: float, qty_in_arrival: int,
-                               capacity: int) -> Simulation:
+def create_model(max_time: float, arrivals_interval: float, qty_in_arrival: int, capacity: int) -> CompiledModel:
     generator_setup_data = {'time_distro': {'type_of_distribution': 'exp',
                                             'scale': arrivals_interval},
                             'n_per_arrival': qty_in_arrival}
@@ -67,42 +70,60 @@ def create_simulation_instance(max_time: float, arrivals_interval: float, qty_in
                        ('Normal', 'Setup', 1),
                        ('Setup', 'Exit', 1)]
 
-    return Simulation(max_time=max_time,
-                      generator=generator_setup_data,
-                      places=places_setup_data,
-                      transitions=transitions_setup_data,
-                      arcs=arcs_setup_data)
+    return CompiledModel(max_time=max_time,
+                         generator=generator_setup_data,
+                         places=places_setup_data,
+                         transitions=transitions_setup_data,
+                         arcs=arcs_setup_data)
+
+
+def create_simulation_instance(max_time: float, arrivals_interval: float, qty_in_arrival: int,
+                               capacity: int, seed=None, sampling: str = 'direct') -> Simulation:
+    return create_model(max_time, arrivals_interval, qty_in_arrival, capacity).instantiate(seed=seed,
+                                                                                          sampling=sampling)
+
+
+def process_response(response: dict, time: float) -> list:
+    """
+    Відгуки прогону: продуктивність системи (шт./год.) та кількість деталей, що залишилися в системі
+    :param response: статистика прогону
+    :param time: тривалість прогону
+    :return: перелік відгуків
+    """
+    arrived_details = np.sum(response['Place_Arrival']['append'][:, 1])
+    left_details = np.sum(response['Place_Exit']['append'][:, 1])
+    return [2 * left_details / time * 60, arrived_details - 2 * left_details]
 
 
 if __name__ == '__main__':
     time = 3000
     print_stats = False
-    left_stats = np.zeros((1000, 1))
-    productivity_stats = np.zeros((1000, 1))
 
-    for n in range(1000):
-        simulation = create_simulation_instance(40000, 25, 2, 1)
-        response = simulation.run()
+    # шаблон моделі будується один раз; прогони створюють нові елементи з готовою структурою мережі
+    result = run_sequential_replications(create_model(40000, 25, 2, 1).instantiate,
+                                         partial(process_response, time=time),
+                                         precision=0.01, max_replications=1000)
+    productivity_stats = result['values'][:, 0:1]
+    left_stats = result['values'][:, 1:2]
+    print(f'Продуктивність {result["mean"]:.2f} ± {result["half_width"]:.2f} шт./год., '
+          f'кількість прогонів {result["n"]}')
 
+    with open('left.npy', 'wb') as f:
+        np.save(f, left_stats)
+    with open('productivity.npy', 'wb') as f:
+        np.save(f, productivity_stats)
+
+    if print_stats:
+        response = create_simulation_instance(40000, 25, 2, 1).run()
         arrival_queue = response['Place_Arrival']['load'][:, 1]
         preprocessing_queue = response['Place_PreprocessingQueue']['load'][:, 1]
         preprocessed_details = response['Place_DetailPreprocessed']['load'][:, 1]
         not_preprocessed_details = response['Place_DetailPassedPreprocessing']['load'][:, 1]
         assembled_normal_queue = response['Place_Normal']['load'][:, 1]
         assembled_defect_queue = response['Place_Defect']['load'][:, 1]
-
         arrived_details = np.sum(response['Place_Arrival']['append'][:, 1])
         left_details = np.sum(response['Place_Exit']['append'][:, 1])
 
-        left_stats[n] = arrived_details - 2 * left_details
-        productivity_stats[n] = 2 * left_details / time * 60
-
-    with open('left.npy', 'wb') as f:
-        np.save(f, left_stats)
-    with open('productivity.npy', 'wb') as f:
-        np.save(f, productivity_stats)
-
-    if print_stats:
         print('\nЗагальна статистика')
         print('Відгуки системи:')
         print(f'Усього деталей в системі {arrived_details - 2 * left_details} шт.')
@@ -116,12 +137,13 @@ if __name__ == '__main__':
         arrival_series.to_pickle('arrival.pickle')
         exit_series.to_pickle('exit.pickle')
 
+        metrics = response['metrics']
         print('\nЗавантаження черг:')
         print('\t\t\t\t\t\t\tМаксимальне\t\t  Середнє')
-        print(f'\tЧерга надходження\t\t\t{np.max(arrival_queue)}\t\t\t\t{np.mean(arrival_queue)}')
-        print(f'\tЧерга попередньої обробки\t{np.max(preprocessing_queue)}\t\t\t\t{np.mean(preprocessing_queue)}')
-        print(f'\tЧерга на повторну обробку\t{np.max(assembled_defect_queue)}\t\t\t\t{np.mean(assembled_defect_queue)}')
-        print(f'\tЧерга на регулювання\t\t{np.max(assembled_normal_queue)}\t\t\t\t{np.mean(assembled_normal_queue)}')
+        print(f'\tЧерга надходження\t\t\t{np.max(arrival_queue)}\t\t\t\t{metrics["Place_Arrival"]["mean_load"]}')
+        print(f'\tЧерга попередньої обробки\t{np.max(preprocessing_queue)}\t\t\t\t{metrics["Place_PreprocessingQueue"]["mean_load"]}')
+        print(f'\tЧерга на повторну обробку\t{np.max(assembled_defect_queue)}\t\t\t\t{metrics["Place_Defect"]["mean_load"]}')
+        print(f'\tЧерга на регулювання\t\t{np.max(assembled_normal_queue)}\t\t\t\t{metrics["Place_Normal"]["mean_load"]}')
         print('--- --- --- --- --- --- --- --- --- --- --- --- --- --- ---')
-        print(f'\tПісля попередньої обробки\t{np.max(preprocessed_details)}\t\t\t{np.mean(preprocessed_details)}')
-        print(f'\tБез попередньої обробки\t\t{np.max(not_preprocessed_details)}\t\t\t{np.mean(not_preprocessed_details)}')
+        print(f'\tПісля попередньої обробки\t{np.max(preprocessed_details)}\t\t\t{metrics["Place_DetailPreprocessed"]["mean_load"]}')
+        print(f'\tБез попередньої обробки\t\t{np.max(not_preprocessed_details)}\t\t\t{metrics["Place_DetailPassedPreprocessing"]["mean_load"]}')
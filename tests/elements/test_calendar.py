@@ -0,0 +1,23 @@
+from unittest import TestCase
+
+from app.models import HeapQueue, SortedQueue
+
+
+class EventCalendar(TestCase):
+
+    def test_duplicates_are_suppressed(self):
+        for queue_class in (SortedQueue, HeapQueue):
+            queue = queue_class(iterable=[0])
+            queue.check_update([3, 1, 3, 2, 1])
+            self.assertFalse(queue.check_insert(2))
+            self.assertEqual(len(queue), 4)
+            self.assertEqual([queue.pop() for _ in range(4)], [0, 1, 2, 3])
+            self.assertTrue(queue.is_empty)
+
+    def test_pop_until(self):
+        for queue_class in (SortedQueue, HeapQueue):
+            queue = queue_class(iterable=[5, 1, 4, 2])
+            self.assertEqual(queue.pop_until(4), [1, 2, 4])
+            self.assertEqual(queue.pop_until(4), [])
+            self.assertTrue(queue.contains(5))
+            self.assertTrue(queue.check_insert(1))
@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+import numpy as np
+from numpy.random import default_rng
+
+from app.models import Distribution
+
+
+class AntitheticSampling(TestCase):
+
+    def create_pair(self, type_of_distribution: str, loc: float, scale: float):
+        pair = []
+        for sampling in ('inverse', 'antithetic'):
+            distro = Distribution(type_of_distribution=type_of_distribution, loc=loc, scale=scale)
+            distro.bind(default_rng(7), block_size=1000, sampling=sampling)
+            pair.append(distro.get_values(20000))
+        return pair
+
+    def test_inverse_sampling_moments(self):
+        for type_of_distribution, mean, std in (('exp', 2, 2), ('norm', 1, 3), ('uniform', 1, 2 / np.sqrt(3))):
+            values, _ = self.create_pair(type_of_distribution, 1, 2 if type_of_distribution != 'norm' else 3)
+            self.assertAlmostEqual(values.mean(), mean, delta=0.1)
+            self.assertAlmostEqual(values.std(), std, delta=0.1)
+
+    def test_antithetic_values_are_mirrored(self):
+        values, antithetic = self.create_pair('uniform', 0.5, 0.5)
+        np.testing.assert_allclose(values + antithetic, 1)
+        values, antithetic = self.create_pair('norm', 0, 1)
+        np.testing.assert_allclose(values, -antithetic, atol=1e-8)
+        values, antithetic = self.create_pair('exp', 0, 1)
+        self.assertLess(np.corrcoef(values, antithetic)[0, 1], -0.5)
@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app.accelerated import check_model
+from tests.elements.test_transition import create_fork_simulation
+
+
+class CompiledNetMatrices(TestCase):
+
+    def test_incidence_matrices(self):
+        net = create_fork_simulation().compile_net()
+        np.testing.assert_array_equal(net.pre, [[1], [0], [0]])
+        np.testing.assert_array_equal(net.post, [[0], [1], [2]])
+        np.testing.assert_array_equal(net.marking, [0, 0, 0])
+        self.assertFalse(net.enabled()[0])
+
+    def test_kernel_writes_marking_back(self):
+        simulation = create_fork_simulation(engine='kernel')
+        simulation.run()
+        self.assertEqual(simulation.places[1].load, 96 * 3)
+        self.assertEqual(simulation.transitions[0].load, 15)
+
+    def test_accelerated_engine_matches_kernel(self):
+        self.assertEqual(check_model(create_fork_simulation()), [])
+        responses = [create_fork_simulation(engine=engine).run() for engine in ('kernel', 'numba')]
+        for cell in ('load', 'append', 'exclude'):
+            np.testing.assert_array_equal(responses[0]['Place_Right'][cell], responses[1]['Place_Right'][cell])
@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app.models import StatisticsBuffer
+from app.place import Place
+
+
+class PlaceStatistics(TestCase):
+
+    def test_buffer_grows_and_keeps_records(self):
+        buffer = StatisticsBuffer(initial_capacity=2)
+        for i in range(10):
+            buffer.append(timer=i * 0.5, value=i)
+        self.assertEqual(len(buffer), 10)
+        self.assertGreaterEqual(buffer.capacity, 10)
+        np.testing.assert_array_equal(buffer.as_array()[:, 1], np.arange(10))
+
+    def test_compact_buffer_dtype(self):
+        buffer = StatisticsBuffer(compact=True)
+        buffer.append(timer=1.5, value=3)
+        self.assertEqual(buffer.values.dtype, np.int32)
+        self.assertEqual(buffer.as_array().dtype, np.float64)
+
+    def test_place_statistics_shape(self):
+        place = Place(parent=None, str_id='Queue', stats=True, compact_stats=True)
+        place.append(timer=1, num=2)
+        place.process(timer=1)
+        place.exclude(timer=2, num=1)
+        place.process(timer=2)
+        statistics = place.statistics
+        self.assertEqual(statistics['load'].shape, (2, 2))
+        np.testing.assert_array_equal(statistics['load'][:, 1], [2, 1])
+        self.assertEqual(statistics['exclude'].shape, (1, 2))
+        self.assertEqual(statistics['append'][0, 0], 1)
+
+
+class CompactElements(TestCase):
+
+    def test_elements_have_no_instance_dict(self):
+        place = Place(parent=None, str_id='Queue')
+        self.assertFalse(hasattr(place, '__dict__'))
+        with self.assertRaises(AttributeError):
+            place.unknown = 1
+        self.assertEqual(place.load, 0)
@@ -0,0 +1,205 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+
+from app.place import Place
+from app.simulation import ENGINES, Simulation
+from app.statistics import ColumnarStore, IntervalSample, OnlineStatistics, P2Quantile, ReservoirSample, RingBuffer
+from app.template import CompiledModel
+
+
+class StreamingStatistics(TestCase):
+
+    def test_welford_matches_numpy(self):
+        values = np.random.default_rng(0).normal(10, 3, 1000)
+        statistics = OnlineStatistics()
+        statistics.extend(np.arange(len(values)), values)
+        self.assertAlmostEqual(statistics.mean, values.mean())
+        self.assertAlmostEqual(statistics.variance, values.var(ddof=1))
+        self.assertEqual(statistics.maximum, values.max())
+
+    def test_time_weighted_mean(self):
+        statistics = OnlineStatistics()
+        statistics.extend([0, 1, 4], [2, 4, 0])
+        self.assertAlmostEqual(statistics.time_mean(), (2 * 1 + 4 * 3) / 4)
+        self.assertAlmostEqual(statistics.time_mean(until=8), (2 * 1 + 4 * 3) / 8)
+
+    def test_p2_quantile(self):
+        values = np.random.default_rng(1).exponential(1, 20000)
+        quantile = P2Quantile(0.9)
+        for value in values:
+            quantile.append(value)
+        self.assertAlmostEqual(quantile.value, np.quantile(values, 0.9), delta=0.05)
+
+    def test_streaming_place(self):
+        place = Place(parent=None, str_id='Queue', stats=True, stats_mode='streaming', stats_quantiles=(0.5,))
+        place.append(timer=0, num=2)
+        place.process(timer=0)
+        place.exclude(timer=2, num=1)
+        place.process(timer=2)
+        report = place.statistics['load']
+        self.assertEqual(report['count'], 2)
+        self.assertEqual(report['max'], 2)
+        self.assertIn(0.5, report['quantiles'])
+
+    def test_streaming_mode_matches_full(self):
+        setup = dict(max_time=1000,
+                     generator={'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 2}},
+                     places=[{'str_id': 'Queue', 'stats': True}, {'str_id': 'Exit'}],
+                     transitions=[{'str_id': 'Service', 'stats': True,
+                                   'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 1.5}}],
+                     arcs=[('Generator', 'Queue', 1), ('Queue', 'Service', 1), ('Service', 'Exit', 1)],
+                     seed=3)
+        full = Simulation(**setup).run()
+        streaming = Simulation(stats_mode='streaming', **setup).run()
+        self.assertEqual(streaming['Place_Queue']['load']['count'], len(full['Place_Queue']['load']))
+        self.assertAlmostEqual(streaming['Place_Queue']['load']['mean'], full['Place_Queue']['load'][:, 1].mean())
+        self.assertEqual(streaming['Transition_Service']['holds']['sum'],
+                         full['Transition_Service']['holds'][:, 1].sum())
+        with self.assertRaises(ValueError):
+            Simulation(stats_mode='sampled', **setup)
+
+
+class TimeWeightedMetrics(TestCase):
+
+    def test_place_mean_load(self):
+        place = Place(parent=None, str_id='Queue')
+        place.append(timer=0, num=2)
+        place.exclude(timer=1, num=2)
+        place.append(timer=2, num=1)
+        metrics = place.metrics(until=4)
+        self.assertAlmostEqual(metrics['mean_load'], (2 * 1 + 1 * 2) / 4)
+        self.assertAlmostEqual(metrics['throughput'], 3 / 4)
+        self.assertAlmostEqual(metrics['mean_wait'], (4 / 4) / (3 / 4))
+
+    def test_littles_law_for_transitions(self):
+        setup = dict(max_time=5000,
+                     generator={'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 2}},
+                     places=[{'str_id': 'Queue'}, {'str_id': 'Exit'}],
+                     transitions=[{'str_id': 'Service', 'capacity': 1,
+                                   'time_distro': {'type_of_distribution': 'const', 'loc': 1.5}}],
+                     arcs=[('Generator', 'Queue', 1), ('Queue', 'Service', 1), ('Service', 'Exit', 1)],
+                     seed=3)
+        for engine in ENGINES:
+            metrics = Simulation(engine=engine, **setup).run()['metrics']
+            self.assertAlmostEqual(metrics['Transition_Service']['mean_sojourn'], 1.5, places=2)
+            self.assertAlmostEqual(metrics['Transition_Service']['utilization'],
+                                   metrics['Transition_Service']['throughput'] * 1.5, places=3)
+            self.assertGreater(metrics['Place_Queue']['mean_load'], 0)
+
+
+class TracePolicies(TestCase):
+
+    def test_ring_buffer_keeps_last_records(self):
+        ring = RingBuffer(3)
+        ring.extend(np.arange(5), np.arange(5) * 10)
+        np.testing.assert_array_equal(ring.report(), [[2, 20], [3, 30], [4, 40]])
+
+    def test_interval_sample(self):
+        state, events = IntervalSample(10), IntervalSample(10, cumulative=True)
+        for timer, value in [(0, 1), (0, 2), (12, 5), (35, 0)]:
+            state.append(timer, value)
+            events.append(timer, value)
+        np.testing.assert_array_equal(state.report(), [[0, 2], [10, 2], [20, 5], [30, 5]])
+        np.testing.assert_array_equal(events.report(), [[0, 3], [10, 5], [20, 0], [30, 0]])
+
+    def test_reservoir_sample_is_uniform(self):
+        hits = np.zeros(100)
+        for seed in range(200):
+            reservoir = ReservoirSample(10, seed)
+            reservoir.extend(np.arange(100), np.arange(100))
+            hits[reservoir.report()[:, 1].astype(int)] += 1
+        self.assertEqual(hits.sum(), 2000)
+        self.assertLess(abs(hits[:50].sum() - hits[50:].sum()), 200)
+
+    def test_trace_policies_in_place_setup(self):
+        setup = dict(max_time=2000,
+                     generator={'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 2}},
+                     transitions=[{'str_id': 'Service',
+                                   'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 1.5}}],
+                     arcs=[('Generator', 'Queue', 1), ('Queue', 'Service', 1), ('Service', 'Exit', 1)],
+                     seed=3)
+        full = Simulation(places=[{'str_id': 'Queue', 'stats': True}, {'str_id': 'Exit'}], **setup).run()
+        for engine in ENGINES:
+            response = Simulation(engine=engine, places=[{'str_id': 'Queue', 'stats': True, 'trace': 'ring',
+                                                          'trace_size': 50},
+                                                         {'str_id': 'Exit', 'stats': True, 'trace': 'interval',
+                                                          'trace_interval': 100}], **setup).run()
+            np.testing.assert_array_equal(response['Place_Queue']['load'], full['Place_Queue']['load'][-50:])
+            self.assertEqual(len(response['Place_Exit']['load']), 20)
+            self.assertAlmostEqual(response['Place_Exit']['append'][:, 1].sum(),
+                                   response['metrics']['Place_Exit']['throughput'] * 2000)
+        with self.assertRaises(ValueError):
+            Place(parent=None, str_id='Queue', stats=True, trace='sampled')
+
+
+class ColumnarStorage(TestCase):
+
+    def test_store_matches_full_statistics(self):
+        setup = dict(max_time=1000,
+                     generator={'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 2}},
+                     places=[{'str_id': 'Queue', 'stats': True}, {'str_id': 'Exit'}],
+                     transitions=[{'str_id': 'Service', 'stats': True,
+                                   'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 1.5}}],
+                     arcs=[('Generator', 'Queue', 1), ('Queue', 'Service', 1), ('Service', 'Exit', 1)])
+        with TemporaryDirectory() as path:
+            for engine in ENGINES:
+                full = Simulation(engine=engine, seed=3, **setup).run()
+                stored = Simulation(engine=engine, seed=3, store=path, run_id=engine, **setup).run()
+                np.testing.assert_array_equal(stored['Place_Queue']['load'], full['Place_Queue']['load'])
+                np.testing.assert_array_equal(stored['Transition_Service']['holds'],
+                                              full['Transition_Service']['holds'])
+            Simulation(seed=4, store=path, run_id='other', **setup).run()
+
+            store = ColumnarStore(path)
+            self.assertEqual(store.runs, sorted(ENGINES + ('other',)))
+            loads = store.query('Place_Queue', 'load')
+            self.assertIsInstance(loads['event'], np.memmap)
+            np.testing.assert_array_equal(loads['event'], loads['scan'])
+            self.assertFalse(np.array_equal(loads['event'][:100], loads['other'][:100]))
+            self.assertEqual(store.index('other')['max_time'], 1000)
+            with self.assertRaises(ValueError):
+                Simulation(stats_mode='streaming', store=path, **setup)
+
+    def test_reused_seed_does_not_overwrite_committed_run(self):
+        setup = dict(max_time=500,
+                     generator={'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 2}},
+                     places=[{'str_id': 'Queue', 'stats': True}, {'str_id': 'Exit'}],
+                     transitions=[{'str_id': 'Service',
+                                   'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 1.5}}],
+                     arcs=[('Generator', 'Queue', 1), ('Queue', 'Service', 1), ('Service', 'Exit', 1)])
+        with TemporaryDirectory() as path:
+            Simulation(seed=3, store=path, **setup).run()
+            store = ColumnarStore(path)
+            first = store.runs[0]
+            expected = np.array(store.read(first, 'Place_Queue', 'load'))
+
+            # та сама послідовність випадкових чисел з іншою моделлю, включно з незавершеним прогоном
+            setup['transitions'][0]['time_distro'] = {'type_of_distribution': 'exp', 'loc': 0, 'scale': 1}
+            Simulation(seed=3, store=path, **setup)
+            Simulation(seed=3, store=path, **setup).run()
+            self.assertEqual(len(store.runs), 2)
+            np.testing.assert_array_equal(store.read(first, 'Place_Queue', 'load'), expected)
+
+    def test_repeated_run_keeps_committed_run(self):
+        setup = dict(max_time=300,
+                     generator={'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 2}},
+                     places=[{'str_id': 'Queue', 'stats': True}, {'str_id': 'Exit'}],
+                     transitions=[{'str_id': 'Service',
+                                   'time_distro': {'type_of_distribution': 'exp', 'loc': 0, 'scale': 1.5}}],
+                     arcs=[('Generator', 'Queue', 1), ('Queue', 'Service', 1), ('Service', 'Exit', 1)])
+        with TemporaryDirectory() as path:
+            # екземпляр без прогону (зокрема пробний екземпляр шаблону) не створює файлів у сховищі
+            CompiledModel(store=path, **setup)
+            self.assertEqual(os.listdir(path), [])
+
+            full = Simulation(seed=2, **setup)
+            stored = Simulation(seed=2, store=path, run_id='r', **setup)
+            for _ in range(2):
+                expected = full.run()['Place_Queue']['load']
+                np.testing.assert_array_equal(stored.run()['Place_Queue']['load'], expected)
+            store = ColumnarStore(path)
+            self.assertEqual(os.listdir(path), ['r'])
+            np.testing.assert_array_equal(store.read('r', 'Place_Queue', 'load'), expected)
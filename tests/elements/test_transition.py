@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app.simulation import Simulation
+
+
+def create_fork_simulation(capacity: float = np.inf, **kwargs) -> Simulation:
+    return Simulation(max_time=100,
+                      generator={'time_distro': {'type_of_distribution': 'const', 'loc': 1}, 'n_per_arrival': 3},
+                      places=[{'str_id': 'Input'},
+                              {'str_id': 'Left', 'stats': True},
+                              {'str_id': 'Right', 'stats': True}],
+                      transitions=[{'str_id': 'Fork', 'capacity': capacity,
+                                    'time_distro': {'type_of_distribution': 'const', 'loc': 5}}],
+                      arcs=[('Generator', 'Input', 1),
+                            ('Input', 'Fork', 1),
+                            ('Fork', 'Left', 1),
+                            ('Fork', 'Right', 2)],
+                      seed=0,
+                      **kwargs)
+
+
+class TransitionStorage(TestCase):
+
+    def test_release_to_several_outputs(self):
+        simulation = create_fork_simulation()
+        response = simulation.run()
+        fork = simulation.transitions[0]
+        # маркери, що надійшли в моменти 0..95, звільнені; в моменти 96..100 - ще в обробці
+        self.assertEqual(fork.load, 15)
+        self.assertEqual(np.sum(response['Place_Left']['append'][:, 1]), 96 * 3)
+        self.assertEqual(np.sum(response['Place_Right']['append'][:, 1]), 96 * 3 * 2)
+
+    def test_free_cells_count_releases_at_current_time(self):
+        fork = create_fork_simulation(capacity=4).transitions[0]
+        fork.storage.update([1, 3, 3, 5])
+        self.assertEqual(fork._free_cells(3), 3)
+        self.assertEqual(fork._free_cells(5), 4)
+        self.assertEqual(fork._free_cells(0), 0)
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from benchmarks.models import chain_model, fork_join_model, ring_model
+from benchmarks.run import compare, count_events
+
+
+class Benchmarks(TestCase):
+
+    def test_synthetic_models_run(self):
+        for factory in (chain_model, fork_join_model, ring_model):
+            simulation = factory(20, max_time=50).instantiate(seed=1)
+            simulation.run()
+            self.assertGreater(count_events(simulation), 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'chain_10/event': {'events': 100, 'events_per_sec': 1000.0, 'peak_allocated_kb': 100.0}}
+        self.assertEqual(compare({'chain_10/event': {'events': 100, 'events_per_sec': 900.0,
+                                                     'peak_allocated_kb': 110.0}}, baseline), [])
+        regressions = compare({'chain_10/event': {'events': 101, 'events_per_sec': 500.0,
+                                                  'peak_allocated_kb': 200.0}}, baseline)
+        self.assertEqual(len(regressions), 3)
@@ -1,44 +1,14 @@
-from app.simulation import Simulation
-from unittest import TestCase
+import pickle
+
+import numpy as np
 
-GENERATOR_SETUP = {'time_distro': {'type_of_distribution': 'exp',
-                                   'loc': 1},
-                   'n_per_arrival': 2}
-
-PLACES = [{'str_id': 'Arrival', "stats": True},
-          {'str_id': 'Pre_exit', 'stats': True},
-          {'str_id': "Exit", "stats": True}]
-
-TRANSITIONS_TIMES = [{'str_id': 'prob_06', 'prob': 0.6, "stats": True, 'priority': 1,
-                      'time_distro': {'type_of_distribution': 'norm',
-                                      'loc': 2, 'scale': 1}},
-               {'str_id': 'prob_04', "stats": True, 'priority': 1,
-                'time_distro': {'type_of_distribution': 'uniform',
-                                'loc': 3, 'scale': 2}},
-               {'str_id': 'to_exit', 'stats': True, 'priority': 2,
-                'time_distro': {'type_of_distribution': 'const', 'loc': 1}}]
-
-TRANSITIONS_ZEROS = [{'str_id': 'prob_06', 'prob': 0.6, "stats": True, 'priority': 1,
-                      'time_distro': {'type_of_distribution': 'const', 'loc': 0}},
-                     {'str_id': 'prob_04', "stats": True, 'priority': 1,
-                      'time_distro': {'type_of_distribution': 'const', 'loc': 0}},
-                     {'str_id': 'to_exit', 'stats': True, 'priority': 2,
-                      'time_distro': {'type_of_distribution': 'exp', 'scale': 0.5}}]
-
-TRANSITIONS_LIMITED_CAPACITY = [{'str_id': 'prob_06', 'prob': 0.6, "stats": True, 'priority': 1,
-                                 'time_distro': {'type_of_distribution': 'const', 'loc': 0}},
-                                {'str_id': 'prob_04', "stats": True, 'priority': 1,
-                                 'time_distro': {'type_of_distribution': 'const', 'loc': 0}},
-                                {'str_id': 'to_exit', 'stats': True, 'priority': 2, 'capacity': 1,
-                                 'time_distro': {'type_of_distribution': 'exp', 'scale': 0.5}}]
-
-ARCS = [('Generator', 'Arrival', 1),
-        ('Arrival', 'prob_06', 2),
-        ('Arrival', 'prob_04', 1),
-        ('prob_06', 'Pre_exit', 1),
-        ('prob_04', 'Pre_exit', 3),
-        ('Pre_exit', 'to_exit', 1),
-        ('to_exit', 'Exit', 1)]
+from app.models import Distribution
+from app.simulation import Simulation, ENGINES
+from app.template import CompiledModel
+from benchmarks.specs import ARCS, GENERATOR_SETUP, PLACES, TRANSITIONS_LIMITED_CAPACITY, TRANSITIONS_TIMES, \
+    TRANSITIONS_ZEROS
+from unittest import TestCase
+from unittest.mock import patch
 
 
 class EasySimulation(TestCase):
@@ -68,4 +38,117 @@ class EasySimulation(TestCase):
                                 transitions=TRANSITIONS_TIMES,
                                 arcs=ARCS)
         response = simulation.run()
-        pass
\ No newline at end of file
+        pass
+
+
+class SeededSimulation(TestCase):
+
+    def test_same_seed_gives_same_run(self):
+        responses = [Simulation(max_time=500,
+                                generator=GENERATOR_SETUP,
+                                places=PLACES,
+                                transitions=TRANSITIONS_LIMITED_CAPACITY,
+                                arcs=ARCS,
+                                seed=42).run() for _ in range(2)]
+        for key in ('Place_Arrival', 'Place_Exit'):
+            for cell in ('load', 'append', 'exclude'):
+                np.testing.assert_array_equal(responses[0][key][cell], responses[1][key][cell])
+
+    def test_variate_pool_does_not_change_sequence(self):
+        responses = [Simulation(max_time=500,
+                                generator=GENERATOR_SETUP,
+                                places=PLACES,
+                                transitions=TRANSITIONS_ZEROS,
+                                arcs=ARCS,
+                                seed=3,
+                                variate_block_size=block_size).run() for block_size in (1, 4096)]
+        for key in ('Place_Arrival', 'Place_Pre_exit', 'Place_Exit'):
+            for cell in ('load', 'append', 'exclude'):
+                np.testing.assert_array_equal(responses[0][key][cell], responses[1][key][cell])
+
+    def test_schedulers_give_same_run(self):
+        responses = [Simulation(max_time=500,
+                                generator=GENERATOR_SETUP,
+                                places=PLACES,
+                                transitions=TRANSITIONS_TIMES,
+                                arcs=ARCS,
+                                seed=11,
+                                scheduler=scheduler).run() for scheduler in ('sorted', 'heap')]
+        for key in ('Place_Arrival', 'Place_Pre_exit', 'Place_Exit'):
+            for cell in ('load', 'append', 'exclude'):
+                np.testing.assert_array_equal(responses[0][key][cell], responses[1][key][cell])
+
+    def test_engines_give_same_run(self):
+        for transitions in (TRANSITIONS_TIMES, TRANSITIONS_ZEROS, TRANSITIONS_LIMITED_CAPACITY):
+            responses = [Simulation(max_time=500,
+                                    generator=GENERATOR_SETUP,
+                                    places=PLACES,
+                                    transitions=transitions,
+                                    arcs=ARCS,
+                                    seed=5,
+                                    engine=engine).run() for engine in ENGINES]
+            for response in responses[1:]:
+                for key in ('Place_Arrival', 'Place_Pre_exit', 'Place_Exit'):
+                    for cell in ('load', 'append', 'exclude'):
+                        np.testing.assert_array_equal(responses[0][key][cell], response[key][cell])
+
+    def test_shared_distribution_instance(self):
+        shared = Distribution(type_of_distribution='uniform', loc=3, scale=2)
+
+        def create(distro):
+            transitions = [dict(transition, time_distro=distro) for transition in TRANSITIONS_TIMES[:2]]
+            return Simulation(max_time=500, generator=GENERATOR_SETUP, places=PLACES,
+                              transitions=transitions + TRANSITIONS_TIMES[2:], arcs=ARCS, seed=8)
+
+        first = create(shared)
+        create(shared).run()
+        expected = create({'type_of_distribution': 'uniform', 'loc': 3, 'scale': 2}).run()
+        np.testing.assert_array_equal(first.run()['Place_Exit']['load'], expected['Place_Exit']['load'])
+        self.assertIsNone(shared._rng)
+        self.assertIsNot(first.transitions[0]._time_distro, first.transitions[1]._time_distro)
+
+
+class NetConstruction(TestCase):
+
+    def test_array_arcs_give_same_run(self):
+        arcs = np.array([(start, fin, multiplicity) for start, fin, multiplicity in ARCS],
+                        dtype=[('src', 'U16'), ('dst', 'U16'), ('multiplicity', np.int64)])
+        responses = [Simulation(max_time=500, generator=GENERATOR_SETUP, places=PLACES, transitions=TRANSITIONS_TIMES,
+                                arcs=value, seed=42).run() for value in (ARCS, arcs, np.array(ARCS, dtype=object))]
+        for response in responses[1:]:
+            np.testing.assert_array_equal(responses[0]['Place_Exit']['load'], response['Place_Exit']['load'])
+
+    def test_duplicate_and_unknown_ids(self):
+        with self.assertRaises(ValueError):
+            Simulation(max_time=500, generator=GENERATOR_SETUP, places=PLACES + [{'str_id': 'to_exit'}],
+                       transitions=TRANSITIONS_TIMES, arcs=ARCS)
+        with self.assertRaises(ValueError):
+            Simulation(max_time=500, generator=GENERATOR_SETUP, places=PLACES, transitions=TRANSITIONS_TIMES,
+                       arcs=ARCS + [('Exit', 'Missing', 1)])
+
+    def test_compiled_model_instances(self):
+        model = CompiledModel(max_time=500, generator=GENERATOR_SETUP, places=PLACES, transitions=TRANSITIONS_TIMES,
+                              arcs=ARCS)
+        model = pickle.loads(pickle.dumps(model))
+        first, second = model.instantiate(seed=42), model.instantiate(seed=42, engine='kernel')
+        self.assertIsNot(first.transitions[0]._time_distro, second.transitions[0]._time_distro)
+        expected = Simulation(max_time=500, generator=GENERATOR_SETUP, places=PLACES, transitions=TRANSITIONS_TIMES,
+                              arcs=ARCS, seed=42).run()
+        for response in (first.run(), second.run()):
+            for key in ('Place_Arrival', 'Place_Exit'):
+                np.testing.assert_array_equal(response[key]['append'], expected[key]['append'])
+        with self.assertRaises(ValueError):
+            CompiledModel(max_time=500, generator=GENERATOR_SETUP, places=PLACES, transitions=TRANSITIONS_TIMES,
+                          arcs=ARCS + [('Exit', 'Missing', 1)])
+
+    def test_compiled_model_skips_topology_work(self):
+        model = CompiledModel(max_time=500, generator=GENERATOR_SETUP, places=PLACES, transitions=TRANSITIONS_ZEROS,
+                              arcs=ARCS)
+        expected = Simulation(max_time=500, generator=GENERATOR_SETUP, places=PLACES, transitions=TRANSITIONS_ZEROS,
+                              arcs=ARCS, seed=7)
+        with patch.object(Simulation, '_set_connections', side_effect=AssertionError), \
+                patch.object(Simulation, '_generate_iteration_sequence', side_effect=AssertionError):
+            simulation = model.instantiate(seed=7)
+        self.assertEqual(simulation.topology(), expected.topology())
+        self.assertTrue(all(transition.is_conflict for transition in simulation.transitions[:2]))
+        np.testing.assert_array_equal(simulation.run()['Place_Exit']['load'], expected.run()['Place_Exit']['load'])
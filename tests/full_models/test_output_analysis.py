@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app.analysis import MIN_BATCHES, student_quantile
+from app.simulation import Simulation, ENGINES
+from benchmarks.specs import GENERATOR_SETUP, PLACES, TRANSITIONS_LIMITED_CAPACITY, ARCS
+
+
+def create_simulation(max_time: float, engine: str = 'event') -> Simulation:
+    return Simulation(max_time=max_time,
+                      generator=GENERATOR_SETUP,
+                      places=PLACES,
+                      transitions=TRANSITIONS_LIMITED_CAPACITY,
+                      arcs=ARCS,
+                      seed=9,
+                      engine=engine)
+
+
+class OutputAnalysis(TestCase):
+
+    def test_student_quantile(self):
+        self.assertAlmostEqual(student_quantile(0.975, 9), 2.262, places=3)
+        self.assertAlmostEqual(student_quantile(0.975, 29), 2.045, places=3)
+
+    def test_student_quantile_small_df(self):
+        # значення таблиць розподілу Стьюдента
+        table = {(0.975, 1): 12.706, (0.995, 1): 63.657, (0.975, 2): 4.303, (0.995, 2): 9.925,
+                 (0.975, 3): 3.182, (0.995, 3): 5.841, (0.975, 4): 2.776, (0.995, 4): 4.604}
+        for (probability, df), value in table.items():
+            self.assertAlmostEqual(student_quantile(probability, df), value, places=3)
+            self.assertAlmostEqual(student_quantile(1 - probability, df), -value, places=3)
+        self.assertLess(abs(student_quantile(0.995, 5) - 4.032), 0.005)
+
+    def test_warmup_discards_statistics(self):
+        response = create_simulation(1000).run(warmup=200)
+        for cell in ('load', 'append', 'exclude'):
+            self.assertGreaterEqual(response['Place_Arrival'][cell][:, 0].min(), 200)
+        self.assertAlmostEqual(response['metrics']['Place_Exit']['throughput'],
+                               response['Place_Exit']['append'][:, 1].sum() / 800)
+
+    def test_batch_means_are_same_for_all_engines(self):
+        responses = [create_simulation(1000, engine).run(warmup=100, batches=10) for engine in ENGINES]
+        batch_means = responses[0]['batch_means']['Transition_to_exit']
+        self.assertEqual(batch_means['mean_busy']['n'], 10)
+        self.assertAlmostEqual(batch_means['mean_busy']['mean'],
+                               responses[0]['metrics']['Transition_to_exit']['mean_busy'])
+        for response in responses[1:]:
+            self.assertEqual(response['batch_means'], responses[0]['batch_means'])
+
+    def test_stopping_rule(self):
+        simulation = create_simulation(100000)
+        response = simulation.run(warmup=100, batches=1000, precision=0.1, target='Transition_to_exit')
+        estimate = response['batch_means']['Transition_to_exit']['mean_busy']
+        self.assertLess(simulation.max_time, 100000)
+        self.assertGreaterEqual(estimate['n'], MIN_BATCHES)
+        self.assertLessEqual(estimate['half_width'], 0.1 * estimate['mean'])
+        self.assertTrue(np.isfinite(response['metrics']['Place_Exit']['mean_load']))
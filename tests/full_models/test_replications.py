@@ -0,0 +1,84 @@
+from functools import partial
+from unittest import TestCase
+
+import numpy as np
+
+from app.replication import run_antithetic_replications, run_paired_replications, run_replications, \
+    run_sequential_replications
+from app.simulation import Simulation
+from benchmarks.specs import GENERATOR_SETUP, PLACES, TRANSITIONS_ZEROS, \
+    TRANSITIONS_LIMITED_CAPACITY, ARCS
+
+
+def create_easy_simulation(max_time: float, seed=None) -> Simulation:
+    return Simulation(max_time=max_time,
+                      generator=GENERATOR_SETUP,
+                      places=PLACES,
+                      transitions=TRANSITIONS_ZEROS,
+                      arcs=ARCS,
+                      seed=seed)
+
+
+def create_antithetic_simulation(seed=None, sampling='direct') -> Simulation:
+    return Simulation(max_time=200,
+                      generator=GENERATOR_SETUP,
+                      places=PLACES,
+                      transitions=TRANSITIONS_LIMITED_CAPACITY,
+                      arcs=ARCS,
+                      seed=seed,
+                      sampling=sampling)
+
+
+def exit_throughput(response: dict) -> float:
+    return response['metrics']['Place_Exit']['throughput']
+
+
+class Replications(TestCase):
+
+    def test_run_replications_in_pool(self):
+        results = dict(run_replications(partial(create_easy_simulation, 200), 4, workers=2, seeds=1))
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+        self.assertIn('Place_Exit', results[0])
+
+    def test_replications_are_reproducible(self):
+        first = dict(run_replications(partial(create_easy_simulation, 200), 2, workers=1, seeds=7))
+        second = dict(run_replications(partial(create_easy_simulation, 200), 2, workers=1, seeds=7))
+        for index in range(2):
+            np.testing.assert_array_equal(first[index]['Place_Exit']['append'],
+                                          second[index]['Place_Exit']['append'])
+        self.assertFalse(np.array_equal(first[0]['Place_Arrival']['append'],
+                                        first[1]['Place_Arrival']['append']))
+
+    def test_sequential_replications_stop_at_precision(self):
+        result = run_sequential_replications(partial(create_easy_simulation, 200), exit_throughput,
+                                             precision=0.05, batch_size=4, workers=1, seeds=3)
+        self.assertTrue(result['converged'])
+        self.assertEqual(result['n'], len(result['values']))
+        self.assertLess(result['n'], 1000)
+        self.assertLessEqual(result['half_width'], 0.05 * result['mean'])
+
+    def test_sequential_replications_do_not_depend_on_workers(self):
+        results = [run_sequential_replications(partial(create_easy_simulation, 200), exit_throughput,
+                                               precision=0.05, batch_size=4, workers=workers, seeds=3)
+                   for workers in (1, 2)]
+        self.assertEqual(results[0]['n'], results[1]['n'])
+        np.testing.assert_array_equal(results[0]['values'], results[1]['values'])
+
+    def test_paired_replications_share_random_numbers(self):
+        paired = run_paired_replications(partial(create_easy_simulation, 200), partial(create_easy_simulation, 200),
+                                         exit_throughput, 4, workers=1, seeds=2)
+        np.testing.assert_array_equal(paired['a'], paired['b'])
+        self.assertEqual(paired['mean'], 0)
+        self.assertEqual(paired['n'], 4)
+
+    def test_common_random_numbers_do_not_depend_on_elements_order(self):
+        reversed_places = Simulation(max_time=200, generator=GENERATOR_SETUP, places=PLACES[::-1],
+                                     transitions=TRANSITIONS_ZEROS[::-1], arcs=ARCS, seed=4).run()
+        response = create_easy_simulation(200, seed=4).run()
+        np.testing.assert_array_equal(response['Place_Arrival']['append'], reversed_places['Place_Arrival']['append'])
+
+    def test_antithetic_pairs_are_negatively_correlated(self):
+        result = run_antithetic_replications(create_antithetic_simulation, exit_throughput, 8, workers=1, seeds=6)
+        self.assertEqual(result['values'].shape, (8, 2))
+        self.assertLess(np.corrcoef(result['values'].T)[0, 1], 0)
+        self.assertAlmostEqual(result['mean'], result['values'].mean())
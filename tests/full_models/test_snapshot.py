@@ -0,0 +1,74 @@
+from functools import partial
+from unittest import TestCase
+
+import numpy as np
+
+from app.experiment import run_branches
+from app.simulation import Simulation, ENGINES
+from benchmarks.specs import GENERATOR_SETUP, PLACES, TRANSITIONS_TIMES, ARCS
+
+
+def create_simulation(max_time: float, engine: str = 'event') -> Simulation:
+    return Simulation(max_time=max_time,
+                      generator=GENERATOR_SETUP,
+                      places=PLACES,
+                      transitions=TRANSITIONS_TIMES,
+                      arcs=ARCS,
+                      seed=3,
+                      engine=engine)
+
+
+class Snapshot(TestCase):
+
+    def test_restored_run_continues_the_same_trajectory(self):
+        for engine in ENGINES:
+            response = create_simulation(1000, engine).run()
+
+            first = create_simulation(400, engine)
+            first_response = first.run()
+            second = create_simulation(1000, engine)
+            second.restore(first.snapshot())
+            second_response = second.run()
+
+            for key in ('Place_Arrival', 'Place_Pre_exit', 'Place_Exit'):
+                for cell in ('load', 'append', 'exclude'):
+                    np.testing.assert_array_equal(np.vstack([first_response[key][cell], second_response[key][cell]]),
+                                                  response[key][cell])
+            self.assertEqual(second_response['metrics'], response['metrics'])
+
+    def test_restore_checks_model(self):
+        simulation = create_simulation(100)
+        simulation.run()
+        other = Simulation(max_time=100, generator=GENERATOR_SETUP, places=PLACES[:2],
+                           transitions=TRANSITIONS_TIMES, arcs=ARCS[:-1], seed=3)
+        with self.assertRaises(ValueError):
+            other.restore(simulation.snapshot())
+
+
+def exit_throughput(response: dict) -> float:
+    return response['metrics']['Place_Exit']['throughput']
+
+
+class Branches(TestCase):
+
+    def test_branches_from_warmed_up_state(self):
+        warmed_up = create_simulation(300)
+        warmed_up.run()
+        snapshot = warmed_up.snapshot()
+        factory = partial(create_simulation, 1000)
+
+        slow_exit = {'capacity': 1, 'time_distro': {'type_of_distribution': 'const', 'loc': 2}}
+        same, slower = run_branches(factory, snapshot, [{}, {'to_exit': slow_exit}],
+                                    response=exit_throughput, workers=2)
+        self.assertLess(slower, same)
+        continuation = create_simulation(1000)
+        continuation.restore(snapshot)
+        self.assertEqual(same, exit_throughput(continuation.run()))
+
+        independent = run_branches(factory, snapshot, [{}, {}], response=exit_throughput, reseed=True,
+                                   workers=1, seeds=1)
+        self.assertNotEqual(independent[0], independent[1])
+
+    def test_modify_rejects_unknown_parameter(self):
+        with self.assertRaises(ValueError):
+            create_simulation(100).modify('Arrival', prob=0.5)
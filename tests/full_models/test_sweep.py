@@ -0,0 +1,76 @@
+import os
+import tempfile
+from functools import partial
+from unittest import TestCase
+
+import numpy as np
+
+from app.experiment import _describe, grid, latin_hypercube, run_sweep
+from app.simulation import Simulation
+from manage import create_model
+from benchmarks.specs import GENERATOR_SETUP, PLACES, TRANSITIONS_LIMITED_CAPACITY, ARCS
+
+
+def create_sweep_simulation(max_time: float, capacity: int = 1, seed=None) -> Simulation:
+    transitions = [dict(transition) for transition in TRANSITIONS_LIMITED_CAPACITY]
+    transitions[-1]['capacity'] = capacity
+    return Simulation(max_time=max_time,
+                      generator=GENERATOR_SETUP,
+                      places=PLACES,
+                      transitions=transitions,
+                      arcs=ARCS,
+                      seed=seed)
+
+
+def exit_throughput(response: dict) -> float:
+    return response['metrics']['Place_Exit']['throughput']
+
+
+class Sweep(TestCase):
+
+    def test_grid(self):
+        points = grid(capacity=[1, 2], max_time=[10, 20, 30])
+        self.assertEqual(len(points), 6)
+        self.assertIn({'capacity': 2, 'max_time': 20}, points)
+
+    def test_latin_hypercube_strata(self):
+        points = latin_hypercube({'x': (0, 10)}, 5, seed=1)
+        strata = sorted(int(point['x'] // 2) for point in points)
+        self.assertEqual(strata, [0, 1, 2, 3, 4])
+
+    def test_sweep_reuses_cached_results(self):
+        factory = partial(create_sweep_simulation, 200)
+        with tempfile.TemporaryDirectory() as path:
+            first = run_sweep(factory, grid(capacity=[1, 2]), replications=2, response=exit_throughput,
+                              workers=2, seeds=5, cache=path)
+            self.assertFalse(any(record['cached'] for record in first))
+
+            second = run_sweep(factory, grid(capacity=[1, 2, 3]), replications=2, response=exit_throughput,
+                               workers=1, seeds=5, cache=path)
+            self.assertEqual([record['cached'] for record in second], [True] * 4 + [False] * 2)
+            np.testing.assert_array_equal([record['response'] for record in first],
+                                          [record['response'] for record in second[:4]])
+
+    def test_cache_key_depends_on_factory_constants(self):
+        factories = []
+        for max_time in (200, 300):
+            namespace = {'create_sweep_simulation': create_sweep_simulation}
+            exec(f'def factory(capacity=1, seed=None):\n'
+                 f'    return create_sweep_simulation({max_time}, capacity, seed)', namespace)
+            factories.append(namespace['factory'])
+        self.assertNotEqual(_describe(factories[0]), _describe(factories[1]))
+        self.assertNotEqual(_describe(create_model(40000, 25, 2, 1).instantiate),
+                            _describe(create_model(100, 5, 3, 9).instantiate))
+
+        with tempfile.TemporaryDirectory() as path:
+            first, second = (run_sweep(factory, grid(capacity=[1]), response=exit_throughput, workers=1,
+                                       seeds=5, cache=path) for factory in factories)
+            self.assertFalse(second[0]['cached'])
+            self.assertNotEqual(first[0]['response'], second[0]['response'])
+
+    def test_cache_requires_seeds(self):
+        with tempfile.TemporaryDirectory() as path:
+            with self.assertRaises(ValueError):
+                run_sweep(partial(create_sweep_simulation, 200), grid(capacity=[1]), response=exit_throughput,
+                          workers=1, cache=path)
+            self.assertEqual(os.listdir(path), [])
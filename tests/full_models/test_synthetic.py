@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app import synthetic
+from app.simulation import Simulation
+from benchmarks.run import count_events
+
+
+class SyntheticNets(TestCase):
+
+    def test_topologies_run_identically_on_engines(self):
+        specs = [synthetic.tandem(30, delays=synthetic.MIXED_DELAYS, multiplicity=2, seed=1),
+                 synthetic.fork_join(10, seed=1),
+                 synthetic.ring(20, tokens=5),
+                 synthetic.resource_loops(4, batch=3, seed=1),
+                 synthetic.conflict_sets(5, 4, probability=0.5, seed=1),
+                 synthetic.random_sparse(40, 60, fan_in=2, fan_out=2, multiplicities=(1, 2), seed=1)]
+        for spec in specs:
+            events = set()
+            for engine in ('scan', 'event'):
+                simulation = Simulation(max_time=100, seed=3, engine=engine, **spec)
+                simulation.run()
+                events.add(count_events(simulation))
+            self.assertEqual(len(events), 1)
+            self.assertGreater(events.pop(), 0)
+
+    def test_structure(self):
+        spec = synthetic.tandem(1000, multiplicity=3)
+        self.assertEqual(len(spec['places']), 1000)
+        self.assertEqual(len(spec['transitions']), 999)
+        self.assertEqual(len(spec['arcs']), 1 + 2 * 999)
+        self.assertTrue(np.all(spec['arcs']['multiplicity'] == 3))
+
+        ring = synthetic.ring(10, tokens=3)
+        self.assertEqual(sum(place['initial_load'] for place in ring['places']), 3)
+
+    def test_random_sparse_is_reproducible_and_connected(self):
+        spec = synthetic.random_sparse(200, 300, fan_in=2, fan_out=3, multiplicities=(1, 2, 3), seed=7)
+        np.testing.assert_array_equal(spec['arcs'], synthetic.random_sparse(200, 300, fan_in=2, fan_out=3,
+                                                                            multiplicities=(1, 2, 3),
+                                                                            seed=7)['arcs'])
+        arcs = spec['arcs']
+        self.assertEqual(len(set(zip(arcs['src'], arcs['dst']))), len(arcs))
+        self.assertEqual(set(arcs['dst'][np.char.startswith(arcs['dst'], 'P')]),
+                         {f'P{i}' for i in range(200)})
+
+    def test_large_conflict_sets_stay_separate(self):
+        simulation = Simulation(max_time=5, seed=1, **synthetic.conflict_sets(1000, 10, probability=0.5, seed=1))
+        groups = [unit for unit in simulation._active_elements if isinstance(unit, list)]
+        self.assertEqual(len(groups), 1000)
+        self.assertTrue(all(len(group) == 10 for group in groups))
+        simulation.run()
+        self.assertGreater(count_events(simulation), 0)